@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+asyncio render orchestration for JSFX testing.
+Runs REAPER as asyncio subprocesses under a bounded semaphore, with per-job
+and overall deadlines. Cancelling a job (or missing a deadline) kills its
+REAPER process group and removes its working directory. Stimulus generation
+and analysis run in worker threads, so they overlap with the renders.
+"""
+
+import asyncio
+import inspect
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from jsfx_tester import JSFXTester
+from render_scheduler import RenderResult
+from signal_generator import SignalGenerator
+
+
+def _kill_process_group(proc):
+    """Kill a subprocess started in its own session, children included."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def _notify(progress, *args):
+    """Call a progress callback, awaiting it if it's a coroutine function."""
+    if progress is not None:
+        result = progress(*args)
+        if inspect.isawaitable(result):
+            await result
+
+
+async def _gather_or_cancel(coroutines, deadline=None):
+    """
+    Run coroutines concurrently. On the first error, or when the deadline
+    passes, cancel the rest and wait for their teardown before raising.
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.wait_for(asyncio.gather(*tasks), deadline)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AsyncRenderer:
+    """Concurrent, cancellable renders on top of a JSFXTester's settings."""
+
+    def __init__(self, tester=None, max_concurrent=None, timeout=30):
+        """
+        Initialize async renderer.
+
+        Args:
+            tester: JSFXTester whose REAPER command, effects directory,
+                    backend, cache and tail settings are used (default
+                    JSFXTester())
+            max_concurrent: Renders allowed at once (default None = CPU count)
+            timeout: Per-job timeout in seconds (None = no limit)
+        """
+        self.tester = tester or JSFXTester()
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.timeout = timeout
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        """Render slots; created lazily so it binds to the running loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.BoundedSemaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def _in_thread(self, func, *args, **kwargs):
+        """Run blocking work (hashing, I/O, analysis) in the loop's executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
+
+    async def render(self, jsfx_path, input_wav, output_wav, slider_values=None,
+                     sample_rate=48000, timeout=None):
+        """
+        Render audio through a JSFX effect.
+
+        Waits for a free slot, then renders with REAPER (or the tester's
+        backend, in a worker thread). The tester's cache is consulted first.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            input_wav: Path to input WAV file
+            output_wav: Path for output WAV file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+            timeout: Seconds allowed for the render itself (default None =
+                     the renderer's timeout); waiting for a slot isn't counted
+
+        Returns:
+            Path to rendered output file
+
+        Raises:
+            subprocess.TimeoutExpired: If the render took longer than timeout
+                                       (REAPER and its children are killed)
+            RuntimeError: If REAPER produced no output
+        """
+        tester = self.tester
+        timeout = self.timeout if timeout is None else timeout
+
+        key = None
+        if tester.cache is not None:
+            key = await self._in_thread(tester._cache_key, jsfx_path, input_wav,
+                                        slider_values, sample_rate)
+            cached = await self._in_thread(tester.cache.get, key, output_wav)
+            if cached is not None:
+                return cached
+
+        async with self.semaphore:
+            if tester.backend is not None:
+                # A backend thread can't be interrupted; a timeout abandons it
+                try:
+                    output_path = await asyncio.wait_for(
+                        self._in_thread(tester.backend.render_with_effect, jsfx_path,
+                                        input_wav, output_wav, slider_values, sample_rate),
+                        timeout
+                    )
+                except asyncio.TimeoutError:
+                    raise subprocess.TimeoutExpired(type(tester.backend).__name__, timeout)
+            else:
+                output_path = await self._render_reaper(jsfx_path, input_wav, output_wav,
+                                                        slider_values, sample_rate, timeout)
+
+        if key is not None:
+            await self._in_thread(tester.cache.put, key, output_path)
+        return Path(output_path)
+
+    async def _render_reaper(self, jsfx_path, input_wav, output_wav, slider_values,
+                             sample_rate, timeout):
+        """One REAPER render in a private working directory."""
+        tester = self.tester
+        output_path = Path(output_wav)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        workdir = Path(tempfile.mkdtemp(prefix="jsfx_render_"))
+        try:
+            project_file, extra_args = await self._in_thread(
+                tester._write_render_project, jsfx_path, input_wav, output_path, workdir,
+                slider_values, sample_rate
+            )
+            cmd = tester._reaper_command(project_file, extra_args)
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                _kill_process_group(proc)
+                await proc.wait()
+                raise subprocess.TimeoutExpired(cmd, timeout)
+            except BaseException:
+                # Cancelled: take REAPER and anything it spawned down with us
+                _kill_process_group(proc)
+                await proc.wait()
+                raise
+
+            return tester._collect_render(workdir, output_path,
+                                          stderr.decode(errors='replace'))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def render_many(self, jobs, output_dir, deadline=None, progress=None):
+        """
+        Render render_scheduler.RenderJob objects concurrently.
+
+        Args:
+            jobs: List of RenderJob
+            output_dir: Directory for rendered files (<job_id>.wav)
+            deadline: Seconds for the whole set (default None = no limit);
+                      jobs still running then are cancelled
+            progress: Optional callback(result, completed_count, total_count),
+                      called as each job finishes; may be a coroutine function
+
+        Returns:
+            Dict mapping job_id -> RenderResult, in the order of jobs; failed,
+            timed-out and cancelled jobs carry an error instead of a path
+        """
+        jobs = list(jobs)
+        job_ids = [job.job_id for job in jobs]
+        if len(set(job_ids)) != len(job_ids):
+            raise ValueError("RenderJob ids must be unique")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        results = {}
+        started = {}
+
+        async def run(job):
+            started[job.job_id] = time.monotonic()
+            try:
+                path = await self.render(job.jsfx_path, job.input_wav,
+                                         output_dir / f"{job.job_id}.wav",
+                                         job.slider_values, job.sample_rate)
+                result = RenderResult(job.job_id, path, 1, time.monotonic() - started[job.job_id])
+            except subprocess.TimeoutExpired as exc:
+                result = RenderResult(job.job_id, None, 1, time.monotonic() - started[job.job_id],
+                                      f"Timed out after {exc.timeout} s")
+            except (RuntimeError, OSError, ValueError) as exc:
+                result = RenderResult(job.job_id, None, 1, time.monotonic() - started[job.job_id],
+                                      str(exc))
+            results[job.job_id] = result
+            await _notify(progress, result, len(results), len(jobs))
+
+        try:
+            await _gather_or_cancel([run(job) for job in jobs], deadline)
+        except asyncio.TimeoutError:
+            now = time.monotonic()
+            for job_id in job_ids:
+                if job_id not in results:
+                    results[job_id] = RenderResult(
+                        job_id, None, 1 if job_id in started else 0,
+                        now - started.get(job_id, now), f"Deadline of {deadline} s exceeded"
+                    )
+        return {job_id: results[job_id] for job_id in job_ids}
+
+    def _write_stimulus(self, path, freq, sample_rate, channels):
+        """Generate and write one sine stimulus; returns its measured level."""
+        gen = SignalGenerator(sample_rate=sample_rate, duration=2.0, channels=channels)
+        gen.save_wav(gen.generate_sine(freq, amplitude=0.5), path)
+        return self.tester._measure_wav_level(path, sample_rate, freq)
+
+    async def test_frequency_response(self, jsfx_path, test_frequencies, slider_values=None,
+                                      sample_rate=48000, channels=2, deadline=None,
+                                      progress=None):
+        """
+        Test the frequency response with one render per frequency, pipelined:
+        while some frequencies render, others are generated or analyzed.
+
+        Args:
+            jsfx_path: Path to JSFX effect
+            test_frequencies: List of frequencies to test (Hz)
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+            channels: Number of channels in the stimulus
+            deadline: Seconds for the whole test (default None = no limit)
+            progress: Optional callback(frequency, stage, completed_count,
+                      total_count) with stage 'generated', 'rendered' or
+                      'analyzed'; may be a coroutine function
+
+        Returns:
+            Dict mapping frequency -> dict with 'input_level', 'output_level',
+            'attenuation_db', like JSFXTester.test_frequency_response()
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passes (every render still
+                                  running is cancelled first)
+        """
+        results = {}
+        total = len(test_frequencies)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+
+            async def probe(freq):
+                input_wav = tmpdir / f"input_{freq}hz.wav"
+                input_level = await self._in_thread(self._write_stimulus, input_wav, freq,
+                                                    sample_rate, channels)
+                await _notify(progress, freq, 'generated', len(results), total)
+
+                output_wav = await self.render(jsfx_path, input_wav,
+                                               tmpdir / f"output_{freq}hz.wav",
+                                               slider_values, sample_rate)
+                await _notify(progress, freq, 'rendered', len(results), total)
+
+                output_level = await self._in_thread(self.tester._measure_wav_level,
+                                                     output_wav, sample_rate, freq)
+                results[freq] = self.tester._attenuation_result(input_level, output_level)
+                await _notify(progress, freq, 'analyzed', len(results), total)
+
+            await _gather_or_cancel([probe(freq) for freq in test_frequencies], deadline)
+
+        return {freq: results[freq] for freq in test_frequencies}
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+CPU benchmark suite for the JSFX plugins.
+Renders long noise, and a short burst of noise followed by silence, through
+every plugin in plugins/ at each slope, channel count and sample rate,
+records wall time and real-time factor, stores the results per git commit
+and flags regressions against an earlier commit. With REAPER, the time of
+rendering the same stimulus through an effect that does nothing (launch,
+project load, file I/O) is subtracted, so the numbers are the plugins' DSP.
+
+Usage: python benchmark.py [--duration 30] [--channels 2 8] [--baseline <commit>]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from biquad_reference import PLUGIN_MODELS, ReferenceRenderer
+from jsfx_interpreter import InterpreterRenderer
+from jsfx_tester import JSFXTester
+from signal_generator import SignalGenerator
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PLUGINS_DIR = REPO_DIR / "plugins"
+RESULTS_DIR = Path(__file__).resolve().parent / "benchmark_results"
+
+# Fractional real-time-factor increase reported as a regression
+REGRESSION_THRESHOLD = 0.10
+
+# Stimuli: 'noise' throughout, or 'silence_tail' - noise for the first
+# SIGNAL_FRACTION of the render, then digital silence (the long silent tails
+# where denormals and the silence bypass matter)
+STIMULI = ('noise', 'silence_tail')
+SIGNAL_FRACTION = 0.1
+
+# Effect without @sample: REAPER passes the audio through, so rendering it
+# costs everything but the plugin's DSP
+BYPASS_JSFX = """desc:Benchmark bypass (passes audio through)
+"""
+
+
+def plugin_slopes(jsfx_path):
+    """slopeSelector values to benchmark for a plugin (all of them if modelled)."""
+    model = PLUGIN_MODELS.get(Path(jsfx_path).stem)
+    if model is None:
+        return [0]
+    return list(range(len(model['slope_stages'])))
+
+
+def plan_benchmark(plugins_dir=PLUGINS_DIR, channels=range(1, 9),
+                   sample_rates=(44100, 48000, 96000), stimuli=STIMULI):
+    """
+    List every benchmark case.
+
+    Args:
+        plugins_dir: Directory with the .jsfx plugins
+        channels: Channel counts to benchmark
+        sample_rates: Sample rates to benchmark
+        stimuli: Stimulus names from STIMULI
+
+    Returns:
+        List of case dicts with 'plugin', 'slope', 'channels', 'sample_rate',
+        'stimulus'
+    """
+    for stimulus in stimuli:
+        if stimulus not in STIMULI:
+            raise ValueError(f"Unknown stimulus '{stimulus}'. Known stimuli: {list(STIMULI)}")
+
+    cases = []
+    for jsfx_path in sorted(Path(plugins_dir).glob("*.jsfx")):
+        for slope in plugin_slopes(jsfx_path):
+            for sample_rate in sample_rates:
+                for num_channels in channels:
+                    for stimulus in stimuli:
+                        cases.append({
+                            'plugin': jsfx_path.name,
+                            'slope': slope,
+                            'channels': num_channels,
+                            'sample_rate': sample_rate,
+                            'stimulus': stimulus,
+                        })
+    return cases
+
+
+def write_stimulus(path, stimulus, sample_rate, channels, duration):
+    """
+    Write a benchmark stimulus.
+
+    Args:
+        path: Output WAV path
+        stimulus: Name from STIMULI
+        sample_rate: Sample rate
+        channels: Number of channels
+        duration: Length in seconds
+
+    Returns:
+        Path to written file
+    """
+    gen = SignalGenerator(sample_rate=sample_rate, duration=duration, channels=channels)
+    samples = gen.generate_white_noise(amplitude=0.1)
+    if stimulus == 'silence_tail':
+        samples[int(len(samples) * SIGNAL_FRACTION):] = 0
+    gen.save_wav(samples, path)
+    return path
+
+
+def git_state(repo_dir=REPO_DIR):
+    """
+    Current commit of the repository.
+
+    Returns:
+        Tuple of (commit hash or "unknown", True if the tree has local changes)
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo_dir,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--", "plugins"],
+                                cwd=repo_dir, capture_output=True, text=True,
+                                check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(status.strip())
+
+
+def _fastest_render(tester, jsfx_path, input_wav, output_wav, slider_values, sample_rate,
+                    repeats):
+    """Wall time of the fastest of `repeats` renders."""
+    wall_times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        tester.render_with_effect(str(jsfx_path), input_wav, output_wav, slider_values,
+                                  sample_rate)
+        wall_times.append(time.perf_counter() - start)
+    return min(wall_times)
+
+
+def resolve_commit(ref, repo_dir=REPO_DIR):
+    """
+    Full hash of a commit given as a (short) hash, branch or other revision.
+
+    Returns:
+        Commit hash, or ref unchanged if git can't resolve it (a stored run
+        can still match it as a hash prefix)
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
+                              cwd=repo_dir, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ref
+
+
+def run_benchmark(cases, tester, plugins_dir=PLUGINS_DIR, duration=30.0, repeats=3,
+                  progress=None, subtract_overhead=False):
+    """
+    Time every case.
+
+    Each case renders its stimulus `repeats` times and keeps the fastest run,
+    which is the least disturbed by other load on the machine. With
+    subtract_overhead, the fastest render of the same stimulus through
+    BYPASS_JSFX (timed once per sample rate and channel count) is subtracted,
+    leaving the plugin's processing time; use it for REAPER, whose renders
+    include the launch, project load and file I/O.
+
+    Args:
+        cases: Case dicts from plan_benchmark()
+        tester: JSFXTester to render with (use one without a cache)
+        plugins_dir: Directory with the .jsfx plugins
+        duration: Stimulus length in seconds
+        repeats: Renders per case
+        progress: Optional callback(result, completed_count, total_count)
+        subtract_overhead: Subtract the render time of a bypass effect
+
+    Returns:
+        List of result dicts: the case plus 'duration', 'wall_time' (s),
+        'overhead' (s subtracted from the render time; 0 without
+        subtract_overhead) and 'realtime_factor' (wall time / audio time;
+        below 1 is faster than real time)
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        stimuli = {}
+        overheads = {}
+        bypass_path = tmpdir / "BenchmarkBypass.jsfx"
+        bypass_path.write_text(BYPASS_JSFX)
+
+        for case in cases:
+            stimulus = case.get('stimulus', 'noise')
+            stimulus_key = (stimulus, case['sample_rate'], case['channels'])
+            if stimulus_key not in stimuli:
+                stimuli[stimulus_key] = write_stimulus(
+                    tmpdir / f"{stimulus}_{case['sample_rate']}_{case['channels']}ch.wav",
+                    stimulus, case['sample_rate'], case['channels'], duration
+                )
+
+            overhead_key = (case['sample_rate'], case['channels'])
+            if subtract_overhead and overhead_key not in overheads:
+                overheads[overhead_key] = _fastest_render(
+                    tester, bypass_path, stimuli[stimulus_key], tmpdir / "out.wav", None,
+                    case['sample_rate'], repeats
+                )
+            overhead = overheads.get(overhead_key, 0.0)
+
+            render_time = _fastest_render(
+                tester, Path(plugins_dir) / case['plugin'], stimuli[stimulus_key],
+                tmpdir / "out.wav", {'slopeSelector': case['slope']}, case['sample_rate'],
+                repeats
+            )
+            wall_time = max(render_time - overhead, 0.0)
+            result = dict(case, duration=duration, wall_time=wall_time, overhead=overhead,
+                          realtime_factor=wall_time / duration)
+            results.append(result)
+            if progress is not None:
+                progress(result, len(results), len(cases))
+
+    return results
+
+
+def _case_key(result):
+    # Runs stored before the stimulus was recorded are all noise
+    return (result['plugin'], result['slope'], result['channels'], result['sample_rate'],
+            result.get('stimulus', 'noise'))
+
+
+def save_results(results, backend, results_dir=RESULTS_DIR, repo_dir=REPO_DIR):
+    """
+    Store results as <results_dir>/<commit>.json.
+
+    Args:
+        results: Result dicts from run_benchmark()
+        backend: Name of the renderer that produced them
+        results_dir: Directory of per-commit result files
+        repo_dir: Repository whose commit is recorded
+
+    Returns:
+        Path to written file
+    """
+    commit, dirty = git_state(repo_dir)
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    path = results_dir / f"{commit}{'-dirty' if dirty else ''}.json"
+    with open(path, 'w') as f:
+        json.dump({
+            'commit': commit,
+            'dirty': dirty,
+            'backend': backend,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'results': results,
+        }, f, indent=2)
+    return path
+
+
+def load_results(path):
+    """Load a stored results file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_baseline(results_dir=RESULTS_DIR, exclude=None, backend=None, commit=None):
+    """
+    Most recent stored run, optionally skipping one results file.
+
+    A clean run and a -dirty run of the same commit are separate files, so a
+    run with local changes is compared against the clean run of its commit.
+
+    Args:
+        results_dir: Directory of per-commit result files
+        exclude: Results file to skip (usually the one just written)
+        backend: Only consider runs from this renderer
+        commit: Only consider runs of commits starting with this hash
+
+    Returns:
+        Loaded results dict, or None if there is no earlier run
+    """
+    exclude = Path(exclude).resolve() if exclude is not None else None
+    runs = []
+    for path in Path(results_dir).glob("*.json"):
+        if path.resolve() == exclude:
+            continue
+        run = load_results(path)
+        if backend is not None and run['backend'] != backend:
+            continue
+        if commit is not None and not run['commit'].startswith(commit):
+            continue
+        runs.append(run)
+    return max(runs, key=lambda run: run['timestamp'], default=None)
+
+
+def find_regressions(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Cases whose real-time factor grew by more than threshold.
+
+    Args:
+        current: Result dicts of the new run
+        baseline: Result dicts of the reference run
+        threshold: Allowed fractional increase (0.10 = 10%)
+
+    Returns:
+        List of (current_result, baseline_result, fractional_change)
+    """
+    baseline_by_case = {_case_key(result): result for result in baseline}
+    regressions = []
+    for result in current:
+        previous = baseline_by_case.get(_case_key(result))
+        if previous is None or previous['realtime_factor'] <= 0:
+            continue
+        change = result['realtime_factor'] / previous['realtime_factor'] - 1
+        if change > threshold:
+            regressions.append((result, previous, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSFX plugins")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Stimulus length per render in seconds")
+    parser.add_argument("--repeats", type=int, default=3, help="Renders per case")
+    parser.add_argument("--channels", type=int, nargs="+", default=list(range(1, 9)))
+    parser.add_argument("--sample-rates", type=int, nargs="+", default=[44100, 48000, 96000])
+    parser.add_argument("--stimuli", nargs="+", choices=STIMULI, default=list(STIMULI))
+    backends = parser.add_mutually_exclusive_group()
+    backends.add_argument("--reference", action="store_true",
+                          help="Use the NumPy reference renderer instead of REAPER")
+    backends.add_argument("--interpreter", action="store_true",
+                          help="Use the JSFX interpreter instead of REAPER")
+    parser.add_argument("--baseline", help="Commit (hash, short hash or ref) to compare against "
+                             "(default: the latest other run)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--results-dir", default=str(RESULTS_DIR))
+    args = parser.parse_args()
+
+    if args.reference:
+        tester, backend = JSFXTester(backend=ReferenceRenderer(tail_ms=0)), "reference"
+    elif args.interpreter:
+        tester, backend = JSFXTester(backend=InterpreterRenderer(tail_ms=0)), "interpreter"
+    else:
+        tester, backend = JSFXTester(tail_ms=0), "reaper"
+
+    cases = plan_benchmark(channels=args.channels, sample_rates=args.sample_rates,
+                           stimuli=args.stimuli)
+    print(f"Benchmarking {len(cases)} cases ({args.duration:g} s each)")
+    if backend == "reaper":
+        print("Wall times exclude a bypass render (REAPER launch, project load, file I/O)")
+    print(f"{'Plugin':>34} | {'Slope':>5} | {'Ch':>2} | {'Rate':>6} | {'Stimulus':>12} | "
+          f"{'Wall':>8} | {'RTF':>7}")
+    print("-" * 93)
+
+    def report(result, done, total):
+        print(f"{result['plugin']:>34} | {result['slope']:>5} | {result['channels']:>2} | "
+              f"{result['sample_rate']:>6} | {result['stimulus']:>12} | "
+              f"{result['wall_time']:>7.2f}s | {result['realtime_factor']:>7.4f}")
+
+    results = run_benchmark(cases, tester, duration=args.duration, repeats=args.repeats,
+                            progress=report, subtract_overhead=backend == "reaper")
+    path = save_results(results, backend, args.results_dir)
+    print(f"\nSaved {path}")
+
+    baseline_commit = resolve_commit(args.baseline) if args.baseline else None
+    baseline = find_baseline(args.results_dir, exclude=path, backend=backend,
+                             commit=baseline_commit)
+    if baseline is None:
+        print("No baseline run to compare against")
+        return 0
+
+    regressions = find_regressions(results, baseline['results'], args.threshold)
+    print(f"Compared against {baseline['commit'][:12]}: {len(regressions)} regression(s)")
+    for result, previous, change in regressions:
+        print(f"  REGRESSION {result['plugin']} slope {result['slope']} "
+              f"{result['channels']}ch @ {result['sample_rate']} ({result['stimulus']}): "
+              f"RTF {previous['realtime_factor']:.4f} -> {result['realtime_factor']:.4f} "
+              f"({change:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
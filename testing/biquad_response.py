@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Analytic frequency response of the biquad plugins.
+Evaluates the exact complex transfer function of the low-pass/high-pass
+biquad and one-pole cascades in plugins/library.jsfx-inc with NumPy
+broadcasting, so whole (frequency x cutoff x Q x slope x sample-rate) grids
+are computed in one call instead of one frequency at a time.
+"""
+
+import numpy as np
+
+from biquad_reference import (
+    _resolve_sliders,
+    biquad_highpass_coeffs,
+    biquad_lowpass_coeffs,
+    one_pole_coeff,
+    plugin_model,
+)
+
+
+def biquad_response(coeffs, freq, sample_rate):
+    """
+    Complex response of one biquad stage.
+
+    H(z) = (b0 + b1*z^-1 + b2*z^-2) / (1 + a1*z^-1 + a2*z^-2), z = e^(j*2*pi*f/fs)
+
+    Args:
+        coeffs: Dict with 'b0', 'b1', 'b2', 'a1', 'a2' (scalars or arrays)
+        freq: Frequency in Hz (scalar or array)
+        sample_rate: Sample rate in Hz (scalar or array)
+
+    Returns:
+        Complex array, broadcast over coefficients, freq and sample_rate
+    """
+    z_inv = np.exp(-2j * np.pi * np.asarray(freq, dtype=np.float64) / sample_rate)
+    num = coeffs['b0'] + z_inv * (coeffs['b1'] + z_inv * coeffs['b2'])
+    den = 1 + z_inv * (coeffs['a1'] + z_inv * coeffs['a2'])
+    return num / den
+
+
+def one_pole_response(coeff, freq, sample_rate):
+    """
+    Complex response of the one-pole stage (onePoleProcess).
+
+    y[n] = y[n-1] + c*(x[n] - y[n-1])  =>  H(z) = c / (1 - (1 - c)*z^-1)
+
+    Args:
+        coeff: Coefficient from one_pole_coeff() (scalar or array)
+        freq: Frequency in Hz (scalar or array)
+        sample_rate: Sample rate in Hz (scalar or array)
+
+    Returns:
+        Complex array
+    """
+    z_inv = np.exp(-2j * np.pi * np.asarray(freq, dtype=np.float64) / sample_rate)
+    return coeff / (1 - (1 - coeff) * z_inv)
+
+
+def cascade_response(filter_type, freq, cutoff, q, stages, sample_rate, one_pole=False):
+    """
+    Complex response of a cascade of identical biquads, optionally followed
+    by the one-pole stage. All arguments broadcast against each other.
+
+    Args:
+        filter_type: 'lowpass' or 'highpass'
+        freq: Frequency in Hz
+        cutoff: Cutoff frequency in Hz
+        q: Resonance
+        stages: Number of biquad stages (integer scalar or array)
+        sample_rate: Sample rate in Hz
+        one_pole: Whether the one-pole stage is applied (bool scalar or array)
+
+    Returns:
+        Complex array
+    """
+    if filter_type == 'lowpass':
+        coeffs = biquad_lowpass_coeffs(cutoff, q, sample_rate)
+    elif filter_type == 'highpass':
+        coeffs = biquad_highpass_coeffs(cutoff, q, sample_rate)
+    else:
+        raise ValueError(f"Unknown filter type: {filter_type}")
+
+    response = biquad_response(coeffs, freq, sample_rate) ** np.asarray(stages)
+
+    one_pole = np.asarray(one_pole, dtype=bool)
+    if one_pole.any():
+        pole = one_pole_response(one_pole_coeff(cutoff, sample_rate), freq, sample_rate)
+        response = np.where(one_pole, response * pole, response)
+    return response
+
+
+def plugin_response(jsfx_path, freq, cutoffFreq=None, qSlider=None, slopeSelector=None,
+                    sample_rate=48000):
+    """
+    Complex response of a plugin at the given slider values.
+
+    Slider arguments default to the plugin's slider defaults and broadcast
+    against freq and sample_rate like any NumPy arrays.
+
+    Args:
+        jsfx_path: Path (or bare name) of a JSFX plugin (see PLUGIN_MODELS)
+        freq: Frequency in Hz
+        cutoffFreq: Cutoff slider value in Hz
+        qSlider: Q slider value
+        slopeSelector: Slope slider value
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        Complex array
+    """
+    model = plugin_model(jsfx_path)
+    defaults = model['defaults']
+    cutoff = defaults['cutoffFreq'] if cutoffFreq is None else cutoffFreq
+    q = defaults['qSlider'] if qSlider is None else qSlider
+    slope = defaults['slopeSelector'] if slopeSelector is None else slopeSelector
+
+    # Same clamping as the plugins' @sample code: floor, then limit to the
+    # table (slopeModeToStages() in the graph prototype, the stage count
+    # passed to biquadBank_process() in the others)
+    slope_stages = model['slope_stages']
+    modes = np.clip(np.floor(np.asarray(slope, dtype=np.float64)), 0,
+                    len(slope_stages) - 1).astype(int)
+    stages = np.take(slope_stages, modes)
+    one_pole = np.isin(modes, model['one_pole_modes'])
+
+    return cascade_response(model['filter'], freq, cutoff, q, stages, sample_rate, one_pole)
+
+
+def response_grid(jsfx_path, frequencies, cutoffs, qs=(0.707,), slopes=(0,),
+                  sample_rates=(48000,)):
+    """
+    Evaluate a plugin's response over the outer product of parameter lists.
+
+    Args:
+        jsfx_path: Path (or bare name) of a JSFX plugin
+        frequencies: Frequencies in Hz
+        cutoffs: Cutoff slider values in Hz
+        qs: Q slider values
+        slopes: Slope slider values
+        sample_rates: Sample rates in Hz
+
+    Returns:
+        Complex array of shape
+        (len(frequencies), len(cutoffs), len(qs), len(slopes), len(sample_rates))
+    """
+    axes = [np.asarray(values, dtype=np.float64)
+            for values in (frequencies, cutoffs, qs, slopes, sample_rates)]
+    freq, cutoff, q, slope, sample_rate = np.ix_(*axes)
+    return plugin_response(jsfx_path, freq, cutoff, q, slope, sample_rate)
+
+
+def magnitude_db(response):
+    """Magnitude of a complex response in dB."""
+    with np.errstate(divide='ignore'):
+        return 20 * np.log10(np.abs(response))
+
+
+def _pole_radius(coeffs):
+    """Largest pole radius of biquads with the given a1, a2."""
+    a1 = np.asarray(coeffs['a1'])
+    a2 = np.asarray(coeffs['a2'])
+    # Roots of z^2 + a1*z + a2
+    disc = np.sqrt((a1 * a1 - 4 * a2).astype(complex))
+    return np.maximum(np.abs((-a1 + disc) / 2), np.abs((-a1 - disc) / 2))
+
+
+def decay_tail_ms(jsfx_path, slider_values=None, sample_rate=48000, threshold_db=-100,
+                  max_tail_ms=10000):
+    """
+    Time for a plugin's impulse response to decay below a threshold.
+
+    Uses the dominant pole radius r of the cascade. A pole of multiplicity m
+    (m identical stages) decays like n^(m-1) * r^n, which is solved for the
+    threshold by fixed-point iteration.
+
+    Args:
+        jsfx_path: Path (or bare name) of a JSFX plugin (see PLUGIN_MODELS)
+        slider_values: Dict of slider values
+        sample_rate: Sample rate in Hz
+        threshold_db: Level relative to the impulse the tail must reach
+        max_tail_ms: Upper bound on the returned tail
+
+    Returns:
+        Tail length in milliseconds (whole ms, at least 1)
+    """
+    model = plugin_model(jsfx_path)
+    sliders = _resolve_sliders(model, slider_values)
+
+    slope_stages = model['slope_stages']
+    mode = min(len(slope_stages) - 1, max(0, int(np.floor(sliders['slopeSelector']))))
+    multiplicity = slope_stages[mode]
+
+    if model['filter'] == 'lowpass':
+        coeffs = biquad_lowpass_coeffs(sliders['cutoffFreq'], sliders['qSlider'], sample_rate)
+    else:
+        coeffs = biquad_highpass_coeffs(sliders['cutoffFreq'], sliders['qSlider'], sample_rate)
+    radius = float(_pole_radius(coeffs))
+
+    if mode in model['one_pole_modes']:
+        radius = max(radius, 1 - float(one_pole_coeff(sliders['cutoffFreq'], sample_rate)))
+        multiplicity += 1
+
+    max_samples = max_tail_ms * sample_rate / 1000
+    if radius >= 1:
+        return max_tail_ms
+    if radius <= 0:
+        samples = 2 * multiplicity
+    else:
+        log_threshold = threshold_db / 20 * np.log(10)
+        log_radius = np.log(radius)
+        samples = log_threshold / log_radius
+        for _ in range(20):
+            samples = (log_threshold - (multiplicity - 1) * np.log(max(samples, 1.0))) / log_radius
+            if samples > max_samples:
+                break
+
+    return int(min(max_tail_ms, max(1, np.ceil(samples * 1000 / sample_rate))))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the REAPER render server (render_server.lua).
+Speaks the same spool protocol but renders with the NumPy reference
+renderer, so the render-server client, its timeouts and its recovery can be
+exercised on machines without REAPER.
+
+Usage: python fake_render_server.py [spool_dir] [--hang-after N]
+       (spool_dir defaults to $JSFX_RENDER_SPOOL)
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from biquad_reference import ReferenceRenderer
+from render_server import SPOOL_ENV, serve_spool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake JSFX render server")
+    parser.add_argument("spool_dir", nargs="?", default=os.environ.get(SPOOL_ENV))
+    parser.add_argument("--hang-after", type=int, default=None,
+                        help="Hang (stop heartbeating) when starting job N+1")
+    args = parser.parse_args()
+    if not args.spool_dir:
+        parser.error(f"no spool directory given and ${SPOOL_ENV} is not set")
+
+    completed = 0
+
+    def render_job(job):
+        nonlocal completed
+        if args.hang_after is not None and completed >= args.hang_after:
+            while True:
+                time.sleep(1)
+
+        render = job['render']
+        ReferenceRenderer(tail_ms=render['tail_ms']).render_with_effect(
+            render['jsfx_path'], render['input_wav'], job['output'],
+            render['slider_values'], render['sample_rate']
+        )
+        completed += 1
+
+    serve_spool(args.spool_dir, render_job)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
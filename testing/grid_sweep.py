@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Parameter-grid sweep runner for JSFX testing.
+Expands a declarative space of slider values, sample rates and channel counts
+into render points, measures each one through JSFXTester and stores the
+results in a columnar .npz file with one row per point. Re-running a grid
+only renders the points the store doesn't have yet; a store records the
+effect source hash and renderer it was measured with and refuses to mix in
+points from a different one.
+
+The grid axes are the biquad plugins' sliders (cutoffFreq, qSlider,
+slopeSelector); GridRunner rejects effects that don't declare all three.
+"""
+
+import itertools
+import os
+import tempfile
+import numpy as np
+from pathlib import Path
+
+from jsfx_metadata import effect_metadata
+from jsfx_tester import JSFXTester
+from render_cache import effect_hash, remove_file
+
+
+# Columns identifying a grid point, in row-key order
+KEY_COLUMNS = ('cutoffFreq', 'qSlider', 'slopeSelector', 'sample_rate', 'channels')
+# Key columns that are slider values
+SLIDER_COLUMNS = KEY_COLUMNS[:3]
+
+# Points measured between store checkpoints
+CHECKPOINT_EVERY = 25
+
+
+class ParameterGrid:
+    """Outer product of slider values, sample rates and channel counts."""
+
+    def __init__(self, cutoffFreq=(632,), qSlider=(0.707,), slopeSelector=(0,),
+                 sample_rate=(48000,), channels=(2,)):
+        """
+        Initialize parameter grid.
+
+        Args:
+            cutoffFreq: Cutoff slider values in Hz
+            qSlider: Q slider values
+            slopeSelector: Slope slider values
+            sample_rate: Sample rates in Hz
+            channels: Stimulus channel counts
+        """
+        self.axes = {
+            'cutoffFreq': [float(v) for v in np.atleast_1d(cutoffFreq)],
+            'qSlider': [float(v) for v in np.atleast_1d(qSlider)],
+            'slopeSelector': [float(v) for v in np.atleast_1d(slopeSelector)],
+            'sample_rate': [int(v) for v in np.atleast_1d(sample_rate)],
+            'channels': [int(v) for v in np.atleast_1d(channels)],
+        }
+
+    def points(self):
+        """
+        Plan the grid.
+
+        Returns:
+            List of point dicts (keys KEY_COLUMNS), duplicates removed, in
+            first-seen order
+        """
+        seen = set()
+        points = []
+        for values in itertools.product(*(self.axes[name] for name in KEY_COLUMNS)):
+            if values in seen:
+                continue
+            seen.add(values)
+            points.append(dict(zip(KEY_COLUMNS, values)))
+        return points
+
+    def __len__(self):
+        return len(self.points())
+
+
+def point_key(point):
+    """Hashable identity of a grid point."""
+    return (float(point['cutoffFreq']), float(point['qSlider']),
+            float(point['slopeSelector']), int(point['sample_rate']),
+            int(point['channels']))
+
+
+def renderer_id(tester):
+    """Backend (and model hash, if it has one) a tester renders with."""
+    backend = tester.backend
+    name = type(backend).__name__ if backend is not None else "reaper"
+    model = getattr(backend, 'model_hash', None)
+    return f"{name}:{model}" if model else name
+
+
+class GridStore:
+    """
+    Columnar result store backed by a single .npz file.
+
+    Columns:
+        cutoffFreq, qSlider, slopeSelector, sample_rate, channels: (rows,)
+        attenuation_db, phase_shift: (rows, len(frequencies)), first channel
+        channel_spread_db: (rows, len(frequencies)), max - min attenuation
+                           across channels
+    """
+
+    def __init__(self, path, jsfx_name, frequencies, source_hash=None, renderer=None):
+        """
+        Open (or start) a store.
+
+        Args:
+            path: .npz file path
+            jsfx_name: Plugin the store describes
+            frequencies: Measurement frequencies (must match an existing store)
+            source_hash: render_cache.effect_hash() of the plugin (must match an
+                         existing store; None opens it whatever it holds)
+            renderer: renderer_id() of the tester (same rule as source_hash)
+
+        Raises:
+            ValueError: If an existing store describes another plugin, other
+                        frequencies, another source or another renderer
+        """
+        self.path = Path(path)
+        self.jsfx_name = jsfx_name
+        self.frequencies = np.asarray(frequencies, dtype=np.float64)
+        self.source_hash = source_hash
+        self.renderer = renderer
+        self.columns = {name: [] for name in KEY_COLUMNS}
+        self.columns.update(attenuation_db=[], phase_shift=[], channel_spread_db=[])
+
+        if self.path.exists():
+            with np.load(self.path, allow_pickle=False) as data:
+                if str(data['jsfx_name']) != jsfx_name:
+                    raise ValueError(
+                        f"{self.path} holds results for {data['jsfx_name']}, not {jsfx_name}"
+                    )
+                if not np.array_equal(data['frequencies'], self.frequencies):
+                    raise ValueError(f"{self.path} was measured at different frequencies")
+                for name, label in (('source_hash', "effect source"),
+                                    ('renderer', "renderer")):
+                    # Stores written before these were recorded match nothing
+                    stored = str(data[name]) if name in data.files else ""
+                    if getattr(self, name) is None:
+                        setattr(self, name, stored)
+                    elif stored != getattr(self, name):
+                        raise ValueError(
+                            f"{self.path} was measured with a different {label}; "
+                            f"delete it or use a new store path"
+                        )
+                for name in self.columns:
+                    self.columns[name] = list(data[name])
+
+        self._keys = {point_key(row): idx for idx, row in enumerate(self._rows())}
+
+    def _rows(self):
+        """Key columns as a sequence of point dicts."""
+        for values in zip(*(self.columns[name] for name in KEY_COLUMNS)):
+            yield dict(zip(KEY_COLUMNS, values))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, point):
+        return point_key(point) in self._keys
+
+    def add(self, point, attenuation_db, phase_shift, channel_spread_db):
+        """
+        Add (or replace) the measurement of one point.
+
+        Args:
+            point: Point dict from ParameterGrid.points()
+            attenuation_db: Attenuation per frequency
+            phase_shift: Phase shift per frequency in radians
+            channel_spread_db: Attenuation spread across channels per frequency
+        """
+        values = {
+            'attenuation_db': np.asarray(attenuation_db, dtype=np.float64),
+            'phase_shift': np.asarray(phase_shift, dtype=np.float64),
+            'channel_spread_db': np.asarray(channel_spread_db, dtype=np.float64),
+        }
+        key = point_key(point)
+        if key in self._keys:
+            idx = self._keys[key]
+            for name, value in values.items():
+                self.columns[name][idx] = value
+            return
+
+        self._keys[key] = len(self._keys)
+        for name, value in zip(KEY_COLUMNS, key):
+            self.columns[name].append(value)
+        for name, value in values.items():
+            self.columns[name].append(value)
+
+    def arrays(self):
+        """All columns as numpy arrays."""
+        num_freqs = len(self.frequencies)
+        arrays = {}
+        for name, values in self.columns.items():
+            if name in KEY_COLUMNS:
+                dtype = np.int64 if name in ('sample_rate', 'channels') else np.float64
+                arrays[name] = np.asarray(values, dtype=dtype)
+            else:
+                arrays[name] = np.asarray(values, dtype=np.float64).reshape(-1, num_freqs)
+        return arrays
+
+    def save(self):
+        """Write the store atomically (temporary file + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, jsfx_name=self.jsfx_name,
+                                    frequencies=self.frequencies,
+                                    source_hash=self.source_hash or "",
+                                    renderer=self.renderer or "", **self.arrays())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            remove_file(tmp_path)
+            raise
+
+    def query(self, **filters):
+        """
+        Select rows by key column values.
+
+        Args:
+            **filters: Column name -> value or list of values
+                       (e.g. slopeSelector=5, cutoffFreq=[100, 1000])
+
+        Returns:
+            Dict of column arrays restricted to the matching rows
+        """
+        arrays = self.arrays()
+        mask = np.ones(len(self), dtype=bool)
+        for name, wanted in filters.items():
+            if name not in KEY_COLUMNS:
+                raise ValueError(f"Unknown column '{name}'. Key columns: {KEY_COLUMNS}")
+            wanted = np.atleast_1d(np.asarray(wanted, dtype=np.float64))
+            mask &= np.isclose(arrays[name][:, None], wanted[None, :]).any(axis=1)
+        return {name: values[mask] for name, values in arrays.items()}
+
+
+class GridRunner:
+    """Measure every missing point of a ParameterGrid into a GridStore."""
+
+    def __init__(self, jsfx_path, store_path, test_frequencies, tester=None):
+        """
+        Initialize grid runner.
+
+        Args:
+            jsfx_path: Path to JSFX effect
+            store_path: .npz result store path
+            test_frequencies: Frequencies measured at every point (Hz)
+            tester: JSFXTester to render with (default: REAPER)
+
+        Raises:
+            ValueError: If the effect lacks one of the SLIDER_COLUMNS sliders,
+                        or the store was measured from another source or
+                        renderer
+        """
+        self.jsfx_path = str(jsfx_path)
+        self.test_frequencies = list(test_frequencies)
+        self.tester = tester or JSFXTester()
+
+        # Resolve the effect like the backend renders it
+        effects_dir = (getattr(self.tester.backend, 'effects_dir', None)
+                       or self.tester.effects_dir)
+        metadata = effect_metadata(self.jsfx_path, effects_dir)
+        for name in SLIDER_COLUMNS:
+            try:
+                metadata.slider(name)
+            except ValueError:
+                raise ValueError(
+                    f"{metadata.path.name} has no '{name}' slider; grid sweeps run on "
+                    f"effects with the sliders {SLIDER_COLUMNS}"
+                ) from None
+
+        self.store = GridStore(store_path, Path(self.jsfx_path).stem, self.test_frequencies,
+                               effect_hash(self.jsfx_path, effects_dir),
+                               renderer_id(self.tester))
+
+    def missing(self, grid):
+        """Points of a grid the store doesn't have yet."""
+        return [point for point in grid.points() if point not in self.store]
+
+    def measure(self, point):
+        """Measure one point with a single multitone render."""
+        slider_values = {name: point[name] for name in SLIDER_COLUMNS}
+        results = self.tester.test_frequency_response(
+            self.jsfx_path, self.test_frequencies, slider_values,
+            sample_rate=point['sample_rate'], multitone=True, channels=point['channels']
+        )
+        rows = [results[freq] for freq in self.test_frequencies]
+        channel_db = np.array([row['channel_attenuation_db'] for row in rows])
+        with np.errstate(invalid='ignore'):
+            spread = np.nan_to_num(channel_db.max(axis=1) - channel_db.min(axis=1))
+        return ([row['attenuation_db'] for row in rows],
+                [row['phase_shift'] for row in rows],
+                spread)
+
+    def run(self, grid, progress=None):
+        """
+        Render and measure the points of a grid that aren't stored yet.
+        The store is saved every CHECKPOINT_EVERY points and at the end, so
+        an interrupted run resumes where it stopped.
+
+        Args:
+            grid: ParameterGrid
+            progress: Optional callback(point, completed_count, total_count)
+
+        Returns:
+            The GridStore
+        """
+        pending = self.missing(grid)
+        for count, point in enumerate(pending, 1):
+            self.store.add(point, *self.measure(point))
+            if count % CHECKPOINT_EVERY == 0:
+                self.store.save()
+            if progress is not None:
+                progress(point, count, len(pending))
+
+        if pending or not self.store.path.exists():
+            self.store.save()
+        return self.store
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Impulse-response prediction for linear effects.
+For a linear time-invariant effect one impulse render determines the output
+for any input at that setting. IRPredictor captures the impulse response
+once per (effect source, sliders, sample rate), stores it, and predicts
+every later render with partitioned overlap-add FFT convolution. Every Nth
+prediction is rendered for real as a spot check of the linearity
+assumption.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from jsfx_tester import AudioAnalyzer
+from render_cache import CACHE_VERSION, effect_hash, remove_file
+from signal_generator import SignalGenerator
+
+
+# Block length of the uniformly partitioned convolution
+DEFAULT_PARTITION = 1024
+
+# Length of the impulse stimulus; the renderer's tail captures the decay
+DEFAULT_IR_DURATION = 0.01
+
+# Prediction error allowed by a spot check, relative to the larger of the
+# input and rendered RMS. A response captured from a float render predicts
+# to about -150 dB and from a 24-bit one to about -130 dB; the margin covers
+# the decay cut off by the render tail (-100 dB by default).
+DEFAULT_TOLERANCE_DB = -80.0
+
+# Predictions per spot-check render
+DEFAULT_SPOT_CHECK_EVERY = 20
+
+
+class LinearityError(RuntimeError):
+    """A spot-check render disagreed with the impulse-response prediction."""
+
+
+def ir_key(jsfx_path, slider_values=None, sample_rate=48000, channels=2, render_settings=None,
+           effects_dir=None):
+    """
+    Key of a captured impulse response.
+
+    Args:
+        jsfx_path: Path to JSFX effect file
+        slider_values: Dict of slider values
+        sample_rate: Sample rate
+        channels: Channel count of the capture
+        render_settings: Dict of anything else that affects the response
+                         (renderer, tail length, ...)
+        effects_dir: Optional extra directory to search for the effect and
+                     its imports
+
+    Returns:
+        Hex digest string
+    """
+    description = {
+        'version': CACHE_VERSION,
+        'kind': 'impulse_response',
+        'effect': effect_hash(jsfx_path, effects_dir),
+        'sliders': sorted((str(k), float(v)) for k, v in (slider_values or {}).items()),
+        'sample_rate': sample_rate,
+        'channels': channels,
+        'render_settings': sorted((str(k), str(v)) for k, v in (render_settings or {}).items()),
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def partition_spectra(ir, partition_size=DEFAULT_PARTITION):
+    """
+    Spectra of an impulse response cut into partition_size blocks.
+
+    Args:
+        ir: Impulse response, shape (length, channels)
+        partition_size: Partition length B
+
+    Returns:
+        Complex array of shape (partitions, B + 1, channels), each block
+        zero-padded to 2B
+    """
+    ir = np.asarray(ir, dtype=np.float64)
+    partitions = max(1, -(-len(ir) // partition_size))
+    padded = np.zeros((partitions * partition_size, ir.shape[1]))
+    padded[:len(ir)] = ir
+    return np.fft.rfft(padded.reshape(partitions, partition_size, -1), n=2 * partition_size,
+                       axis=1)
+
+
+def partitioned_convolve(signal, ir=None, partition_size=DEFAULT_PARTITION, length=None,
+                         spectra=None):
+    """
+    Convolve each channel with its impulse response by uniformly partitioned
+    overlap-add.
+
+    The input is cut into blocks of B samples and every block spectrum is
+    multiplied with every IR partition spectrum (a frequency-domain delay
+    line); the 2B-sample inverse transforms overlap-add into the output.
+
+    Args:
+        signal: Input, shape (num_samples, channels)
+        ir: Impulse response, shape (ir_length, channels); may be omitted if
+            spectra is given
+        partition_size: Partition length B
+        length: Output length (default None = full convolution length;
+                requires ir)
+        spectra: Precomputed partition_spectra(ir, partition_size)
+
+    Returns:
+        Output, shape (length, channels)
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    if spectra is None:
+        spectra = partition_spectra(ir, partition_size)
+    if length is None:
+        length = len(signal) + len(ir) - 1
+    channels = signal.shape[1]
+    block = partition_size
+
+    blocks = max(1, -(-length // block))
+    stacked = np.zeros((blocks * block, channels))
+    used = min(len(signal), len(stacked))
+    stacked[:used] = signal[:used]
+    inputs = np.fft.rfft(stacked.reshape(blocks, block, channels), n=2 * block, axis=1)
+
+    outputs = np.zeros_like(inputs)
+    for delay in range(min(len(spectra), blocks)):
+        outputs[delay:] += inputs[:blocks - delay] * spectra[delay]
+    pieces = np.fft.irfft(outputs, n=2 * block, axis=1)
+
+    result = np.zeros(((blocks + 1) * block, channels))
+    result[:blocks * block] += pieces[:, :block].reshape(-1, channels)
+    result[block:] += pieces[:, block:].reshape(-1, channels)
+    return result[:length]
+
+
+class ImpulseResponse:
+    """A captured impulse response and how much tail its renderer adds."""
+
+    def __init__(self, ir, tail_frames, sample_rate):
+        """
+        Args:
+            ir: Impulse response per channel, shape (length, channels)
+            tail_frames: Frames the renderer appends after the input
+            sample_rate: Sample rate of the capture
+        """
+        self.ir = np.asarray(ir, dtype=np.float64)
+        self.tail_frames = int(tail_frames)
+        self.sample_rate = int(sample_rate)
+        self._spectra = {}
+
+    def predict(self, samples, partition_size=DEFAULT_PARTITION):
+        """
+        Predict the render of an input.
+
+        Args:
+            samples: Input, shape (num_samples, channels)
+            partition_size: Convolution partition length
+
+        Returns:
+            Predicted output with the renderer's tail, shape
+            (num_samples + tail_frames, channels)
+        """
+        if partition_size not in self._spectra:
+            self._spectra[partition_size] = partition_spectra(self.ir, partition_size)
+        return partitioned_convolve(samples, partition_size=partition_size,
+                                    length=len(samples) + self.tail_frames,
+                                    spectra=self._spectra[partition_size])
+
+
+class IRStore:
+    """On-disk impulse responses, one .npz file per key."""
+
+    def __init__(self, store_dir):
+        """
+        Initialize impulse response store.
+
+        Args:
+            store_dir: Directory holding the captures
+        """
+        self.store_dir = Path(store_dir).expanduser()
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, key):
+        return self.store_dir / f"{key}.npz"
+
+    def get(self, key):
+        """
+        Load a capture.
+
+        Returns:
+            ImpulseResponse, or None if the key isn't stored
+        """
+        try:
+            with np.load(self._entry(key)) as data:
+                return ImpulseResponse(data['ir'], data['tail_frames'], data['sample_rate'])
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, response):
+        """Store a capture (written to a temporary file and renamed into place)."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                np.savez(tmp, ir=response.ir, tail_frames=response.tail_frames,
+                         sample_rate=response.sample_rate)
+            os.replace(tmp_path, self._entry(key))
+        except BaseException:
+            remove_file(tmp_path)
+            raise
+
+    def clear(self):
+        """Remove every stored capture."""
+        for path in self.store_dir.glob('*.npz'):
+            remove_file(path)
+
+
+class IRPredictor:
+    """
+    Render backend that predicts linear effects from their impulse response.
+
+    Wraps any renderer with render_with_effect()/render_batch_with_effect()
+    (a JSFXTester driving REAPER, ReferenceRenderer, InterpreterRenderer,
+    RenderServerClient) and is itself one, so
+    JSFXTester(backend=IRPredictor(JSFXTester())) runs the existing tests on
+    predictions. Each output channel is assumed to depend only on the same
+    input channel, as in the biquad plugins; the spot checks catch effects
+    where that or linearity doesn't hold.
+    """
+
+    def __init__(self, renderer, store=None, spot_check_every=DEFAULT_SPOT_CHECK_EVERY,
+                 tolerance_db=DEFAULT_TOLERANCE_DB, partition_size=DEFAULT_PARTITION,
+                 ir_duration=DEFAULT_IR_DURATION, impulse_amplitude=0.5, bit_depth=None,
+                 effects_dir=None):
+        """
+        Initialize impulse-response predictor.
+
+        Args:
+            renderer: Renderer used for impulse captures and spot checks
+            store: Optional IRStore; captures are then reused across runs
+            spot_check_every: Render every Nth prediction for real and
+                              compare (the first prediction is always
+                              checked; 0 disables spot checks)
+            tolerance_db: Allowed prediction error relative to the rendered
+                          RMS, in dB
+            partition_size: Convolution partition length
+            ir_duration: Impulse stimulus length in seconds
+            impulse_amplitude: Impulse height (kept below full scale so
+                               ringing doesn't clip in fixed-point renders)
+            bit_depth: Bit depth of predicted output files (default: the
+                       renderer's bit_depth, or 32 = IEEE float), so
+                       predictions and spot-check renders match in format
+            effects_dir: Directory to search for the effect and its imports
+                         (default: the renderer's effects_dir, if it has one)
+        """
+        self.renderer = renderer
+        self.store = store
+        self.spot_check_every = spot_check_every
+        self.tolerance_db = tolerance_db
+        self.partition_size = partition_size
+        self.ir_duration = ir_duration
+        self.impulse_amplitude = impulse_amplitude
+        self.bit_depth = bit_depth or getattr(renderer, 'bit_depth', 32)
+        self.effects_dir = effects_dir or getattr(renderer, 'effects_dir', None)
+        self.analyzer = AudioAnalyzer()
+        self.responses = {}
+        self.stats = {'captures': 0, 'predictions': 0, 'spot_checks': 0, 'max_error_db': -np.inf}
+
+    @property
+    def tail_ms(self):
+        """Tail of the wrapped renderer (part of JSFXTester's cache key)."""
+        return getattr(self.renderer, 'tail_ms', None)
+
+    @property
+    def model_hash(self):
+        """Model hash of the wrapped renderer (part of JSFXTester's cache key)."""
+        return getattr(self.renderer, 'model_hash', None)
+
+    @property
+    def block_size(self):
+        """Block size of the wrapped renderer (part of JSFXTester's cache key)."""
+        return getattr(self.renderer, 'block_size', None)
+
+    def _key(self, jsfx_path, slider_values, sample_rate, channels):
+        render_settings = {
+            'renderer': type(self.renderer).__name__,
+            'model': self.model_hash,
+            'block_size': self.block_size,
+            'tail_ms': self.tail_ms,
+            'ir_duration': self.ir_duration,
+        }
+        return ir_key(jsfx_path, slider_values, sample_rate, channels, render_settings,
+                      self.effects_dir)
+
+    def impulse_response(self, jsfx_path, slider_values=None, sample_rate=48000, channels=2):
+        """
+        Impulse response of an effect setting, captured on first use.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+            channels: Channel count
+
+        Returns:
+            ImpulseResponse
+        """
+        key = self._key(jsfx_path, slider_values, sample_rate, channels)
+        response = self.responses.get(key)
+        if response is None and self.store is not None:
+            response = self.store.get(key)
+        if response is None:
+            response = self._capture(jsfx_path, slider_values, sample_rate, channels)
+            if self.store is not None:
+                self.store.put(key, response)
+        self.responses[key] = response
+        return response
+
+    def _capture(self, jsfx_path, slider_values, sample_rate, channels):
+        """Render an impulse and turn the output into an ImpulseResponse."""
+        with tempfile.TemporaryDirectory(prefix="jsfx_ir_") as tmpdir:
+            tmpdir = Path(tmpdir)
+            gen = SignalGenerator(sample_rate=sample_rate, duration=self.ir_duration,
+                                  channels=channels)
+            impulse = gen.generate_impulse(amplitude=self.impulse_amplitude)
+            input_wav = tmpdir / "impulse.wav"
+            gen.save_wav(impulse, input_wav, bit_depth=32)
+
+            output_wav = self.renderer.render_with_effect(
+                jsfx_path, input_wav, tmpdir / "impulse_out.wav", slider_values, sample_rate
+            )
+            rendered, _, _ = self.analyzer.read_wav(output_wav)
+
+        self.stats['captures'] += 1
+        rendered = rendered.astype(np.float64)[:, :channels] / self.impulse_amplitude
+        return ImpulseResponse(rendered, len(rendered) - len(impulse), sample_rate)
+
+    def predict(self, samples, jsfx_path, slider_values=None, sample_rate=48000):
+        """
+        Predict the render of an input array.
+
+        Args:
+            samples: Input, shape (num_samples, channels)
+            jsfx_path: Path to JSFX effect file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+
+        Returns:
+            Predicted output including the renderer's tail
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.ndim == 1:
+            samples = samples.reshape(-1, 1)
+        response = self.impulse_response(jsfx_path, slider_values, sample_rate, samples.shape[1])
+        self.stats['predictions'] += 1
+        return response.predict(samples, self.partition_size)
+
+    def _spot_check_due(self):
+        """True for the first and then every spot_check_every-th prediction."""
+        return (self.spot_check_every > 0
+                and (self.stats['predictions'] - 1) % self.spot_check_every == 0)
+
+    def _check(self, samples, predicted, rendered_path, jsfx_path, slider_values):
+        """
+        Compare a prediction with a real render; raise LinearityError on
+        mismatch. The error is relative to the larger of the input and
+        rendered RMS, so strongly attenuated outputs, where both sides are
+        mostly quantization noise, don't fail. Channels the renderer adds
+        beyond the input's (REAPER renders at least stereo) are ignored.
+        """
+        rendered, _, _ = self.analyzer.read_wav(rendered_path)
+        rendered = rendered.astype(np.float64)[:, :predicted.shape[1]]
+        self.stats['spot_checks'] += 1
+        if rendered.shape != predicted.shape:
+            raise LinearityError(
+                f"{Path(jsfx_path).name} {slider_values}: render shape {rendered.shape} "
+                f"!= predicted {predicted.shape}"
+            )
+
+        error = np.sqrt(np.mean((predicted - rendered) ** 2))
+        level = max(np.sqrt(np.mean(rendered ** 2)), np.sqrt(np.mean(samples ** 2)))
+        if level > 0:
+            error_db = self.analyzer.linear_to_db(error / level)
+        else:
+            error_db = -np.inf if error == 0 else np.inf
+        self.stats['max_error_db'] = max(self.stats['max_error_db'], error_db)
+        if error_db > self.tolerance_db:
+            raise LinearityError(
+                f"{Path(jsfx_path).name} {slider_values}: prediction error {error_db:.1f} dB "
+                f"exceeds {self.tolerance_db:.1f} dB - the effect isn't linear and "
+                f"time-invariant at this setting"
+            )
+
+    def _write(self, samples, output_wav, sample_rate):
+        output_path = Path(output_wav)
+        gen = SignalGenerator(sample_rate=sample_rate, channels=samples.shape[1])
+        gen.save_wav(samples, output_path, bit_depth=self.bit_depth)
+        return output_path
+
+    def render_with_effect(self, jsfx_path, input_wav, output_wav,
+                           slider_values=None, sample_rate=48000):
+        """
+        Predict (or, for a spot check, render) audio through a JSFX effect.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            input_wav: Path to input WAV file
+            output_wav: Path for output WAV file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+
+        Returns:
+            Path to output file
+
+        Raises:
+            LinearityError: If a spot check disagrees with the prediction
+        """
+        samples, _, _ = self.analyzer.read_wav(input_wav)
+        predicted = self.predict(samples, jsfx_path, slider_values, sample_rate)
+        if self._spot_check_due():
+            rendered_path = self.renderer.render_with_effect(
+                jsfx_path, input_wav, output_wav, slider_values, sample_rate
+            )
+            self._check(samples, predicted, rendered_path, jsfx_path, slider_values)
+            return rendered_path
+        return self._write(predicted, output_wav, sample_rate)
+
+    def render_batch_with_effect(self, jsfx_path, input_wavs, output_dir,
+                                 slider_values=None, sample_rate=48000):
+        """
+        Predict several inputs; the ones due for a spot check are rendered
+        together in one batch.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            input_wavs: List of input WAV file paths
+            output_dir: Directory for the output files
+            slider_values: Dict of slider values (applied to every input)
+            sample_rate: Sample rate
+
+        Returns:
+            List of output paths (<input stem>_out.wav), in input order
+
+        Raises:
+            LinearityError: If a spot check disagrees with the prediction
+        """
+        output_dir = Path(output_dir)
+        output_paths = [output_dir / f"{Path(path).stem}_out.wav" for path in input_wavs]
+        checks = {}
+        for idx, (input_wav, output_path) in enumerate(zip(input_wavs, output_paths)):
+            samples, _, _ = self.analyzer.read_wav(input_wav)
+            predicted = self.predict(samples, jsfx_path, slider_values, sample_rate)
+            if self._spot_check_due():
+                checks[idx] = (samples, predicted)
+            else:
+                self._write(predicted, output_path, sample_rate)
+
+        if checks:
+            rendered = self.renderer.render_batch_with_effect(
+                jsfx_path, [input_wavs[idx] for idx in checks], output_dir,
+                slider_values, sample_rate
+            )
+            for (idx, (samples, predicted)), rendered_path in zip(checks.items(), rendered):
+                self._check(samples, predicted, rendered_path, jsfx_path, slider_values)
+                output_paths[idx] = rendered_path
+        return output_paths
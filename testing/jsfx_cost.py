@@ -0,0 +1,657 @@
+#!/usr/bin/env python3
+"""
+Static per-sample cost analyzer for JSFX effects.
+Walks the parsed sections of an effect and its imports for one slider and
+channel configuration at a time, evaluating every value that doesn't depend
+on the audio, and counts the operations each section executes: per sample
+(@sample), per block (@block), per slider change (@slider) and on load
+(@init). A parameter change (the continuous sliders taking new values) is
+followed through @slider and the next @block, and the @sample that runs
+while coefficients ramp to the new values is counted separately, so the
+cost of automation shows up wherever the plugin does the work. Every branch
+configuration of the plugin (each value of an
+enumerated slider such as slopeSelector, times each num_ch) is reported
+separately, so a CPU regression shows up at review time without rendering.
+
+Usage: python jsfx_cost.py [plugins...] [--channels 1 2 8] [--baseline <commit>]
+"""
+
+import argparse
+import itertools
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from benchmark import REGRESSION_THRESHOLD
+from jsfx_interpreter import runtime
+from jsfx_interpreter.compiler import SPL_PATTERN, Context, call_target, qualify
+from jsfx_interpreter.effect import load_sources, parse_sources
+
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PLUGINS_DIR = REPO_DIR / "plugins"
+
+CATEGORIES = ('arith', 'compare', 'branches', 'memory', 'transcendental', 'calls')
+
+# Relative cost of one operation of each category in cost_score(). User
+# functions are inlined by EEL2, so a call costs nothing beyond its body.
+WEIGHTS = {
+    'arith': 1,
+    'compare': 1,
+    'branches': 1,
+    'memory': 2,
+    'transcendental': 20,
+    'calls': 0,
+}
+
+TRANSCENDENTAL = {
+    'sin': runtime.sin,
+    'cos': runtime.cos,
+    'tan': runtime.tan,
+    'asin': runtime.asin,
+    'acos': runtime.acos,
+    'atan': runtime.math.atan,
+    'atan2': runtime.math.atan2,
+    'sqrt': runtime.sqrt,
+    'exp': runtime.exp,
+    'log': runtime.log,
+    'log10': runtime.log10,
+    'pow': runtime.power,
+    'invsqrt': runtime.invsqrt,
+}
+
+ARITHMETIC_BUILTINS = {
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'sign': runtime.sign,
+    'floor': runtime.floor,
+    'ceil': runtime.ceil,
+    'sqr': lambda x: x * x,
+}
+
+BINARY_OPS = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': runtime.div,
+    '%': runtime.mod,
+    '^': runtime.power,
+    '|': runtime.bitwise_or,
+    '&': runtime.bitwise_and,
+    '~': runtime.bitwise_xor,
+    '<<': runtime.shift_left,
+    '>>': runtime.shift_right,
+}
+
+COMPARISONS = {
+    '<': lambda a, b: a < b,
+    '>': lambda a, b: a > b,
+    '<=': lambda a, b: a <= b,
+    '>=': lambda a, b: a >= b,
+    '===': lambda a, b: a == b,
+    '!==': lambda a, b: a != b,
+    '==': lambda a, b: abs(a - b) < runtime.CLOSE_FACTOR,
+    '!=': lambda a, b: abs(a - b) >= runtime.CLOSE_FACTOR,
+}
+
+# Enumerated sliders with at most this many values are analyzed per value
+MAX_ENUM_VALUES = 16
+
+
+class Cost(Counter):
+    """Operation counts of one section run, by category."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Set when a loop count depended on the audio and was taken as 1
+        self.unbounded = False
+
+    def score(self):
+        """Weighted total used to compare and rank costs."""
+        return sum(WEIGHTS[category] * self[category] for category in CATEGORIES)
+
+    def as_dict(self):
+        return dict({category: self[category] for category in CATEGORIES},
+                    unbounded=self.unbounded)
+
+
+def _truth(value):
+    return None if value is None else abs(value) >= runtime.CLOSE_FACTOR
+
+
+class _State:
+    """Variables, memory and channel values during a walk (None = unknown)."""
+
+    def __init__(self, env, mem=None, mem_known=True, frame=None):
+        self.env = env
+        self.mem = mem if mem is not None else {}
+        self.mem_known = mem_known
+        self.frame = frame if frame is not None else {}
+
+    def fork(self):
+        return _State(dict(self.env), dict(self.mem), self.mem_known, dict(self.frame))
+
+    def merge(self, first, second):
+        """Keep values both branches agree on; the rest become unknown."""
+        for attr in ('env', 'mem', 'frame'):
+            a, b = getattr(first, attr), getattr(second, attr)
+            setattr(self, attr, {key: a.get(key) if a.get(key) == b.get(key) else None
+                                 for key in a.keys() | b.keys()})
+        self.mem_known = first.mem_known and second.mem_known
+
+
+class CostWalker:
+    """Abstract interpreter over the parsed sections that counts operations."""
+
+    def __init__(self, functions, state, spl_default):
+        """
+        Initialize cost walker.
+
+        Args:
+            functions: Dict of FunctionDef from the parser
+            state: _State to evaluate in (updated in place)
+            spl_default: Value of channels not written yet (None in @sample,
+                         where samples are unknown; 0 elsewhere)
+        """
+        self.functions = functions
+        self.state = state
+        self.spl_default = spl_default
+        self.cost = Cost()
+
+    def run(self, body):
+        """Walk a section body and return its Cost."""
+        self.walk(body, Context())
+        return self.cost
+
+    # Variables
+
+    def read(self, name, ctx):
+        if name in runtime.CONSTANTS:
+            return runtime.CONSTANTS[name]
+        if name in ctx.locals:
+            return ctx.locals[name]
+        match = SPL_PATTERN.match(name)
+        if match:
+            return self.state.frame.get(int(match.group(1)), self.spl_default)
+        return self.state.env.get(qualify(name, ctx), 0.0)
+
+    def write(self, name, ctx, value):
+        if name in ctx.locals:
+            ctx.locals[name] = value
+            return
+        match = SPL_PATTERN.match(name)
+        if match:
+            self.state.frame[int(match.group(1))] = value
+            return
+        self.state.env[qualify(name, ctx)] = value
+
+    def mem_read(self, index):
+        self.cost['memory'] += 1
+        if index is None or not self.state.mem_known:
+            return None
+        return self.state.mem.get(runtime.mem_index(index), 0.0)
+
+    def mem_write(self, index, value):
+        self.cost['memory'] += 1
+        if index is None:
+            # Any slot may have changed
+            self.state.mem_known = False
+        else:
+            self.state.mem[runtime.mem_index(index)] = value
+
+    # Walk
+
+    def branch(self, then, otherwise, ctx):
+        """Walk both arms of a condition that depends on the audio; keep the dearer one."""
+        costs, states, values = [], [], []
+        saved_state, saved_cost, saved_locals = self.state, self.cost, ctx.locals
+        for arm in (then, otherwise):
+            self.state, self.cost = saved_state.fork(), Cost()
+            arm_ctx = Context(ctx.namespace, dict(saved_locals), ctx.instances, ctx.stack)
+            values.append(self.walk(arm, arm_ctx) if arm is not None else 0.0)
+            costs.append(self.cost)
+            states.append((self.state, arm_ctx.locals))
+
+        dearer = max(costs, key=Cost.score)
+        saved_cost.update(dearer)
+        saved_cost.unbounded |= any(cost.unbounded for cost in costs)
+        saved_state.merge(states[0][0], states[1][0])
+        for key in saved_locals:
+            a, b = states[0][1][key], states[1][1][key]
+            saved_locals[key] = a if a == b else None
+        self.state, self.cost = saved_state, saved_cost
+        return values[0] if values[0] == values[1] else None
+
+    def walk(self, node, ctx):
+        """Count the operations of a node and return its value (None = unknown)."""
+        kind = node[0]
+
+        if kind == 'num':
+            return node[1]
+        if kind == 'str':
+            return None
+        if kind == 'var':
+            return self.read(node[1], ctx)
+        if kind == 'index':
+            base, index = self.walk(node[1], ctx), self.walk(node[2], ctx)
+            if node[2] != ('num', 0.0):
+                self.cost['arith'] += 1
+            return self.mem_read(None if base is None or index is None else base + index)
+
+        if kind == 'unop':
+            value = self.walk(node[2], ctx)
+            if node[1] == '+':
+                return value
+            if node[1] == '-':
+                if node[2][0] == 'num':
+                    return -value
+                self.cost['arith'] += 1
+                return None if value is None else -value
+            self.cost['compare'] += 1
+            truth = _truth(value)
+            return None if truth is None else float(not truth)
+
+        if kind == 'binop':
+            return self.binop(node, ctx)
+
+        if kind == 'assign':
+            return self.assign(node, ctx)
+
+        if kind == 'ternary':
+            _, cond, then, otherwise = node
+            truth = _truth(self.walk(cond, ctx))
+            self.cost['branches'] += 1
+            if truth is None:
+                return self.branch(then, otherwise, ctx)
+            if truth:
+                return self.walk(then, ctx)
+            return self.walk(otherwise, ctx) if otherwise is not None else 0.0
+
+        if kind == 'seq':
+            value = 0.0
+            for item in node[1]:
+                value = self.walk(item, ctx)
+            return value
+
+        if kind == 'while':
+            self.walk_while(node, ctx)
+            return 0.0
+
+        if kind == 'loop':
+            count = self.walk(node[1], ctx)
+            if count is None:
+                self.cost.unbounded = True
+                count = 1
+            for _ in range(runtime.loop_count(count)):
+                self.cost['branches'] += 1
+                self.walk(node[2], ctx)
+            return 0.0
+
+        if kind == 'call':
+            return self.call(node, ctx)
+
+        raise ValueError(f"Unknown node {kind}")
+
+    def binop(self, node, ctx):
+        _, op, left_node, right_node = node
+
+        if op in ('&&', '||'):
+            left = _truth(self.walk(left_node, ctx))
+            self.cost['compare'] += 1
+            if left is not None and left == (op == '||'):
+                return float(left)
+            right = _truth(self.walk(right_node, ctx))
+            if left is None or right is None:
+                return None
+            return float(right)
+
+        left, right = self.walk(left_node, ctx), self.walk(right_node, ctx)
+        if op in COMPARISONS:
+            self.cost['compare'] += 1
+            if left is None or right is None:
+                return None
+            return float(COMPARISONS[op](left, right))
+
+        self.cost['transcendental' if op == '^' else 'arith'] += 1
+        if left is None or right is None:
+            return None
+        return BINARY_OPS[op](left, right)
+
+    def assign(self, node, ctx):
+        _, op, target, value_node = node
+
+        if target[0] == 'var':
+            value = self.walk(value_node, ctx)
+            if op != '=':
+                current = self.read(target[1], ctx)
+                self.cost['transcendental' if op == '^=' else 'arith'] += 1
+                value = (None if current is None or value is None
+                         else BINARY_OPS[op[:-1]](current, value))
+            self.write(target[1], ctx, value)
+            return value
+
+        if target[0] == 'call':
+            # spl(channel) = value
+            channel = self.walk(target[2][0], ctx)
+            value = self.walk(value_node, ctx)
+            self.cost['memory'] += 1
+            if op != '=':
+                self.cost['arith'] += 1
+                value = None
+            if channel is None:
+                self.state.frame = {}
+                self.spl_default = None
+            else:
+                self.state.frame[int(channel)] = value
+            return value
+
+        base, index = self.walk(target[1], ctx), self.walk(target[2], ctx)
+        if target[2] != ('num', 0.0):
+            self.cost['arith'] += 1
+        address = None if base is None or index is None else base + index
+        value = self.walk(value_node, ctx)
+        if op != '=':
+            current = self.mem_read(address)
+            self.cost['transcendental' if op == '^=' else 'arith'] += 1
+            value = (None if current is None or value is None
+                     else BINARY_OPS[op[:-1]](current, value))
+        self.mem_write(address, value)
+        return value
+
+    def walk_while(self, node, ctx):
+        _, cond, body = node
+        for _ in range(runtime.LOOP_LIMIT):
+            self.cost['branches'] += 1
+            if cond is None:
+                truth = _truth(self.walk(body, ctx))
+            else:
+                truth = _truth(self.walk(cond, ctx))
+                if truth is None or truth:
+                    self.walk(body, ctx)
+            if truth is None:
+                # Iteration count depends on the audio: count one pass
+                self.cost.unbounded = True
+                return
+            if not truth:
+                return
+
+    def call(self, node, ctx):
+        _, name, arg_nodes = node
+        args = [self.walk(arg, ctx) for arg in arg_nodes]
+        known = all(arg is not None for arg in args)
+
+        if name in TRANSCENDENTAL:
+            self.cost['transcendental'] += 1
+            return TRANSCENDENTAL[name](*args) if known else None
+        if name in ARITHMETIC_BUILTINS:
+            self.cost['arith'] += 1
+            return ARITHMETIC_BUILTINS[name](*args) if known else None
+        if name == 'spl':
+            self.cost['memory'] += 1
+            if args[0] is None:
+                return None
+            return self.state.frame.get(int(args[0]), self.spl_default)
+        if name in ('memset', 'memcpy'):
+            length = args[2]
+            self.cost['memory'] += int(length) if length is not None else 1
+            self.cost.unbounded |= length is None
+            self.state.mem_known = False
+            return args[0]
+        if name == 'rand':
+            self.cost['arith'] += 1
+            return None
+
+        target = call_target(name, self.functions, ctx)
+        if target is None:
+            raise ValueError(f"Unknown function '{name}'")
+        function, namespace = target
+        if function.name in ctx.stack:
+            raise ValueError(f"Recursive call to '{function.name}'")
+
+        self.cost['calls'] += 1
+        locals_ = dict.fromkeys(function.locals, 0.0)
+        locals_.update(zip(function.params, args))
+        inner = Context(namespace, locals_, function.instances, ctx.stack + (function.name,))
+        return self.walk(function.body, inner)
+
+
+def analyze(jsfx_path, slider_values=None, num_channels=2, sample_rate=48000,
+            effects_dir=None):
+    """
+    Count the operations of each section for one configuration.
+
+    Args:
+        jsfx_path: Path to JSFX effect file
+        slider_values: Dict of slider values (missing sliders use defaults)
+        num_channels: num_ch
+        sample_rate: srate
+        effects_dir: Optional extra directory to search for imports
+
+    Returns:
+        Dict of section name -> Cost: 'init' on load, 'slider' per slider
+        change, 'block' per steady block and 'sample' per sample frame, plus
+        'retarget' (@slider and the next @block after a parameter change)
+        and 'ramp' (a sample frame of the block after a parameter change)
+    """
+    sources = load_sources(jsfx_path, effects_dir)
+    sections, functions = parse_sources(sources)
+    sliders = sources[-1].sliders()
+
+    env = {slider.variable: slider.default for slider in sliders}
+    by_name = {key: slider for slider in sliders
+               for key in (slider.variable, f"slider{slider.index}")}
+    for name, value in (slider_values or {}).items():
+        if name.lower() not in by_name:
+            raise ValueError(
+                f"Unknown slider '{name}'. Known sliders: {[s.name for s in sliders]}"
+            )
+        env[by_name[name.lower()].variable] = float(value)
+    env.update(srate=float(sample_rate), num_ch=float(num_channels), samplesblock=None)
+
+    # Same host sequence as the interpreter, on one shared state. @block runs
+    # twice and the second run is kept: the first after @init may set up.
+    state = _State(env)
+    costs = {}
+    for section in ('init', 'slider', 'block', 'block', 'sample'):
+        spl_default = None if section == 'sample' else 0.0
+        costs[section] = CostWalker(functions, state, spl_default).run(sections[section])
+        state.frame = {}
+
+    # A parameter change: the continuous sliders take new (unknown) values
+    for slider in sliders:
+        if not _enumerated_values(slider):
+            state.env[slider.variable] = None
+    retarget = Cost()
+    for section in ('slider', 'block'):
+        cost = CostWalker(functions, state, 0.0).run(sections[section])
+        retarget.update(cost)
+        retarget.unbounded |= cost.unbounded
+        state.frame = {}
+    costs['retarget'] = retarget
+    costs['ramp'] = CostWalker(functions, state, None).run(sections['sample'])
+    return costs
+
+
+def _enumerated_values(slider):
+    """Values of a slider analyzed one by one, or None if it's continuous."""
+    if slider.step is None or slider.step < 1 or slider.step != int(slider.step):
+        return None
+    count = int((slider.maximum - slider.minimum) / slider.step) + 1
+    if count > MAX_ENUM_VALUES:
+        return None
+    return [slider.minimum + i * slider.step for i in range(count)]
+
+
+def branch_sliders(jsfx_path, effects_dir=None):
+    """
+    Enumerated sliders of an effect and their values.
+
+    Args:
+        jsfx_path: Path to JSFX effect file
+        effects_dir: Optional extra directory to search for imports
+
+    Returns:
+        Dict of slider name -> list of values, for sliders with an integer
+        step and at most MAX_ENUM_VALUES values
+    """
+    enumerated = {}
+    for slider in load_sources(jsfx_path, effects_dir)[-1].sliders():
+        values = _enumerated_values(slider)
+        if values:
+            enumerated[slider.name or slider.variable] = values
+    return enumerated
+
+
+def analyze_branches(jsfx_path, num_channels=range(1, 9), sample_rate=48000,
+                     slider_values=None, effects_dir=None):
+    """
+    Analyze every branch configuration of an effect.
+
+    Args:
+        jsfx_path: Path to JSFX effect file
+        num_channels: num_ch values to analyze
+        sample_rate: srate
+        slider_values: Values for the other sliders (default: their defaults)
+        effects_dir: Optional extra directory to search for imports
+
+    Returns:
+        List of dicts with 'sliders' (the enumerated slider values),
+        'num_ch' and 'costs' (from analyze())
+    """
+    enumerated = branch_sliders(jsfx_path, effects_dir)
+    rows = []
+    for values in itertools.product(*enumerated.values()):
+        config = dict(zip(enumerated, values))
+        for channels in num_channels:
+            costs = analyze(jsfx_path, dict(slider_values or {}, **config), channels,
+                            sample_rate, effects_dir)
+            rows.append({'sliders': config, 'num_ch': channels, 'costs': costs})
+    return rows
+
+
+def rank_plugins(plugins_dir=PLUGINS_DIR, num_channels=(2,), sample_rate=48000):
+    """
+    Rank plugins by expected per-sample cost.
+
+    Args:
+        plugins_dir: Directory with the .jsfx plugins
+        num_channels: num_ch values to analyze
+        sample_rate: srate
+
+    Returns:
+        List of (plugin name, worst per-sample score, mean per-sample score),
+        most expensive first
+    """
+    ranking = []
+    for jsfx_path in sorted(Path(plugins_dir).glob("*.jsfx")):
+        scores = [row['costs']['sample'].score()
+                  for row in analyze_branches(jsfx_path, num_channels, sample_rate)]
+        ranking.append((jsfx_path.name, max(scores), sum(scores) / len(scores)))
+    return sorted(ranking, key=lambda entry: entry[1], reverse=True)
+
+
+def find_cost_regressions(current, baseline, section='sample',
+                          threshold=REGRESSION_THRESHOLD):
+    """
+    Configurations whose section score grew by more than threshold.
+
+    Args:
+        current: Rows from analyze_branches() for the new source
+        baseline: Rows from analyze_branches() for the reference source
+        section: Section to compare
+        threshold: Allowed fractional increase (0.10 = 10%)
+
+    Returns:
+        List of (current_row, baseline_score, current_score)
+    """
+    def key(row):
+        return (tuple(sorted(row['sliders'].items())), row['num_ch'])
+
+    baseline_by_config = {key(row): row['costs'][section].score() for row in baseline}
+    regressions = []
+    for row in current:
+        previous = baseline_by_config.get(key(row))
+        score = row['costs'][section].score()
+        if previous is not None and score > previous * (1 + threshold):
+            regressions.append((row, previous, score))
+    return regressions
+
+
+def _export_revision(revision, repo_dir, target_dir):
+    """Write the plugins/ directory of a git revision into target_dir."""
+    archive = subprocess.run(["git", "archive", revision, "plugins"], cwd=repo_dir,
+                             capture_output=True, check=True).stdout
+    subprocess.run(["tar", "-x", "-C", str(target_dir)], input=archive, check=True)
+    return Path(target_dir) / "plugins"
+
+
+def _format_row(row, section):
+    cost = row['costs'][section]
+    config = " ".join(f"{name}={value:g}" for name, value in row['sliders'].items())
+    return (f"{config:>18} | {row['num_ch']:>2} | "
+            + " | ".join(f"{cost[category]:>5}" for category in CATEGORIES)
+            + f" | {cost.score():>6}{' *' if cost.unbounded else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static per-sample cost of the JSFX plugins")
+    parser.add_argument("plugins", nargs="*", help="Plugin files (default: all in plugins/)")
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2, 8])
+    parser.add_argument("--sample-rate", type=int, default=48000)
+    parser.add_argument("--baseline", help="Git revision to compare per-sample costs against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    plugins = [Path(p) for p in args.plugins] or sorted(PLUGINS_DIR.glob("*.jsfx"))
+    header = (f"{'Branch':>18} | {'Ch':>2} | "
+              + " | ".join(f"{category[:5]:>5}" for category in CATEGORIES) + f" | {'Score':>6}")
+
+    results = {}
+    for jsfx_path in plugins:
+        rows = analyze_branches(jsfx_path, args.channels, args.sample_rate)
+        results[jsfx_path.name] = rows
+        for section, title in (('sample', "per sample"),
+                               ('ramp', "per sample while ramping after a parameter change"),
+                               ('block', "per block"),
+                               ('retarget', "per parameter change: @slider + next @block")):
+            label = {'ramp': 'sample', 'retarget': 'slider/@block'}.get(section, section)
+            print(f"\n{jsfx_path.name} - @{label} ({title})")
+            print(header)
+            print("-" * len(header))
+            for row in rows:
+                print(_format_row(row, section))
+
+    print("\nRanking by worst per-sample score:")
+    for name, rows in sorted(results.items(),
+                             key=lambda item: -max(r['costs']['sample'].score() for r in item[1])):
+        scores = [row['costs']['sample'].score() for row in rows]
+        print(f"  {name:>34} | worst {max(scores):>6} | mean {sum(scores) / len(scores):>8.1f}")
+
+    if not args.baseline:
+        return 0
+
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        baseline_dir = _export_revision(args.baseline, REPO_DIR, tmpdir)
+        for jsfx_path in plugins:
+            baseline_path = baseline_dir / jsfx_path.name
+            if not baseline_path.exists():
+                continue
+            baseline = analyze_branches(baseline_path, args.channels, args.sample_rate)
+            for row, previous, score in find_cost_regressions(
+                    results[jsfx_path.name], baseline, threshold=args.threshold):
+                regressions.append((jsfx_path.name, row, previous, score))
+
+    print(f"\nCompared against {args.baseline}: {len(regressions)} regression(s)")
+    for name, row, previous, score in regressions:
+        config = " ".join(f"{k}={v:g}" for k, v in row['sliders'].items())
+        print(f"  REGRESSION {name} {config} {row['num_ch']}ch: "
+              f"score {previous} -> {score} ({score / previous - 1:+.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
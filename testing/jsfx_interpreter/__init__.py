@@ -0,0 +1,12 @@
+"""
+Headless JSFX interpreter for the subset of EEL2 our plugins use.
+
+Parses an effect and its imports, compiles @init/@slider/@block/@sample to
+Python and runs them with REAPER's host semantics, so effects can be
+rendered without launching REAPER.
+"""
+
+from .lexer import JSFXSyntaxError
+from .compiler import JSFXCompileError
+from .effect import DEFAULT_BLOCK_SIZE, CompiledEffect, JSFXEffect, compile_effect, process
+from .renderer import InterpreterRenderer
@@ -0,0 +1,634 @@
+"""
+Compiler from parsed EEL2 sections to Python source.
+
+Every section becomes one Python function
+
+    def section_<name>(S, M, frames):
+
+where S is the effect's variable dict (lower-case EEL2 names), M its local
+memory and frames a list of per-sample channel lists. EEL2 globals are
+loaded into Python locals on entry and stored back on exit, user functions
+are inlined at every call site with their `this.` namespace resolved, and
+expression values are threaded through temporaries so that every EEL2
+expression - assignments, ternaries, blocks - still yields a value. The
+@sample section wraps its body in a loop over the frames, with splN bound
+to the frame's channel slots.
+"""
+
+import re
+from contextlib import contextmanager
+
+from . import runtime
+from .lexer import JSFXSyntaxError
+
+
+SPL_PATTERN = re.compile(r'^spl(\d+)$')
+
+# Deepest chain of nested user-function calls that is inlined
+MAX_INLINE_DEPTH = 64
+
+# Width of the scratch frame non-@sample sections see as spl0..splN
+SCRATCH_CHANNELS = 64
+
+# EEL2 builtin -> (Python expression template, argument count)
+BUILTINS = {
+    'sin': ('_sin({0})', 1),
+    'cos': ('_cos({0})', 1),
+    'tan': ('_tan({0})', 1),
+    'asin': ('_asin({0})', 1),
+    'acos': ('_acos({0})', 1),
+    'atan': ('_atan({0})', 1),
+    'atan2': ('_atan2({0}, {1})', 2),
+    'sqrt': ('_sqrt({0})', 1),
+    'exp': ('_exp({0})', 1),
+    'log': ('_log({0})', 1),
+    'log10': ('_log10({0})', 1),
+    'pow': ('_pow({0}, {1})', 2),
+    'abs': ('abs({0})', 1),
+    'min': ('min({0}, {1})', 2),
+    'max': ('max({0}, {1})', 2),
+    'sign': ('_sign({0})', 1),
+    'floor': ('_floor({0})', 1),
+    'ceil': ('_ceil({0})', 1),
+    # The argument is bound to a temporary first (see call()); ** 2 would
+    # raise OverflowError where EEL2 gives inf
+    'sqr': ('({0} * {0})', 1),
+    'invsqrt': ('_invsqrt({0})', 1),
+    'rand': ('_rand({0})', 1),
+    'spl': ('_spl_get(fr, {0})', 1),
+    'memset': ('_memset(M, {0}, {1}, {2})', 3),
+    'memcpy': ('_memcpy(M, {0}, {1}, {2})', 3),
+}
+
+# Builtins whose calls must be kept even when their value is unused
+SIDE_EFFECT_BUILTINS = ('memset', 'memcpy', 'rand')
+
+ARITHMETIC = {
+    '+': '({0} + {1})',
+    '-': '({0} - {1})',
+    '*': '({0} * {1})',
+    '/': '_div({0}, {1})',
+    '%': '_mod({0}, {1})',
+    '^': '_pow({0}, {1})',
+    '|': '_bor({0}, {1})',
+    '&': '_band({0}, {1})',
+    '~': '_bxor({0}, {1})',
+    '<<': '_shl({0}, {1})',
+    '>>': '_shr({0}, {1})',
+}
+
+COMPARISONS = {
+    '<': '({0} < {1})',
+    '>': '({0} > {1})',
+    '<=': '({0} <= {1})',
+    '>=': '({0} >= {1})',
+    '===': '({0} == {1})',
+    '!==': '({0} != {1})',
+    '==': f'(abs({{0}} - {{1}}) < {runtime.CLOSE_FACTOR!r})',
+    '!=': f'(abs({{0}} - {{1}}) >= {runtime.CLOSE_FACTOR!r})',
+}
+
+# Names generated code can use, bound when the module is executed
+RUNTIME_NAMES = {
+    '_div': runtime.div,
+    '_mod': runtime.mod,
+    '_pow': runtime.power,
+    '_bor': runtime.bitwise_or,
+    '_band': runtime.bitwise_and,
+    '_bxor': runtime.bitwise_xor,
+    '_shl': runtime.shift_left,
+    '_shr': runtime.shift_right,
+    '_sin': runtime.sin,
+    '_cos': runtime.cos,
+    '_tan': runtime.tan,
+    '_asin': runtime.asin,
+    '_acos': runtime.acos,
+    '_atan': runtime.math.atan,
+    '_atan2': runtime.math.atan2,
+    '_sqrt': runtime.sqrt,
+    '_exp': runtime.exp,
+    '_log': runtime.log,
+    '_log10': runtime.log10,
+    '_sign': runtime.sign,
+    '_floor': runtime.floor,
+    '_ceil': runtime.ceil,
+    '_invsqrt': runtime.invsqrt,
+    '_rand': runtime.rand,
+    '_mem_index': runtime.mem_index,
+    '_memset': runtime.memset,
+    '_memcpy': runtime.memcpy,
+    '_spl_get': runtime.spl_get,
+    '_spl_set': runtime.spl_set,
+    '_loop_count': runtime.loop_count,
+    '_LOOP': range(runtime.LOOP_LIMIT),
+}
+
+
+class JSFXCompileError(JSFXSyntaxError):
+    """Valid syntax the compiler can't translate (unknown function, recursion, ...)."""
+
+
+class Context:
+    """Name scope of the code being compiled: top level or an inlined function."""
+
+    __slots__ = ('namespace', 'locals', 'instances', 'stack')
+
+    def __init__(self, namespace='', locals_=None, instances=(), stack=()):
+        self.namespace = namespace
+        self.locals = locals_ or {}
+        self.instances = frozenset(instances)
+        self.stack = stack
+
+
+def _join(namespace, name):
+    return f"{namespace}.{name}" if namespace else name
+
+
+def qualify(name, ctx):
+    """
+    Global EEL2 variable a name refers to in a scope.
+
+    `this.x` is x in the scope's namespace, and so is any name whose first
+    component was declared with instance(); other names are global as-is.
+    """
+    if name == 'this':
+        return ctx.namespace
+    if name.startswith('this.'):
+        return _join(ctx.namespace, name[5:])
+    if name.split('.')[0] in ctx.instances:
+        return _join(ctx.namespace, name)
+    return name
+
+
+def call_target(name, functions, ctx):
+    """
+    Resolve a call to a user function.
+
+    `ns.func()` calls func with `this` = ns (qualified like a variable);
+    a plain `func()` inherits the caller's namespace.
+
+    Returns:
+        Tuple of (FunctionDef, namespace), or None if no such function
+    """
+    if name in functions:
+        return functions[name], ctx.namespace
+    if '.' in name:
+        prefix, short = name.rsplit('.', 1)
+        if short in functions:
+            return functions[short], qualify(prefix, ctx)
+    return None
+
+
+def python_name(name):
+    """Python identifier of an EEL2 global (dots become '_D_')."""
+    if not re.match(r'^[a-z_][a-z0-9_.]*$', name):
+        raise JSFXCompileError(f"Unsupported variable name '{name}'")
+    return 'g_' + name.replace('.', '_D_')
+
+
+def _literal(value):
+    return repr(float(value))
+
+
+def _is_literal(expr):
+    try:
+        float(expr)
+    except ValueError:
+        return False
+    return True
+
+
+class SectionCompiler:
+    """Translate one parsed section into the source of a Python function."""
+
+    def __init__(self, functions, source_name=None):
+        """
+        Initialize section compiler.
+
+        Args:
+            functions: Dict of FunctionDef from the parser
+            source_name: Effect name used in error messages
+        """
+        self.functions = functions
+        self.source_name = source_name
+        self.lines = []
+        self.depth = 1
+        self.counter = 0
+        self.globals_used = {}
+        self.globals_written = set()
+        self.local_names = []
+        self.max_spl = -1
+
+    def _error(self, message):
+        return JSFXCompileError(message, source_name=self.source_name)
+
+    # Output helpers
+
+    def emit(self, line):
+        self.lines.append('    ' * self.depth + line)
+
+    @contextmanager
+    def indented(self):
+        start = len(self.lines)
+        self.depth += 1
+        try:
+            yield
+        finally:
+            if len(self.lines) == start:
+                self.emit('pass')
+            self.depth -= 1
+
+    def temp(self):
+        self.counter += 1
+        return f"t{self.counter}"
+
+    def new_local(self, name):
+        self.counter += 1
+        local = f"l{self.counter}_{re.sub(r'[^a-z0-9_]', '_', name)}"
+        self.local_names.append(local)
+        return local
+
+    # Names
+
+    def resolve(self, name, ctx):
+        """
+        Classify a variable reference.
+
+        Returns:
+            ('const', literal), ('local', python_name), ('spl', channel) or
+            ('global', python_name)
+        """
+        if name in runtime.CONSTANTS:
+            return 'const', _literal(runtime.CONSTANTS[name])
+        if name.startswith('$'):
+            raise self._error(f"Unsupported constant '{name}'")
+        if name in ctx.locals:
+            return 'local', ctx.locals[name]
+
+        match = SPL_PATTERN.match(name)
+        if match:
+            channel = int(match.group(1))
+            self.max_spl = max(self.max_spl, channel)
+            return 'spl', channel
+
+        full = qualify(name, ctx)
+        if not full:
+            raise self._error("'this' used outside a namespace")
+
+        py = python_name(full)
+        self.globals_used.setdefault(py, full)
+        return 'global', py
+
+    # Classification
+
+    def inline(self, node):
+        """True if the node compiles to a single expression without statements."""
+        kind = node[0]
+        if kind in ('num', 'str', 'var'):
+            return True
+        if kind == 'index':
+            return self.inline(node[1]) and self.inline(node[2])
+        if kind == 'unop':
+            return self.inline(node[2])
+        if kind == 'binop':
+            return self.inline(node[2]) and self.inline(node[3])
+        if kind == 'ternary':
+            return all(self.inline(n) for n in node[1:] if n is not None)
+        if kind == 'seq':
+            return len(node[1]) == 0 or (len(node[1]) == 1 and self.inline(node[1][0]))
+        if kind == 'call':
+            return node[1] in BUILTINS and all(self.inline(arg) for arg in node[2])
+        return False
+
+    def has_side_effects(self, node):
+        kind = node[0]
+        if kind in ('assign', 'while', 'loop'):
+            return True
+        if kind == 'call':
+            if node[1] not in BUILTINS or node[1] in SIDE_EFFECT_BUILTINS:
+                return True
+            return any(self.has_side_effects(arg) for arg in node[2])
+        if kind == 'seq':
+            return any(self.has_side_effects(item) for item in node[1])
+        return any(self.has_side_effects(child) for child in node[1:]
+                   if isinstance(child, tuple))
+
+    # Expressions
+
+    def values(self, nodes, ctx):
+        """
+        Compile several operands left to right.
+
+        An operand is copied to a temporary when a later operand emits
+        statements, so it keeps the value it had when it was evaluated.
+        """
+        exprs = []
+        for i, node in enumerate(nodes):
+            expr = self.value(node, ctx)
+            later_emits = any(not self.inline(n) for n in nodes[i + 1:])
+            if later_emits and not _is_literal(expr):
+                tmp = self.temp()
+                self.emit(f"{tmp} = {expr}")
+                expr = tmp
+            exprs.append(expr)
+        return exprs
+
+    def value(self, node, ctx):
+        """Compile a node for its value; returns a Python expression."""
+        kind = node[0]
+
+        if kind == 'num':
+            return _literal(node[1])
+
+        if kind == 'str':
+            raise self._error("Strings are only supported in @gfx")
+
+        if kind == 'var':
+            scope, name = self.resolve(node[1], ctx)
+            return f"fr[{name}]" if scope == 'spl' else name
+
+        if kind == 'index':
+            base, index = self.values([node[1], node[2]], ctx)
+            return f"M[_mem_index({base} + {index})]"
+
+        if kind == 'unop':
+            op, operand = node[1], node[2]
+            if op == '!':
+                return f"(0.0 if {self.test(operand, ctx)} else 1.0)"
+            expr = self.value(operand, ctx)
+            return f"(-{expr})" if op == '-' else expr
+
+        if kind == 'binop':
+            op = node[1]
+            if op in ARITHMETIC:
+                left, right = self.values([node[2], node[3]], ctx)
+                if op == '/' and _is_literal(right) and float(right) != 0:
+                    return f"({left} / {right})"
+                return ARITHMETIC[op].format(left, right)
+            return f"(1.0 if {self.test(node, ctx)} else 0.0)"
+
+        if kind == 'assign':
+            return self.assign(node, ctx)
+
+        if kind == 'ternary':
+            _, cond, then, otherwise = node
+            otherwise = otherwise or ('num', 0.0)
+            test = self.test(cond, ctx)
+            if self.inline(then) and self.inline(otherwise):
+                return f"({self.value(then, ctx)} if {test} else {self.value(otherwise, ctx)})"
+            tmp = self.temp()
+            self.emit(f"if {test}:")
+            with self.indented():
+                self.emit(f"{tmp} = {self.value(then, ctx)}")
+            self.emit("else:")
+            with self.indented():
+                self.emit(f"{tmp} = {self.value(otherwise, ctx)}")
+            return tmp
+
+        if kind == 'seq':
+            items = node[1]
+            if not items:
+                return '0.0'
+            for item in items[:-1]:
+                self.effect(item, ctx)
+            return self.value(items[-1], ctx)
+
+        if kind in ('while', 'loop'):
+            self.effect(node, ctx)
+            return '0.0'
+
+        if kind == 'call':
+            return self.call(node, ctx, want_value=True)
+
+        raise self._error(f"Unknown node {kind}")
+
+    def test(self, node, ctx):
+        """Compile a node as a condition; returns a Python boolean expression."""
+        kind = node[0]
+
+        if kind == 'num':
+            return 'True' if abs(node[1]) >= runtime.CLOSE_FACTOR else 'False'
+
+        if kind == 'seq':
+            if not node[1]:
+                return 'False'
+            for item in node[1][:-1]:
+                self.effect(item, ctx)
+            return self.test(node[1][-1], ctx)
+
+        if kind == 'unop' and node[1] == '!':
+            return f"(not {self.test(node[2], ctx)})"
+
+        if kind == 'binop' and node[1] in COMPARISONS:
+            left, right = self.values([node[2], node[3]], ctx)
+            return COMPARISONS[node[1]].format(left, right)
+
+        if kind == 'binop' and node[1] in ('&&', '||'):
+            op, left, right = node[1], node[2], node[3]
+            left_test = self.test(left, ctx)
+            if self.inline(right):
+                joiner = 'and' if op == '&&' else 'or'
+                return f"({left_test} {joiner} {self.test(right, ctx)})"
+            tmp = self.temp()
+            self.emit(f"{tmp} = {left_test}")
+            self.emit(f"if {tmp}:" if op == '&&' else f"if not {tmp}:")
+            with self.indented():
+                self.emit(f"{tmp} = {self.test(right, ctx)}")
+            return tmp
+
+        return f"(abs({self.value(node, ctx)}) >= {runtime.CLOSE_FACTOR!r})"
+
+    def assign(self, node, ctx):
+        """Compile an assignment; returns an expression holding the new value."""
+        _, op, target, value_node = node
+
+        if target[0] == 'var':
+            scope, name = self.resolve(target[1], ctx)
+            if scope == 'const':
+                raise self._error(f"Cannot assign to constant '{target[1]}'")
+            if scope == 'spl':
+                name = f"fr[{name}]"
+            elif scope == 'global':
+                self.globals_written.add(name)
+            value = self.value(value_node, ctx)
+            if op != '=':
+                value = ARITHMETIC[op[:-1]].format(name, value)
+            self.emit(f"{name} = {value}")
+            return name
+
+        if target[0] == 'call':
+            # spl(channel) = value
+            channel, value = self.values([target[2][0], value_node], ctx)
+            if op != '=':
+                value = ARITHMETIC[op[:-1]].format(f"_spl_get(fr, {channel})", value)
+            tmp = self.temp()
+            self.emit(f"{tmp} = _spl_set(fr, {channel}, {value})")
+            return tmp
+
+        base, index = self.values([target[1], target[2]], ctx)
+        slot = self.temp()
+        self.emit(f"{slot} = _mem_index({base} + {index})")
+        value = self.value(value_node, ctx)
+        if op != '=':
+            value = ARITHMETIC[op[:-1]].format(f"M[{slot}]", value)
+        self.emit(f"M[{slot}] = {value}")
+        return f"M[{slot}]"
+
+    def call(self, node, ctx, want_value):
+        """Compile a builtin call or inline a user function."""
+        _, name, args = node
+
+        if name in BUILTINS:
+            template, count = BUILTINS[name]
+            if name == 'rand' and not args:
+                args = [('num', 1.0)]
+            if len(args) != count:
+                raise self._error(f"{name}() takes {count} argument(s), got {len(args)}")
+            values = self.values(args, ctx)
+            if name == 'sqr':
+                tmp = self.temp()
+                self.emit(f"{tmp} = {values[0]}")
+                values = [tmp]
+            return template.format(*values)
+
+        target = call_target(name, self.functions, ctx)
+        if target is None:
+            raise self._error(f"Unknown function '{name}'")
+        function, namespace = target
+
+        if function.name in ctx.stack:
+            raise self._error(f"Recursive call to '{function.name}'")
+        if len(ctx.stack) >= MAX_INLINE_DEPTH:
+            raise self._error(f"Calls nested deeper than {MAX_INLINE_DEPTH}")
+        if len(args) != len(function.params):
+            raise self._error(f"{function.name}() takes {len(function.params)} "
+                              f"argument(s), got {len(args)}")
+
+        arg_values = self.values(args, ctx)
+        locals_ = {}
+        for local in dict.fromkeys(function.params + function.locals):
+            locals_[local] = self.new_local(local)
+        for param, expr in zip(function.params, arg_values):
+            self.emit(f"{locals_[param]} = {expr}")
+
+        inner = Context(namespace, locals_, function.instances, ctx.stack + (function.name,))
+        if not want_value:
+            self.effect(function.body, inner)
+            return None
+
+        result = self.value(function.body, inner)
+        if _is_literal(result) or result in locals_.values():
+            return result
+        tmp = self.temp()
+        self.emit(f"{tmp} = {result}")
+        return tmp
+
+    # Statements
+
+    def effect(self, node, ctx):
+        """Compile a node whose value is discarded."""
+        kind = node[0]
+
+        if kind == 'assign':
+            self.assign(node, ctx)
+            return
+
+        if kind == 'seq':
+            for item in node[1]:
+                self.effect(item, ctx)
+            return
+
+        if kind == 'ternary':
+            _, cond, then, otherwise = node
+            test = self.test(cond, ctx)
+            self.emit(f"if {test}:")
+            with self.indented():
+                self.effect(then, ctx)
+            if otherwise is not None and self.has_side_effects(otherwise):
+                self.emit("else:")
+                with self.indented():
+                    self.effect(otherwise, ctx)
+            return
+
+        if kind == 'while':
+            _, cond, body = node
+            self.emit("for _ in _LOOP:")
+            with self.indented():
+                if cond is None:
+                    self.emit(f"if not {self.test(body, ctx)}:")
+                else:
+                    self.emit(f"if not {self.test(cond, ctx)}:")
+                with self.indented():
+                    self.emit("break")
+                if cond is not None:
+                    self.effect(body, ctx)
+            return
+
+        if kind == 'loop':
+            _, count, body = node
+            self.emit(f"for _ in range(_loop_count({self.value(count, ctx)})):")
+            with self.indented():
+                self.effect(body, ctx)
+            return
+
+        if kind == 'call' and node[1] not in BUILTINS:
+            self.call(node, ctx, want_value=False)
+            return
+
+        if self.has_side_effects(node):
+            self.emit(self.value(node, ctx))
+
+    # Section
+
+    def compile(self, name, body, sample_loop=False):
+        """
+        Produce the source of a section function.
+
+        Args:
+            name: Section name (init, slider, block, sample)
+            body: Parsed section
+            sample_loop: Run the body once per frame
+
+        Returns:
+            Python source text
+        """
+        if sample_loop:
+            self.depth = 2
+        self.effect(body, Context())
+        body_lines = self.lines
+
+        lines = [f"def section_{name}(S, M, frames):"]
+        for py, eel in sorted(self.globals_used.items()):
+            lines.append(f"    {py} = S.get({eel!r}, 0.0)")
+        for local in self.local_names:
+            lines.append(f"    {local} = 0.0")
+        if sample_loop:
+            lines.append("    for fr in frames:")
+        else:
+            lines.append("    fr = frames")
+        lines.extend(body_lines or ['    ' * self.depth + 'pass'])
+        for py in sorted(self.globals_written):
+            lines.append(f"    S[{self.globals_used[py]!r}] = {py}")
+        return '\n'.join(lines) + '\n'
+
+
+def compile_sections(sections, functions, source_name=None):
+    """
+    Compile parsed sections into one Python module.
+
+    Args:
+        sections: Dict of section name -> parsed body
+        functions: Dict of FunctionDef from the parser
+        source_name: Effect name used in error messages
+
+    Returns:
+        Tuple of (module source, dict of section name -> highest static splN
+        index used, or -1)
+    """
+    sources = []
+    max_spl = {}
+    for name, body in sections.items():
+        compiler = SectionCompiler(functions, source_name)
+        sources.append(compiler.compile(name, body, sample_loop=(name == 'sample')))
+        max_spl[name] = compiler.max_spl
+    return '\n\n'.join(sources), max_spl
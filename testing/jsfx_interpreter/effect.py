@@ -0,0 +1,297 @@
+"""
+Loading, compiling and running JSFX effects.
+"""
+
+import hashlib
+import re
+import numpy as np
+from pathlib import Path
+
+from jsfx_metadata import IMPORT_PATTERN, find_effect, find_import, find_slider, parse_slider
+
+from . import runtime
+from .compiler import RUNTIME_NAMES, SCRATCH_CHANNELS, compile_sections
+from .parser import parse_section
+
+
+# Sections that are compiled and run; anything else (@gfx, @serialize) is skipped
+AUDIO_SECTIONS = ('init', 'slider', 'block', 'sample')
+
+SECTION_PATTERN = re.compile(r'^@(\w+)')
+
+# Samples per @block call, like a typical REAPER buffer
+DEFAULT_BLOCK_SIZE = 512
+
+# Compiled effects by source hash
+_COMPILED = {}
+
+
+class SourceFile:
+    """One .jsfx / .jsfx-inc file split into header and sections."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.text = self.path.read_text(errors='replace')
+        self.header = []
+        self.sections = []
+
+        current = None
+        for line_no, line in enumerate(self.text.splitlines(), 1):
+            match = SECTION_PATTERN.match(line)
+            if match:
+                current = (match.group(1).lower(), line_no + 1, [])
+                self.sections.append(current)
+            elif current is None:
+                self.header.append(line)
+            else:
+                current[2].append(line)
+
+    def imports(self):
+        return IMPORT_PATTERN.findall('\n'.join(self.header))
+
+    def sliders(self):
+        return [slider for slider in map(parse_slider, self.header) if slider is not None]
+
+
+def load_sources(jsfx_path, effects_dir=None):
+    """
+    Load an effect and its imports.
+
+    The effect and its imports are looked up with jsfx_metadata.find_effect()
+    and find_import(), and ordered so that every file comes after the files
+    it imports (the order REAPER concatenates their sections in).
+
+    Args:
+        jsfx_path: Path to JSFX effect file, or an effect name
+        effects_dir: Optional extra directory to search for the effect and
+                     its imports
+
+    Returns:
+        List of SourceFile, imports first, the effect itself last
+
+    Raises:
+        FileNotFoundError: If the effect or one of its imports can't be found
+    """
+    ordered = []
+    seen = set()
+
+    def visit(path):
+        source = SourceFile(path)
+        for name in source.imports():
+            found = find_import(name, source.path, effects_dir)
+            if found is None:
+                raise FileNotFoundError(f"{source.path.name}: import '{name}' not found")
+            if found.resolve() not in seen:
+                seen.add(found.resolve())
+                visit(found)
+        ordered.append(source)
+
+    path = find_effect(jsfx_path, effects_dir)
+    if path is None:
+        raise FileNotFoundError(f"JSFX effect not found: {jsfx_path}")
+    visit(path)
+    return ordered
+
+
+class CompiledEffect:
+    """The compiled, stateless form of an effect, shared by its instances."""
+
+    def __init__(self, name, sliders, module_source, max_spl, source_hash):
+        self.name = name
+        self.sliders = sliders
+        self.module_source = module_source
+        self.source_hash = source_hash
+        self.max_spl = max_spl
+
+        namespace = dict(RUNTIME_NAMES)
+        exec(compile(module_source, f"<jsfx {name}>", 'exec'), namespace)
+        self.sections = {section: namespace[f"section_{section}"] for section in max_spl}
+
+    def slider(self, name):
+        """Look up a slider by variable name (case-insensitive) or 'sliderN'."""
+        return find_slider(self.sliders, name)
+
+
+def parse_sources(sources):
+    """
+    Parse the audio sections of an effect and its imports.
+
+    Args:
+        sources: SourceFile list from load_sources()
+
+    Returns:
+        Tuple of (dict of section name -> ('seq', [...]) over all files in
+        import order, dict of FunctionDef by name)
+    """
+    functions = {}
+    sections = {name: [] for name in AUDIO_SECTIONS}
+    for source in sources:
+        for name, first_line, lines in source.sections:
+            if name not in sections:
+                continue
+            sections[name].extend(
+                parse_section('\n'.join(lines), first_line, source.path.name, functions)[1]
+            )
+    return {name: ('seq', items) for name, items in sections.items()}, functions
+
+
+def compile_effect(jsfx_path, effects_dir=None):
+    """
+    Parse and compile an effect, reusing an earlier compile of the same source.
+
+    Args:
+        jsfx_path: Path to JSFX effect file
+        effects_dir: Optional extra directory to search for imports
+
+    Returns:
+        CompiledEffect
+    """
+    sources = load_sources(jsfx_path, effects_dir)
+
+    hasher = hashlib.sha256()
+    for source in sources:
+        hasher.update(f"\0{source.path.name}\0".encode())
+        hasher.update(source.text.encode())
+    source_hash = hasher.hexdigest()
+    if source_hash in _COMPILED:
+        return _COMPILED[source_hash]
+
+    sections, functions = parse_sources(sources)
+    effect = sources[-1]
+    module_source, max_spl = compile_sections(sections, functions, effect.path.name)
+    compiled = CompiledEffect(effect.path.stem, effect.sliders(), module_source, max_spl,
+                              source_hash)
+    _COMPILED[source_hash] = compiled
+    return compiled
+
+
+class JSFXEffect:
+    """
+    A running instance of an effect: its variables, memory and sliders.
+
+    The host sequence follows REAPER: @init then @slider when the effect is
+    (re)initialised, @slider again whenever sliders change, and @block
+    before each block of @sample calls.
+    """
+
+    def __init__(self, jsfx_path, slider_values=None, sample_rate=48000, num_channels=2,
+                 effects_dir=None):
+        """
+        Load an effect and initialise it.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            slider_values: Dict of slider values (missing sliders use defaults)
+            sample_rate: Sample rate in Hz (srate)
+            num_channels: Channel count reported to the effect (num_ch)
+            effects_dir: Optional extra directory to search for imports
+        """
+        self.compiled = compile_effect(jsfx_path, effects_dir)
+        self.reset(sample_rate, num_channels, slider_values)
+
+    def _run(self, section, frames=None):
+        if frames is None:
+            frames = [0.0] * SCRATCH_CHANNELS
+        self.compiled.sections[section](self.vars, self.mem, frames)
+
+    def reset(self, sample_rate=None, num_channels=None, slider_values=None):
+        """
+        Clear all state and run @init and @slider, as on playback start.
+
+        Args:
+            sample_rate: New sample rate (default: keep the current one)
+            num_channels: New channel count (default: keep the current one)
+            slider_values: Slider values to apply before @init (default:
+                           keep the current ones)
+        """
+        previous = getattr(self, 'vars', {})
+        self.sample_rate = sample_rate or self.sample_rate
+        self.num_channels = num_channels or self.num_channels
+
+        sliders = {s.variable: previous.get(s.variable, s.default) for s in self.compiled.sliders}
+        for name, value in (slider_values or {}).items():
+            sliders[self.compiled.slider(name).variable] = float(value)
+
+        self.vars = dict(sliders)
+        self.vars.update(srate=float(self.sample_rate), num_ch=float(self.num_channels),
+                         samplesblock=float(DEFAULT_BLOCK_SIZE))
+        self.mem = runtime.new_memory()
+        self._run('init')
+        self._run('slider')
+
+    def set_sliders(self, slider_values):
+        """
+        Change slider values and run @slider.
+
+        Args:
+            slider_values: Dict of slider name -> value
+        """
+        for name, value in slider_values.items():
+            self.vars[self.compiled.slider(name).variable] = float(value)
+        self._run('slider')
+
+    @property
+    def slider_values(self):
+        """Current slider values by declared name."""
+        return {s.name or s.variable: self.vars.get(s.variable, s.default)
+                for s in self.compiled.sliders}
+
+    def __getitem__(self, name):
+        """Current value of an EEL2 variable (0 if never assigned)."""
+        return self.vars.get(str(name).lower(), 0.0)
+
+    def process(self, samples, block_size=DEFAULT_BLOCK_SIZE):
+        """
+        Run samples through @block/@sample, continuing from the current state.
+
+        Args:
+            samples: numpy array of shape (num_samples, channels) or (num_samples,)
+            block_size: Samples per @block call
+
+        Returns:
+            numpy array with the shape of samples
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        mono = samples.ndim == 1
+        frames_in = samples.reshape(len(samples), -1)
+        channels = frames_in.shape[1]
+        if channels != self.num_channels:
+            self.num_channels = channels
+            self.vars['num_ch'] = float(channels)
+
+        # Slots for every splN the code names, even beyond the input's channels
+        width = max(channels, self.compiled.max_spl['sample'] + 1)
+        padded = np.zeros((len(frames_in), width))
+        padded[:, :channels] = frames_in
+        frames = padded.tolist()
+
+        for start in range(0, len(frames), block_size):
+            block = frames[start:start + block_size]
+            self.vars['samplesblock'] = float(len(block))
+            self._run('block')
+            self._run('sample', block)
+
+        out = np.array(frames, dtype=np.float64).reshape(len(frames), width)[:, :channels]
+        return out.reshape(samples.shape)
+
+
+def process(samples, jsfx_path, slider_values=None, sample_rate=48000, effects_dir=None,
+            block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Process a signal through a freshly initialised effect.
+
+    Args:
+        samples: numpy array of shape (num_samples, channels)
+        jsfx_path: Path to JSFX effect file
+        slider_values: Dict of slider values (missing sliders use defaults)
+        sample_rate: Sample rate in Hz (srate)
+        effects_dir: Optional extra directory to search for imports
+        block_size: Samples per @block call
+
+    Returns:
+        numpy array of the same shape
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    effect = JSFXEffect(jsfx_path, slider_values, sample_rate, channels, effects_dir)
+    return effect.process(samples, block_size)
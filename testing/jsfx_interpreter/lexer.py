@@ -0,0 +1,94 @@
+"""
+Tokenizer for the EEL2 subset used by our JSFX plugins.
+"""
+
+import re
+
+
+class JSFXSyntaxError(ValueError):
+    """Source that can't be tokenized or parsed."""
+
+    def __init__(self, message, line=None, source_name=None):
+        location = ""
+        if source_name is not None:
+            location += f"{source_name}:"
+        if line is not None:
+            location += f"{line}: "
+        elif location:
+            location += " "
+        super().__init__(location + message)
+        self.line = line
+        self.source_name = source_name
+
+
+# Longest operators first so '===' wins over '==' and '=' etc.
+OPERATORS = (
+    '===', '!==', '<<=', '>>=',
+    '+=', '-=', '*=', '/=', '%=', '^=', '|=', '&=', '~=',
+    '==', '!=', '<=', '>=', '&&', '||', '<<', '>>',
+    '+', '-', '*', '/', '%', '^', '=', '<', '>', '!', '?', ':', ';', ',',
+    '(', ')', '[', ']', '|', '&', '~',
+)
+
+TOKEN_PATTERN = re.compile(r'''
+    (?P<space>[ \t\r\f\v]+)
+  | (?P<newline>\n)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<hex>0[xX][0-9a-fA-F]+)
+  | (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_$#][A-Za-z0-9_.]*)
+  | (?P<str>"(?:[^"\\\n]|\\.)*")
+  | (?P<op>''' + '|'.join(re.escape(op) for op in OPERATORS) + r''')
+''', re.VERBOSE | re.DOTALL)
+
+
+class Token:
+    """A lexical token: kind is 'num', 'name', 'str', 'op' or 'eof'."""
+
+    __slots__ = ('kind', 'value', 'line')
+
+    def __init__(self, kind, value, line):
+        self.kind = kind
+        self.value = value
+        self.line = line
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value!r}, line {self.line})"
+
+
+def tokenize(text, first_line=1, source_name=None):
+    """
+    Split EEL2 code into tokens.
+
+    Args:
+        text: Code section text
+        first_line: Line number of the first line of text (for messages)
+        source_name: File name used in error messages
+
+    Returns:
+        List of Token, ending with an 'eof' token
+    """
+    tokens = []
+    line = first_line
+    pos = 0
+
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if match is None:
+            raise JSFXSyntaxError(f"Unexpected character {text[pos]!r}", line, source_name)
+
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'hex':
+            tokens.append(Token('num', float(int(value, 16)), line))
+        elif kind == 'num':
+            tokens.append(Token('num', float(value), line))
+        elif kind in ('name', 'str', 'op'):
+            tokens.append(Token(kind, value, line))
+
+        line += value.count('\n')
+        pos = match.end()
+
+    tokens.append(Token('eof', None, line))
+    return tokens
@@ -0,0 +1,321 @@
+"""
+Parser for the EEL2 subset used by our JSFX plugins.
+
+Code is parsed into tuples whose first element is the node kind:
+
+    ('num', value)
+    ('str', text)                     string literal or #string slot
+    ('var', name)                     name is lower-case, may contain dots
+    ('index', base, index)            base[index], i.e. mem[base + index]
+    ('call', name, [args])
+    ('unop', op, operand)             '-', '+', '!'
+    ('binop', op, left, right)
+    ('assign', op, target, value)     '=', '+=', '-=', ...
+    ('ternary', cond, then, else)     else is None for `cond ? then`
+    ('seq', [items])                  value of the last item
+    ('while', cond, body)             cond is None for the do-while form
+    ('loop', count, body)
+
+Function definitions are collected separately, keyed by lower-case name,
+because EEL2 functions are visible to every section once defined.
+"""
+
+from .lexer import JSFXSyntaxError, tokenize
+
+
+ASSIGN_OPS = ('=', '+=', '-=', '*=', '/=', '%=', '^=', '|=', '&=', '~=')
+COMPARE_OPS = ('==', '!=', '===', '!==', '<', '>', '<=', '>=')
+BITWISE_OPS = ('|', '&', '~')
+SHIFT_OPS = ('<<', '>>')
+
+NOOP = ('seq', [])
+
+
+class FunctionDef:
+    """A user function: parameters, local()/instance() names and body."""
+
+    __slots__ = ('name', 'params', 'locals', 'instances', 'body')
+
+    def __init__(self, name, params, locals_, instances, body):
+        self.name = name
+        self.params = params
+        self.locals = locals_
+        self.instances = instances
+        self.body = body
+
+
+class Parser:
+    """Recursive-descent parser over the token list of one code section."""
+
+    def __init__(self, text, first_line=1, source_name=None, functions=None):
+        """
+        Initialize parser.
+
+        Args:
+            text: Code section text
+            first_line: Line number of the first line of text
+            source_name: File name used in error messages
+            functions: Dict collecting function definitions (shared between
+                       sections); a new dict if omitted
+        """
+        self.tokens = tokenize(text, first_line, source_name)
+        self.pos = 0
+        self.source_name = source_name
+        self.functions = {} if functions is None else functions
+
+    # Token helpers
+
+    @property
+    def current(self):
+        return self.tokens[self.pos]
+
+    def _error(self, message, token=None):
+        token = token or self.current
+        return JSFXSyntaxError(message, token.line, self.source_name)
+
+    def _at(self, *ops):
+        token = self.current
+        return token.kind == 'op' and token.value in ops
+
+    def _advance(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _expect(self, op):
+        if not self._at(op):
+            found = self.current.value if self.current.kind != 'eof' else 'end of section'
+            raise self._error(f"Expected '{op}', found {found!r}")
+        return self._advance()
+
+    def _expect_name(self):
+        token = self.current
+        if token.kind != 'name':
+            raise self._error(f"Expected a name, found {token.value!r}")
+        self.pos += 1
+        return token.value.lower()
+
+    # Grammar
+
+    def parse(self):
+        """
+        Parse the whole section.
+
+        Returns:
+            ('seq', [...]) node
+        """
+        body = self._sequence(stops=())
+        if self.current.kind != 'eof':
+            raise self._error(f"Unexpected {self.current.value!r}")
+        return body
+
+    def _sequence(self, stops):
+        """Statements separated by ';' up to one of the stop operators."""
+        items = []
+        while self.current.kind != 'eof' and not self._at(*stops):
+            if self._at(';'):
+                self._advance()
+                continue
+            if self.current.kind == 'name' and self.current.value.lower() == 'function':
+                # Definitions need no trailing ';'
+                self._advance()
+                self._function_def()
+                continue
+            items.append(self._assignment())
+            if not (self._at(';') or self._at(*stops) or self.current.kind == 'eof'):
+                raise self._error(f"Expected ';', found {self.current.value!r}")
+        return ('seq', items)
+
+    def _block(self):
+        """A parenthesised statement sequence."""
+        self._expect('(')
+        body = self._sequence(stops=(')',))
+        self._expect(')')
+        return body
+
+    def _assignment(self):
+        target = self._ternary()
+        if self._at(*ASSIGN_OPS):
+            token = self._advance()
+            if not (target[0] in ('var', 'index')
+                    or (target[0] == 'call' and target[1] == 'spl' and len(target[2]) == 1)):
+                raise self._error(f"Cannot assign to this expression with '{token.value}'", token)
+            return ('assign', token.value, target, self._assignment())
+        return target
+
+    def _ternary(self):
+        cond = self._logical_or()
+        if not self._at('?'):
+            return cond
+        self._advance()
+        then = self._assignment()
+        otherwise = None
+        if self._at(':'):
+            self._advance()
+            otherwise = self._assignment()
+        return ('ternary', cond, then, otherwise)
+
+    def _left_assoc(self, operand, ops):
+        left = operand()
+        while self._at(*ops):
+            op = self._advance().value
+            left = ('binop', op, left, operand())
+        return left
+
+    def _logical_or(self):
+        return self._left_assoc(self._logical_and, ('||',))
+
+    def _logical_and(self):
+        return self._left_assoc(self._comparison, ('&&',))
+
+    def _comparison(self):
+        return self._left_assoc(self._bitwise, COMPARE_OPS)
+
+    def _bitwise(self):
+        return self._left_assoc(self._shift, BITWISE_OPS)
+
+    def _shift(self):
+        return self._left_assoc(self._additive, SHIFT_OPS)
+
+    def _additive(self):
+        return self._left_assoc(self._multiplicative, ('+', '-'))
+
+    def _multiplicative(self):
+        return self._left_assoc(self._unary, ('*', '/', '%'))
+
+    def _unary(self):
+        if self._at('-', '+', '!'):
+            op = self._advance().value
+            return ('unop', op, self._unary())
+        return self._power()
+
+    def _power(self):
+        base = self._postfix()
+        if self._at('^'):
+            self._advance()
+            return ('binop', '^', base, self._unary())
+        return base
+
+    def _postfix(self):
+        node = self._primary()
+        while self._at('['):
+            self._advance()
+            index = NUM_ZERO if self._at(']') else self._assignment()
+            self._expect(']')
+            node = ('index', node, index)
+        return node
+
+    def _primary(self):
+        token = self.current
+
+        if token.kind == 'num':
+            self._advance()
+            return ('num', token.value)
+
+        if token.kind == 'str':
+            self._advance()
+            return ('str', token.value[1:-1])
+
+        if self._at('('):
+            return self._block()
+
+        if token.kind == 'name':
+            name = token.value.lower()
+            if name.startswith('#'):
+                self._advance()
+                return ('str', name)
+            if name == 'function':
+                self._advance()
+                self._function_def()
+                return NOOP
+
+            self._advance()
+            if not self._at('('):
+                return ('var', name)
+
+            if name == 'while':
+                return self._while()
+            if name == 'loop':
+                return self._loop()
+            return ('call', name, self._arguments())
+
+        if token.kind == 'eof':
+            raise self._error("Unexpected end of section")
+        raise self._error(f"Unexpected {token.value!r}")
+
+    def _arguments(self):
+        self._expect('(')
+        args = []
+        if self._at(')'):
+            self._advance()
+            return args
+        while True:
+            args.append(self._sequence(stops=(',', ')')))
+            if self._at(')'):
+                self._advance()
+                return args
+            self._expect(',')
+
+    def _while(self):
+        first = self._block()
+        if self._at('('):
+            # while (cond) (body)
+            return ('while', first, self._block())
+        # while (body): loops while the body's value is true
+        return ('while', None, first)
+
+    def _loop(self):
+        self._expect('(')
+        count = self._assignment()
+        self._expect(',')
+        body = self._sequence(stops=(')',))
+        self._expect(')')
+        return ('loop', count, body)
+
+    def _name_list(self):
+        self._expect('(')
+        names = []
+        while not self._at(')'):
+            names.append(self._expect_name())
+            if not self._at(')'):
+                self._expect(',')
+        self._advance()
+        return names
+
+    def _function_def(self):
+        start = self.current
+        name = self._expect_name()
+        params = self._name_list()
+        locals_, instances = [], []
+        while self.current.kind == 'name' and self.current.value.lower() in (
+                'local', 'instance', 'global', 'globals'):
+            kind = self._advance().value.lower()
+            names = self._name_list()
+            if kind == 'local':
+                locals_.extend(names)
+            elif kind == 'instance':
+                instances.extend(names)
+        body = self._block()
+
+        if name in self.functions:
+            raise self._error(f"Function '{name}' is defined twice", start)
+        self.functions[name] = FunctionDef(name, params, locals_, instances, body)
+
+
+NUM_ZERO = ('num', 0.0)
+
+
+def parse_section(text, first_line=1, source_name=None, functions=None):
+    """
+    Parse one code section.
+
+    Args:
+        text: Code section text
+        first_line: Line number of the first line of text
+        source_name: File name used in error messages
+        functions: Dict collecting function definitions
+
+    Returns:
+        ('seq', [...]) node
+    """
+    return Parser(text, first_line, source_name, functions).parse()
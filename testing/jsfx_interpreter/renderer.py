@@ -0,0 +1,133 @@
+"""
+JSFXTester backend that renders through the interpreter instead of REAPER.
+"""
+
+import sys
+
+import numpy as np
+from pathlib import Path
+
+from jsfx_metadata import find_effect
+from jsfx_tester import AudioAnalyzer
+from render_cache import module_hash
+from signal_generator import SignalGenerator
+
+from .effect import DEFAULT_BLOCK_SIZE, JSFXEffect
+
+
+PLUGINS_DIR = Path(__file__).resolve().parent.parent.parent / "plugins"
+
+
+class InterpreterRenderer:
+    """
+    Drop-in replacement for REAPER rendering, backed by the interpreter.
+
+    Pass an instance as JSFXTester(backend=InterpreterRenderer()) to run the
+    existing test scripts on a machine without REAPER. Unlike the
+    ReferenceRenderer it runs the plugin source itself, so edits to the
+    .jsfx files show up without touching a Python model.
+    """
+
+    def __init__(self, tail_ms=1000, effects_dir=None, block_size=DEFAULT_BLOCK_SIZE,
+                 bit_depth=32):
+        """
+        Initialize interpreter renderer.
+
+        Args:
+            tail_ms: Silence appended after the input, like REAPER's render tail
+            effects_dir: Directory to look up plugins given by bare name and
+                         their imports (default: the repository's plugins/)
+            block_size: Samples per @block call
+            bit_depth: Bit depth of rendered files (default 32 = IEEE float)
+        """
+        self.tail_ms = tail_ms
+        self.effects_dir = Path(effects_dir).expanduser() if effects_dir else PLUGINS_DIR
+        self.block_size = block_size
+        self.bit_depth = bit_depth
+        self.analyzer = AudioAnalyzer()
+
+    @property
+    def model_hash(self):
+        """Hash of the interpreter package's sources; part of render cache keys."""
+        return module_hash(sys.modules[__package__])
+
+    def resolve(self, jsfx_path):
+        """
+        Find the source of an effect.
+
+        Args:
+            jsfx_path: Path to a .jsfx file, or a plugin name looked up
+                       like jsfx_metadata.find_effect(), effects_dir first
+
+        Returns:
+            Path to the effect source
+
+        Raises:
+            FileNotFoundError: If the effect can't be found
+        """
+        path = find_effect(jsfx_path, self.effects_dir)
+        if path is None:
+            raise FileNotFoundError(f"JSFX effect not found: {jsfx_path}")
+        return path
+
+    def _read_padded(self, input_wav, sample_rate):
+        """Read an input file and append the render tail."""
+        samples, _, channels = self.analyzer.read_wav(input_wav)
+        tail = np.zeros((int(sample_rate * self.tail_ms / 1000), channels))
+        return np.vstack([samples.astype(np.float64), tail])
+
+    def _write(self, samples, output_wav, sample_rate):
+        """Write rendered samples at the renderer's bit depth."""
+        output_path = Path(output_wav)
+        gen = SignalGenerator(sample_rate=sample_rate, channels=samples.shape[1])
+        gen.save_wav(samples, output_path, bit_depth=self.bit_depth)
+        return output_path
+
+    def _render(self, jsfx_path, samples, slider_values, sample_rate):
+        effect = JSFXEffect(self.resolve(jsfx_path), slider_values, sample_rate,
+                            samples.shape[1], self.effects_dir)
+        return effect.process(samples, self.block_size)
+
+    def render_with_effect(self, jsfx_path, input_wav, output_wav,
+                           slider_values=None, sample_rate=48000):
+        """
+        Render audio through a JSFX effect.
+
+        Args:
+            jsfx_path: Path to JSFX effect file (or plugin name)
+            input_wav: Path to input WAV file
+            output_wav: Path for output WAV file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+
+        Returns:
+            Path to rendered output file
+        """
+        samples = self._read_padded(input_wav, sample_rate)
+        rendered = self._render(jsfx_path, samples, slider_values, sample_rate)
+        return self._write(rendered, output_wav, sample_rate)
+
+    def render_batch_with_effect(self, jsfx_path, input_wavs, output_dir,
+                                 slider_values=None, sample_rate=48000):
+        """
+        Render several input files through a JSFX effect.
+
+        Every input gets a freshly initialised instance, as if each were a
+        separate REAPER render.
+
+        Args:
+            jsfx_path: Path to JSFX effect file (or plugin name)
+            input_wavs: List of input WAV file paths
+            output_dir: Directory for the rendered output files
+            slider_values: Dict of slider values (applied to every input)
+            sample_rate: Sample rate
+
+        Returns:
+            List of output paths, in the same order as input_wavs
+        """
+        output_dir = Path(output_dir)
+        return [
+            self.render_with_effect(jsfx_path, path, output_dir / f"{Path(path).stem}_out.wav",
+                                    slider_values, sample_rate)
+            for path in input_wavs
+        ]
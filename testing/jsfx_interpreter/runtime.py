@@ -0,0 +1,180 @@
+"""
+Runtime support for compiled JSFX code.
+
+EEL2 arithmetic never raises: division by zero, log(0) and friends produce
+inf/nan and processing carries on. These helpers give generated code the
+same behaviour on Python floats.
+"""
+
+import math
+import random
+
+
+# Tolerance EEL2 uses for '==', '!=' and truth tests
+CLOSE_FACTOR = 0.00001
+
+# Iteration cap EEL2 applies to while() and loop()
+LOOP_LIMIT = 1048576
+
+# Size of the emulated local memory (mem[] / x[]) in slots
+MEM_SIZE = 1 << 20
+
+CONSTANTS = {
+    '$pi': math.pi,
+    '$e': math.e,
+    '$phi': (1 + math.sqrt(5)) / 2,
+}
+
+
+def div(a, b):
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a == 0 or a != a:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+def mod(a, b):
+    a, b = _int(a), _int(b)
+    if b == 0:
+        return 0.0
+    return float(abs(a) % abs(b))
+
+
+def power(a, b):
+    try:
+        result = math.pow(a, b)
+    except (ValueError, OverflowError):
+        return math.nan if a < 0 else math.inf
+    return result
+
+
+def sqrt(x):
+    return math.sqrt(x) if x >= 0 else math.nan
+
+
+def log(x):
+    if x > 0:
+        return math.log(x)
+    return -math.inf if x == 0 else math.nan
+
+
+def log10(x):
+    if x > 0:
+        return math.log10(x)
+    return -math.inf if x == 0 else math.nan
+
+
+def exp(x):
+    try:
+        return math.exp(x)
+    except OverflowError:
+        return math.inf
+
+
+def sin(x):
+    return math.sin(x) if math.isfinite(x) else math.nan
+
+
+def cos(x):
+    return math.cos(x) if math.isfinite(x) else math.nan
+
+
+def tan(x):
+    return math.tan(x) if math.isfinite(x) else math.nan
+
+
+def asin(x):
+    return math.asin(x) if -1 <= x <= 1 else math.nan
+
+
+def acos(x):
+    return math.acos(x) if -1 <= x <= 1 else math.nan
+
+
+def floor(x):
+    return float(math.floor(x)) if math.isfinite(x) else x
+
+
+def ceil(x):
+    return float(math.ceil(x)) if math.isfinite(x) else x
+
+
+def sign(x):
+    return 1.0 if x > 0 else -1.0 if x < 0 else 0.0
+
+
+def invsqrt(x):
+    return 1 / math.sqrt(x) if x > 0 else math.inf
+
+
+def rand(x=1.0):
+    return random.random() * max(x, 1.0)
+
+
+def loop_count(x):
+    return min(LOOP_LIMIT, max(0, _int(x)))
+
+
+def _int(x):
+    return int(x) if math.isfinite(x) else 0
+
+
+def bitwise_or(a, b):
+    return float(_int(a) | _int(b))
+
+
+def bitwise_and(a, b):
+    return float(_int(a) & _int(b))
+
+
+def bitwise_xor(a, b):
+    return float(_int(a) ^ _int(b))
+
+
+def shift_left(a, b):
+    return float(_int(a) << max(0, _int(b)))
+
+
+def shift_right(a, b):
+    return float(_int(a) >> max(0, _int(b)))
+
+
+def mem_index(x):
+    """Slot addressed by a mem[] index; out-of-range addresses hit a scratch slot."""
+    if not math.isfinite(x):
+        return MEM_SIZE
+    idx = int(x + CLOSE_FACTOR)
+    return idx if 0 <= idx < MEM_SIZE else MEM_SIZE
+
+
+def new_memory():
+    """Local memory plus the scratch slot out-of-range addresses use."""
+    return [0.0] * (MEM_SIZE + 1)
+
+
+def memset(mem, dest, value, length):
+    start = mem_index(dest)
+    stop = min(MEM_SIZE, start + max(0, _int(length)))
+    mem[start:stop] = [value] * (stop - start)
+    return dest
+
+
+def memcpy(mem, dest, src, length):
+    dest_idx, src_idx = mem_index(dest), mem_index(src)
+    length = max(0, min(_int(length), MEM_SIZE - dest_idx, MEM_SIZE - src_idx))
+    mem[dest_idx:dest_idx + length] = mem[src_idx:src_idx + length]
+    return dest
+
+
+def spl_get(frame, channel):
+    idx = _int(channel)
+    return frame[idx] if 0 <= idx < len(frame) else 0.0
+
+
+def spl_set(frame, channel, value):
+    idx = _int(channel)
+    if 0 <= idx < len(frame):
+        frame[idx] = value
+    return value
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+JSFX metadata index for testing.
+Parses the header of every effect once - description, slider declarations,
+in_pin/out_pin and imports - and caches the result by file mtime. Slider
+values given by name are mapped to REAPER's positional slider slots, with
+defaults filled in and out-of-range values rejected before a render starts.
+"""
+
+import re
+from pathlib import Path
+
+
+# sliderN:[name=]default<min,max[,step][:shape=center]{enum,labels}>[-]Label
+SLIDER_PATTERN = re.compile(
+    r'^slider(\d+):\s*(?:([A-Za-z_][\w.]*)\s*=)?\s*([-+\d.eE]+)\s*<([^>]*)>\s*(.*)$'
+)
+PIN_PATTERN = re.compile(r'^(in_pin|out_pin):\s*(.*)$')
+DESC_PATTERN = re.compile(r'^desc:\s*(.*)$')
+SECTION_PATTERN = re.compile(r'^@\w+')
+IMPORT_PATTERN = re.compile(r'^\s*import\s+(\S+)', re.MULTILINE)
+
+# Slider slots in a REAPER <JS> block
+REAPER_SLIDER_SLOTS = 64
+
+REPO_PLUGINS_DIR = Path(__file__).resolve().parent.parent / "plugins"
+REAPER_EFFECTS_DIR = Path.home() / ".config/REAPER/Effects"
+
+
+class SliderInfo:
+    """One slider declaration."""
+
+    __slots__ = ('index', 'name', 'default', 'minimum', 'maximum', 'step', 'shape',
+                 'enum', 'label', 'hidden')
+
+    def __init__(self, index, name, default, minimum=None, maximum=None, step=None,
+                 shape=None, enum=None, label="", hidden=False):
+        self.index = index
+        self.name = name
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.step = step
+        self.shape = shape
+        self.enum = enum
+        self.label = label
+        self.hidden = hidden
+
+    @property
+    def variable(self):
+        """EEL2 variable holding the slider value."""
+        return (self.name or f"slider{self.index}").lower()
+
+    def validate(self, value):
+        """
+        Check a value against the declared range.
+
+        Args:
+            value: Slider value
+
+        Returns:
+            The value as a float
+
+        Raises:
+            ValueError: If the value is outside [minimum, maximum] or not a
+                        valid index of an enumerated slider
+        """
+        value = float(value)
+        display = self.name or f"slider{self.index}"
+        if self.minimum is not None and not self.minimum <= value <= self.maximum:
+            raise ValueError(
+                f"Slider '{display}' = {value:g} is outside {self.minimum:g}..{self.maximum:g}"
+            )
+        if self.enum is not None and value != int(value):
+            raise ValueError(
+                f"Slider '{display}' = {value:g} must be an integer index into {self.enum}"
+            )
+        return value
+
+    def __repr__(self):
+        return f"SliderInfo({self.index}, {self.name!r}, default={self.default:g})"
+
+
+def parse_slider(line):
+    """
+    Parse a slider declaration line.
+
+    Args:
+        line: Header line
+
+    Returns:
+        SliderInfo, or None if the line isn't a slider declaration
+    """
+    match = SLIDER_PATTERN.match(line.strip())
+    if not match:
+        return None
+    index, name, default, spec, label = match.groups()
+
+    enum = None
+    if '{' in spec:
+        spec, labels = spec.split('{', 1)
+        enum = [item.strip() for item in labels.rstrip('}').split(',')]
+
+    shape = None
+    if ':' in spec:
+        spec, shape = spec.split(':', 1)
+        shape = shape.split('=')[0].strip()
+
+    bounds = spec.split(',')
+    try:
+        minimum, maximum = float(bounds[0]), float(bounds[1])
+    except (IndexError, ValueError):
+        minimum = maximum = None
+    try:
+        step = float(bounds[2])
+    except (IndexError, ValueError):
+        step = None
+
+    hidden = label.startswith('-')
+    return SliderInfo(int(index), name, float(default), minimum, maximum, step, shape, enum,
+                      label.lstrip('-').strip(), hidden)
+
+
+def header_lines(text):
+    """Lines before the first code section."""
+    lines = []
+    for line in text.splitlines():
+        if SECTION_PATTERN.match(line):
+            break
+        lines.append(line)
+    return lines
+
+
+def find_slider(sliders, name):
+    """
+    Look up a slider by name (case-insensitive, like EEL2) or 'sliderN'.
+
+    Args:
+        sliders: List of SliderInfo
+        name: Slider name
+
+    Returns:
+        SliderInfo
+
+    Raises:
+        ValueError: If no slider has that name
+    """
+    key = str(name).lower()
+    for slider in sliders:
+        if key in (slider.variable, f"slider{slider.index}"):
+            return slider
+    raise ValueError(
+        f"Unknown slider '{name}'. Known sliders: {[s.name or s.variable for s in sliders]}"
+    )
+
+
+class JSFXMetadata:
+    """Header information of one effect."""
+
+    def __init__(self, path, text):
+        """
+        Parse an effect header.
+
+        Args:
+            path: Effect file path
+            text: Effect source
+        """
+        self.path = Path(path)
+        self.name = self.path.stem
+        self.desc = ""
+        self.sliders = []
+        self.in_pins = []
+        self.out_pins = []
+
+        header = header_lines(text)
+        self.imports = IMPORT_PATTERN.findall('\n'.join(header))
+        for line in header:
+            line = line.strip()
+            slider = parse_slider(line)
+            if slider is not None:
+                self.sliders.append(slider)
+                continue
+            pin = PIN_PATTERN.match(line)
+            if pin:
+                if pin.group(2).strip().lower() != 'none':
+                    (self.in_pins if pin.group(1) == 'in_pin' else self.out_pins).append(
+                        pin.group(2).strip())
+                continue
+            desc = DESC_PATTERN.match(line)
+            if desc and not self.desc:
+                self.desc = desc.group(1).strip()
+
+    def slider(self, name):
+        """Look up a slider by name or 'sliderN'."""
+        return find_slider(self.sliders, name)
+
+    @property
+    def defaults(self):
+        """Slider defaults by declared name."""
+        return {slider.name or slider.variable: slider.default for slider in self.sliders}
+
+    def resolve_sliders(self, slider_values=None):
+        """
+        Map named slider values to slider indices.
+
+        Args:
+            slider_values: Dict of slider name -> value
+
+        Returns:
+            Dict of slider index -> value for every declared slider, defaults
+            filled in
+
+        Raises:
+            ValueError: On unknown slider names or out-of-range values
+        """
+        resolved = {slider.index: slider.default for slider in self.sliders}
+        for name, value in (slider_values or {}).items():
+            slider = self.slider(name)
+            resolved[slider.index] = slider.validate(value)
+        return resolved
+
+    def reaper_slider_line(self, slider_values=None):
+        """
+        Slider line of a REAPER <JS> block: one slot per slider index,
+        '-' for slots the effect doesn't declare.
+
+        Args:
+            slider_values: Dict of slider name -> value
+
+        Returns:
+            Space-separated slot values
+        """
+        resolved = self.resolve_sliders(slider_values)
+        return " ".join(f"{resolved[idx]:.10g}" if idx in resolved else "-"
+                        for idx in range(1, REAPER_SLIDER_SLOTS + 1))
+
+    def __repr__(self):
+        return f"JSFXMetadata({self.name!r}, sliders={self.sliders})"
+
+
+class MetadataIndex:
+    """Metadata per effect file, re-parsed only when the file changes."""
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, path):
+        """
+        Metadata of an effect file.
+
+        Args:
+            path: Effect file path
+
+        Returns:
+            JSFXMetadata
+        """
+        path = Path(path).expanduser().resolve()
+        stat = path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, JSFXMetadata(path, path.read_text(errors='replace')))
+            self._entries[path] = entry
+        return entry[1]
+
+    def scan(self, directory):
+        """
+        Metadata of every .jsfx file in a directory.
+
+        Returns:
+            Dict of effect name -> JSFXMetadata
+        """
+        return {path.stem: self.get(path) for path in sorted(Path(directory).glob("*.jsfx"))}
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Shared by everything in the process
+INDEX = MetadataIndex()
+
+
+def _search_roots(effects_dir=None):
+    """Directories effects and imports are looked up in, in order."""
+    roots = [Path(effects_dir).expanduser()] if effects_dir else []
+    return roots + [REAPER_EFFECTS_DIR, REPO_PLUGINS_DIR]
+
+
+def find_effect(jsfx_path, effects_dir=None):
+    """
+    Locate an effect's source the way REAPER would find it.
+
+    This is the one lookup used for rendering, interpreting and cache keys,
+    so they all agree on which file an effect name means.
+
+    Args:
+        jsfx_path: Path to the effect, or a path relative to an effects
+                   directory (e.g. "Croft/BiquadLowPass.jsfx" or a bare name)
+        effects_dir: Effects directory to search first
+
+    Returns:
+        Path to the effect, or None if it can't be found
+    """
+    path = Path(str(jsfx_path)).expanduser()
+    if path.is_file():
+        return path
+
+    names = [path, Path(path.name)]
+    if not path.suffix:
+        names += [path.with_suffix(".jsfx"), Path(path.name).with_suffix(".jsfx")]
+    for root in _search_roots(effects_dir):
+        for name in names:
+            candidate = root / name
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def find_import(name, importer, effects_dir=None):
+    """
+    Locate a file named by an import line.
+
+    Args:
+        name: Imported file name (e.g. "library.jsfx-inc")
+        importer: Path of the importing file, whose directory is searched first
+        effects_dir: Effects directory to search next (then the same
+                     directories as find_effect())
+
+    Returns:
+        Path to the imported file, or None if it can't be found
+    """
+    for root in [Path(importer).parent] + _search_roots(effects_dir):
+        candidate = root / name
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def resolve_imports(jsfx_path, effects_dir=None):
+    """
+    Find every file a JSFX effect imports, recursively.
+
+    Args:
+        jsfx_path: Path to JSFX effect file
+        effects_dir: Optional extra directory to search
+
+    Returns:
+        List of (import_name, Path or None) in first-seen order; the path is
+        None when the import can't be found
+    """
+    resolved = []
+    seen = set()
+    pending = [Path(jsfx_path).expanduser()]
+
+    while pending:
+        current = pending.pop(0)
+        for name in IMPORT_PATTERN.findall(current.read_text(errors='replace')):
+            if name in seen:
+                continue
+            seen.add(name)
+
+            path = find_import(name, current, effects_dir)
+            resolved.append((name, path))
+            if path is not None:
+                pending.append(path)
+
+    return resolved
+
+
+def effect_metadata(jsfx_path, effects_dir=None):
+    """
+    Metadata of an effect, looked up like find_effect().
+
+    Raises:
+        FileNotFoundError: If the effect can't be found
+    """
+    path = find_effect(jsfx_path, effects_dir)
+    if path is None:
+        raise FileNotFoundError(f"JSFX effect not found: {jsfx_path}")
+    return INDEX.get(path)
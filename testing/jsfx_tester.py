@@ -5,17 +5,57 @@ Provides tools to test JSFX effects by rendering audio through REAPER
 and analyzing the results.
 """
 
+import os
+import signal
 import subprocess
-import wave
-import struct
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 import tempfile
 import shutil
 
 from signal_generator import SignalGenerator
-from reaper_project import create_test_project
+from reaper_project import DEFAULT_TAIL_MS, ReaperProject, create_test_project
+from render_cache import render_key
+from stream_analysis import analyze_file
+from wav_io import CHUNK_FRAMES, MappedWav
+
+# Tones evaluated per block by the direct DFT bank (bounds the n x k matrix)
+TONE_BLOCK = 32
+
+# Floor for envelope levels in dB (keeps silence finite)
+SILENCE_FLOOR = 1e-10
+
+
+@lru_cache(maxsize=16)
+def _hann_window(length):
+    """Read-only Hann window, computed once per length."""
+    window = np.hanning(length)
+    window.setflags(write=False)
+    return window
+
+
+def _frame_groups(count, window, hop):
+    """
+    Split envelope frames into groups spanning about CHUNK_FRAMES samples.
+
+    Yields:
+        Tuples (first_frame, end_frame, first_sample, end_sample)
+    """
+    per_group = max(1, CHUNK_FRAMES // hop)
+    for first in range(0, count, per_group):
+        end = min(count, first + per_group)
+        yield first, end, first * hop, (end - 1) * hop + window
+
+
+def _read_frames(samples, start, stop):
+    """Samples [start, stop) as float64 (frames, channels), from an array or MappedWav."""
+    if isinstance(samples, MappedWav):
+        block = samples.read(start, stop, dtype=np.float64)
+    else:
+        block = np.asarray(samples[start:stop], dtype=np.float64)
+    return block.reshape(len(block), -1)
 
 
 class AudioAnalyzer:
@@ -33,33 +73,59 @@ class AudioAnalyzer:
             Tuple of (samples, sample_rate, channels)
             samples is numpy array of shape (num_samples, channels)
         """
-        with wave.open(str(filename), 'r') as wav:
-            sample_rate = wav.getframerate()
-            num_channels = wav.getnchannels()
-            num_frames = wav.getnframes()
-            
-            # Read all frames
-            raw_data = wav.readframes(num_frames)
-            
-            # Convert to numpy array
-            if wav.getsampwidth() == 2:  # 16-bit
-                samples = np.frombuffer(raw_data, dtype=np.int16)
-            elif wav.getsampwidth() == 4:  # 32-bit float
-                samples = np.frombuffer(raw_data, dtype=np.float32)
-            else:
-                raise ValueError(f"Unsupported sample width: {wav.getsampwidth()}")
+        with MappedWav(filename) as wav:
+            return wav.read(), wav.sample_rate, wav.channels
+    
+    @staticmethod
+    def open_wav(filename):
+        """
+        Open a WAV file without loading it (see wav_io.MappedWav).
+        Use this for long renders where only a window is analyzed.
+        
+        Args:
+            filename: Path to WAV file
             
-            # Reshape to (num_samples, channels)
-            samples = samples.reshape(-1, num_channels)
+        Returns:
+            MappedWav instance
+        """
+        return MappedWav(filename)
+    
+    @staticmethod
+    def analyze_stream(filename, **kwargs):
+        """
+        Welch PSD, cross-spectra, peak/RMS, DC and NaN/Inf/denormal counts of
+        a whole file in constant memory (see stream_analysis.analyze_file).
+        Use this for soak renders too long to load.
+        
+        Args:
+            filename: Path to WAV file
+            **kwargs: Passed to stream_analysis.analyze_file()
             
-            # Convert to float -1.0 to 1.0 range
-            if samples.dtype == np.int16:
-                samples = samples.astype(np.float32) / 32768.0
+        Returns:
+            StreamStats
+        """
+        return analyze_file(filename, **kwargs)
+    
+    @staticmethod
+    def read_analysis_window(filename, window_sec=0.5, channel=0):
+        """
+        Read only the centered window that measure_frequency_response() uses.
+        
+        Args:
+            filename: Path to WAV file
+            window_sec: Analysis window duration in seconds
+            channel: Channel to read
             
-            return samples, sample_rate, num_channels
+        Returns:
+            Tuple of (samples, sample_rate); samples has shape (window_samples,)
+        """
+        with MappedWav(filename) as wav:
+            window_samples = int(window_sec * wav.sample_rate)
+            start = max(0, (len(wav) - window_samples) // 2)
+            return wav.read(start, start + window_samples, channels=channel), wav.sample_rate
     
     @staticmethod
-    def measure_rms(samples, start_sec=0, end_sec=None):
+    def measure_rms(samples, start_sec=0, end_sec=None, sample_rate=None):
         """
         Measure RMS (root mean square) level.
         
@@ -67,14 +133,20 @@ class AudioAnalyzer:
             samples: numpy array of audio samples
             start_sec: Start time in seconds (default 0)
             end_sec: End time in seconds (default None = end of file)
+            sample_rate: Sample rate in Hz; required when a time range is given
             
         Returns:
             RMS value (linear, not dB)
         """
-        if end_sec is None:
-            end_sec = len(samples)
+        if sample_rate is None:
+            if start_sec or end_sec is not None:
+                raise ValueError("measure_rms() needs sample_rate to apply start_sec/end_sec")
+            start, stop = 0, None
+        else:
+            start = int(round(start_sec * sample_rate))
+            stop = None if end_sec is None else int(round(end_sec * sample_rate))
         
-        return np.sqrt(np.mean(samples[int(start_sec):int(end_sec)]**2))
+        return np.sqrt(np.mean(np.asarray(samples[start:stop], dtype=np.float64)**2))
     
     @staticmethod
     def measure_peak(samples):
@@ -89,6 +161,140 @@ class AudioAnalyzer:
         """
         return np.max(np.abs(samples))
     
+    @staticmethod
+    def measure_envelope(samples, sample_rate=None, window_ms=10.0, hop_ms=None):
+        """
+        Short-term RMS, peak and crest factor of every channel on a frame grid.
+        
+        Frame k covers samples [k * hop, k * hop + window). Window sums come
+        from cumulative sums of the squared signal, restarted every
+        CHUNK_FRAMES samples so long renders don't lose precision; window
+        peaks use the van Herk/Gil-Werman running maximum over a strided
+        block view, so the cost doesn't grow with the window length.
+        
+        Args:
+            samples: numpy array of shape (num_samples,) or (num_samples,
+                     channels), or a MappedWav (read in chunks)
+            sample_rate: Sample rate in Hz (default None = the MappedWav's)
+            window_ms: Window length in milliseconds
+            hop_ms: Frame hop in milliseconds (default None = window_ms)
+            
+        Returns:
+            Dict with:
+                'times': Frame start times in seconds, shape (frames,)
+                'rms': Short-term RMS per frame (linear)
+                'peak': Peak-hold over each frame's window (linear)
+                'crest_db': Peak-to-RMS ratio in dB (NaN for silent frames)
+                'window', 'hop': Window and hop in samples
+            Level arrays have shape (frames, channels), or (frames,) for 1-D input.
+        """
+        if sample_rate is None:
+            sample_rate = samples.sample_rate
+        window = max(1, int(round(window_ms * sample_rate / 1000)))
+        hop = window if hop_ms is None else max(1, int(round(hop_ms * sample_rate / 1000)))
+        one_channel = not isinstance(samples, MappedWav) and np.ndim(samples) == 1
+        channels = samples.channels if isinstance(samples, MappedWav) else (
+            1 if one_channel else np.shape(samples)[1])
+        
+        count = max(0, (len(samples) - window) // hop + 1)
+        rms = np.zeros((count, channels))
+        peak = np.zeros((count, channels))
+        for first, end, start, stop in _frame_groups(count, window, hop):
+            block = _read_frames(samples, start, stop)
+            offsets = np.arange(end - first) * hop
+            
+            sums = np.zeros((len(block) + 1, channels))
+            np.cumsum(block ** 2, axis=0, out=sums[1:])
+            rms[first:end] = np.sqrt(np.maximum(sums[offsets + window] - sums[offsets], 0) / window)
+            
+            # Running max restarted every `window` samples: the max over
+            # [i, i + window) is max(suffix max at i, prefix max at i + window - 1)
+            padded = np.zeros((-(-len(block) // window) * window, channels))
+            padded[:len(block)] = np.abs(block)
+            blocks = padded.reshape(-1, window, channels)
+            prefix = np.maximum.accumulate(blocks, axis=1).reshape(padded.shape)
+            suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(padded.shape)
+            peak[first:end] = np.maximum(suffix[offsets], prefix[offsets + window - 1])
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crest_db = np.where(rms > 0, 20 * np.log10(peak / rms), np.nan)
+        
+        if one_channel:
+            rms, peak, crest_db = rms[:, 0], peak[:, 0], crest_db[:, 0]
+        return {
+            'times': np.arange(count) * hop / sample_rate,
+            'rms': rms,
+            'peak': peak,
+            'crest_db': crest_db,
+            'window': window,
+            'hop': hop
+        }
+    
+    @staticmethod
+    def measure_settling_time(samples, step_times, sample_rate=None, tolerance_db=0.5,
+                              window_ms=5.0, hop_ms=1.0, final_ms=50.0):
+        """
+        Time for the short-term RMS to settle after each parameter step.
+        
+        Each step owns the frames whose windows lie between it and the next
+        step (or the end). Its final level is the mean dB level of its last
+        final_ms; the settling time runs from the step to the end of the
+        last window more than tolerance_db away from that level.
+        
+        Args:
+            samples: Rendered audio (see measure_envelope)
+            step_times: Sorted times of the parameter steps in seconds
+            sample_rate: Sample rate in Hz (default None = the MappedWav's)
+            tolerance_db: Allowed deviation from the final level
+            window_ms: RMS window in milliseconds
+            hop_ms: Frame hop in milliseconds
+            final_ms: Length of the final-level estimate in milliseconds
+            
+        Returns:
+            Settling times in milliseconds, shape (steps, channels) or
+            (steps,) for 1-D input; 0 if already settled, NaN if a step has
+            no complete frame
+        """
+        if sample_rate is None:
+            sample_rate = samples.sample_rate
+        envelope = AudioAnalyzer.measure_envelope(samples, sample_rate, window_ms, hop_ms)
+        rms = envelope['rms']
+        one_channel = rms.ndim == 1
+        level_db = 20 * np.log10(np.maximum(rms.reshape(len(rms), -1), SILENCE_FLOOR))
+        count, channels = level_db.shape
+        hop, window = envelope['hop'], envelope['window']
+        
+        step_samples = np.round(np.asarray(step_times, dtype=float) * sample_rate).astype(int)
+        frame_starts = np.arange(count) * hop
+        bounds = np.searchsorted(frame_starts, step_samples)
+        # A step's frames end where windows would reach into the next step
+        ends = np.append(np.searchsorted(frame_starts, step_samples[1:] - window, side='right'),
+                         count)
+        ends = np.maximum(ends, bounds)
+        
+        # Mean final level per step from cumulative sums over frames
+        final_frames = max(1, int(round(final_ms * sample_rate / 1000 / hop)))
+        cumulative = np.vstack([np.zeros((1, channels)), np.cumsum(level_db, axis=0)])
+        final_start = np.maximum(bounds, ends - final_frames)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            final_db = ((cumulative[ends] - cumulative[final_start])
+                        / (ends - final_start)[:, None])
+        
+        # Last out-of-tolerance frame of each step
+        owner = np.searchsorted(bounds, np.arange(count), side='right') - 1
+        owned = owner >= 0
+        owned[owned] = np.arange(count)[owned] < ends[owner[owned]]
+        deviation = np.zeros((count, channels), dtype=bool)
+        deviation[owned] = np.abs(level_db[owned] - final_db[owner[owned]]) > tolerance_db
+        last_bad = np.where(deviation, np.arange(count)[:, None], -1)
+        last_bad = np.vstack([last_bad, np.full((1, channels), -1)])
+        last_bad = np.maximum.reduceat(last_bad, np.minimum(bounds, count), axis=0)
+        
+        settled_at = (frame_starts[np.maximum(last_bad, 0)] + window - step_samples[:, None])
+        settling_ms = np.where(last_bad >= bounds[:, None], settled_at * 1000 / sample_rate, 0.0)
+        settling_ms[ends <= bounds] = np.nan
+        return settling_ms[:, 0] if one_channel else settling_ms
+    
     @staticmethod
     def measure_frequency_response(samples, sample_rate, target_freq, window_sec=0.5):
         """
@@ -117,7 +323,7 @@ class AudioAnalyzer:
             signal = samples[start:end]
         
         # Apply window to reduce spectral leakage
-        window = np.hanning(len(signal))
+        window = _hann_window(len(signal))
         signal_windowed = signal * window
         
         # Perform FFT
@@ -132,6 +338,183 @@ class AudioAnalyzer:
         
         return amplitude
     
+    @staticmethod
+    def measure_tones(samples, sample_rate, frequencies, start=0, window_samples=None,
+                      window=None):
+        """
+        Measure the amplitude and phase of many tones in one pass.
+        
+        If every frequency falls on a bin of the analysis window (see
+        SignalGenerator.generate_multitone) a single rFFT is used; otherwise
+        each tone is evaluated exactly with a vectorized single-bin DFT
+        (Goertzel) bank.
+        
+        Args:
+            samples: numpy array of audio samples (first channel is used)
+            sample_rate: Sample rate in Hz
+            frequencies: List of frequencies to measure in Hz
+            start: First sample of the analysis window
+            window_samples: Analysis window length (default None = to the end)
+            window: None for rectangular (exact for bin-exact periodic
+                    stimuli) or "hann"
+            
+        Returns:
+            Tuple of (amplitudes, phases) numpy arrays, one entry per
+            frequency; phases are in radians relative to a cosine at start
+        """
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        if window_samples is None:
+            window_samples = len(samples) - start
+        segment = np.asarray(samples[start:start + window_samples], dtype=np.float64)
+        if len(segment) < window_samples:
+            raise ValueError(
+                f"Analysis window [{start}, {start + window_samples}) exceeds "
+                f"signal length {len(samples)}"
+            )
+        
+        if window == "hann":
+            weights = _hann_window(window_samples)
+            segment = segment * weights
+            gain = weights.sum() / 2
+        elif window is None:
+            gain = window_samples / 2
+        else:
+            raise ValueError(f"Unknown window: {window}")
+        
+        bins = np.asarray(frequencies, dtype=float) * window_samples / sample_rate
+        if np.allclose(bins, np.round(bins), rtol=0, atol=1e-9):
+            spectrum = np.fft.rfft(segment)[np.round(bins).astype(int)]
+        else:
+            n = np.arange(window_samples)
+            spectrum = np.empty(len(bins), dtype=complex)
+            for block in range(0, len(bins), TONE_BLOCK):
+                kernel = np.exp(np.outer(n, -2j * np.pi * bins[block:block + TONE_BLOCK]
+                                         / window_samples))
+                spectrum[block:block + TONE_BLOCK] = segment @ kernel
+        
+        return np.abs(spectrum) / gain, np.angle(spectrum)
+    
+    @staticmethod
+    def measure_sweep_response(samples, sweep, inverse_sweep, sample_rate,
+                               f_start, f_end, num_harmonics=5, ir_length=None):
+        """
+        Measure a transfer function from a rendered exponential sine sweep.
+        Deconvolves the output with the inverse sweep (Farina method); the
+        linear impulse response lands at zero lag and each harmonic order k
+        lands earlier by duration * ln(k) / ln(f_end / f_start) seconds.
+        
+        Args:
+            samples: Rendered output (first channel is analyzed if multi-channel)
+            sweep: The sweep that was rendered (first channel if multi-channel)
+            inverse_sweep: Inverse filter from SignalGenerator.generate_inverse_sweep()
+            sample_rate: Sample rate in Hz
+            f_start: Starting frequency of the sweep in Hz
+            f_end: Ending frequency of the sweep in Hz
+            num_harmonics: Highest harmonic order to extract (>= 2)
+            ir_length: Linear impulse response length in samples
+                       (default None = the gap before the 2nd harmonic)
+            
+        Returns:
+            Dict with:
+                'frequencies': Frequency grid in Hz (within f_start..f_end)
+                'magnitude_db': Magnitude response in dB on that grid
+                'phase': Unwrapped phase response in radians on that grid
+                'impulse_response': Linear impulse response
+                'harmonic_distortion_db': Dict order -> harmonic energy
+                                          relative to the linear response (dB)
+                'harmonic_responses': Dict order -> harmonic impulse response
+        """
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        if sweep.ndim > 1:
+            sweep = sweep[:, 0]
+        
+        # Linear convolutions with the inverse filter, via one FFT size
+        n_fft = 1 << int(np.ceil(np.log2(len(samples) + len(inverse_sweep) - 1)))
+        inverse_fft = np.fft.rfft(inverse_sweep, n_fft)
+        deconv_out = np.fft.irfft(np.fft.rfft(samples, n_fft) * inverse_fft, n_fft)
+        deconv_in = np.fft.irfft(np.fft.rfft(sweep, n_fft) * inverse_fft, n_fft)
+        
+        # The deconvolved input sweep is a band-limited impulse; its in-band
+        # level calibrates the output to a unity-gain scale
+        freqs = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+        band = (freqs >= f_start) & (freqs <= f_end)
+        gain = np.mean(np.abs(np.fft.rfft(deconv_in)[band]))
+        
+        zero_lag = len(sweep) - 1
+        sweep_rate = (len(sweep) / sample_rate) / np.log(f_end / f_start)
+        # offsets[k - 1] = how far before zero lag harmonic order k starts
+        offsets = [int(round(sweep_rate * np.log(k) * sample_rate))
+                   for k in range(1, num_harmonics + 2)]
+        # Each order's window starts halfway into the gap towards the next
+        # order up, so it keeps the pre-ringing of its band-limited impulse
+        pre_roll = [(offsets[k] - offsets[k - 1]) // 2 for k in range(1, num_harmonics + 1)]
+        
+        if ir_length is None:
+            ir_length = offsets[1]
+        ir_length = min(ir_length, len(deconv_out) - zero_lag)
+        
+        impulse_response = deconv_out[zero_lag:zero_lag + ir_length] / gain
+        
+        # Divide by the reference spectrum to remove the sweep's band-limiting
+        window = slice(zero_lag - pre_roll[0], zero_lag + ir_length)
+        ir_fft = np.fft.rfft(deconv_out[window])
+        ref_fft = np.fft.rfft(deconv_in[window])
+        ir_freqs = np.fft.rfftfreq(len(deconv_out[window]), 1 / sample_rate)
+        ir_band = (ir_freqs >= f_start) & (ir_freqs <= f_end)
+        # Both spectra share the pre-roll delay, so the ratio is relative to zero lag
+        response = ir_fft[ir_band] / ref_fft[ir_band]
+        
+        linear_energy = np.sum(deconv_out[window] ** 2)
+        harmonic_distortion_db = {}
+        harmonic_responses = {}
+        for order in range(2, num_harmonics + 1):
+            # Order k runs from its own pre-roll up to the start of order k - 1
+            start = zero_lag - offsets[order - 1] - pre_roll[order - 1]
+            stop = zero_lag - offsets[order - 2] - pre_roll[order - 2]
+            if start < 0:
+                break
+            harmonic = deconv_out[start:stop] / gain
+            harmonic_responses[order] = harmonic
+            energy = np.sum(deconv_out[start:stop] ** 2)
+            harmonic_distortion_db[order] = (
+                10 * np.log10(energy / linear_energy) if energy > 0 else -np.inf
+            )
+        
+        return {
+            'frequencies': ir_freqs[ir_band],
+            'magnitude_db': 20 * np.log10(np.maximum(np.abs(response), 1e-12)),
+            'phase': np.unwrap(np.angle(response)),
+            'impulse_response': impulse_response,
+            'harmonic_distortion_db': harmonic_distortion_db,
+            'harmonic_responses': harmonic_responses
+        }
+    
+    @staticmethod
+    def measure_decay_time(samples, sample_rate, threshold_db=-100, start=0):
+        """
+        Time until an impulse response stays below a threshold for good.
+        
+        Args:
+            samples: numpy array of audio samples (first channel is used)
+            sample_rate: Sample rate in Hz
+            threshold_db: Level relative to the response peak
+            start: Sample index of the impulse
+            
+        Returns:
+            Decay time in milliseconds
+        """
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        response = np.abs(np.asarray(samples[start:], dtype=np.float64))
+        peak = np.max(response) if len(response) else 0.0
+        if peak == 0:
+            return 0.0
+        
+        above = np.flatnonzero(response > peak * 10 ** (threshold_db / 20))
+        return (above[-1] + 1) * 1000 / sample_rate
+    
     @staticmethod
     def linear_to_db(linear_value):
         """Convert linear amplitude to dB."""
@@ -145,88 +528,382 @@ class AudioAnalyzer:
         return 10 ** (db_value / 20)
 
 
+def render_tail_ms(jsfx_path, slider_values=None, sample_rate=48000, tail_ms=None):
+    """
+    Render tail for an effect setting.
+    
+    Args:
+        jsfx_path: Path to JSFX effect
+        slider_values: Dict of slider values
+        sample_rate: Sample rate
+        tail_ms: Explicit tail in ms; returned as-is if given
+        
+    Returns:
+        Tail in ms: tail_ms, else the analytic decay of the effect (see
+        biquad_response.decay_tail_ms), else DEFAULT_TAIL_MS
+    """
+    if tail_ms is not None:
+        return tail_ms
+    
+    # Imported here: biquad_response depends on this module
+    from biquad_response import decay_tail_ms
+    try:
+        # Headroom for REAPER's block-based processing
+        return decay_tail_ms(jsfx_path, slider_values, sample_rate) + 10
+    except ValueError:
+        return DEFAULT_TAIL_MS
+
+
 class JSFXTester:
     """Test JSFX effects by rendering through REAPER."""
     
-    def __init__(self, reaper_command="reaper", effects_dir=None):
+    def __init__(self, reaper_command="reaper", effects_dir=None, backend=None, cache=None,
+                 tail_ms=None):
         """
         Initialize JSFX tester.
         
         Args:
             reaper_command: Command to run REAPER (default "reaper")
             effects_dir: Directory containing JSFX effects (default None = use REAPER default)
+            backend: Optional object with render_with_effect() and
+                     render_batch_with_effect() methods (e.g.
+                     biquad_reference.ReferenceRenderer) used instead of REAPER
+            cache: Optional render_cache.RenderCache; renders whose effect
+                   source, imports, sliders, sample rate and stimulus are
+                   unchanged are then served from disk
+            tail_ms: Render tail in ms (default None = derived from the
+                     effect's analytic decay, see biquad_response.decay_tail_ms,
+                     or DEFAULT_TAIL_MS for effects without a model)
         """
         self.reaper_command = reaper_command
         self.effects_dir = effects_dir
+        self.backend = backend
+        self.cache = cache
+        self.tail_ms = tail_ms
         self.analyzer = AudioAnalyzer()
         
+    def _reaper_command(self, project_file, extra_args=None):
+        """Command line that renders a project and exits."""
+        return [
+            self.reaper_command,
+            "-nosplash",
+            "-renderproject", str(project_file),
+        ] + list(extra_args or []) + [
+            "-close:nosave:exit"
+        ]
+    
+    def _write_render_project(self, jsfx_path, input_wav, output_wav, workdir,
+                              slider_values, sample_rate):
+        """
+        Write the project for one render into a private working directory.
+        Shared by the blocking and the asyncio render paths.
+        
+        Returns:
+            Tuple of (project file, extra REAPER arguments); run REAPER on
+            them, then collect the output with _collect_render()
+        """
+        project_file = create_test_project(
+            jsfx_path=jsfx_path,
+            input_wav=input_wav,
+            output_rpp=Path(workdir) / "render.rpp",
+            slider_values=slider_values,
+            sample_rate=sample_rate,
+            render_settings={
+                'render_dir': str(workdir),
+                'render_pattern': "render",
+                'tail_ms': self._tail_ms(jsfx_path, slider_values, sample_rate)
+            },
+            effects_dir=self.effects_dir
+        )
+        return project_file, ["-saveas", str(Path(output_wav).with_suffix('.rpp'))]
+    
+    def _collect_render(self, workdir, output_wav, stderr):
+        """
+        Move a finished render out of its working directory.
+        
+        Args:
+            workdir: Working directory passed to _write_render_project()
+            output_wav: Path for output WAV file
+            stderr: REAPER's stderr, reported if there is no output
+            
+        Returns:
+            Path to output file
+        
+        Raises:
+            RuntimeError: If REAPER produced no output
+        """
+        # REAPER renders into the private directory with a fixed name
+        rendered_file = Path(workdir) / "render.wav"
+        if not rendered_file.exists():
+            raise RuntimeError(f"No rendered output found. REAPER stderr: {stderr}")
+        shutil.move(str(rendered_file), str(output_wav))
+        return Path(output_wav)
+    
+    def _run_reaper(self, project_file, timeout, extra_args=None):
+        """
+        Run REAPER on a project and wait for it to exit.
+        
+        REAPER is started in its own session so that a timed-out or hung
+        render can be torn down together with any child processes.
+        
+        Args:
+            project_file: Path to the .rpp file to render
+            timeout: Seconds to wait before killing REAPER
+            extra_args: Optional extra command-line arguments
+            
+        Returns:
+            subprocess.CompletedProcess for the REAPER run
+        """
+        cmd = self._reaper_command(project_file, extra_args)
+        
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.communicate()
+            raise
+        
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    
+    def _tail_ms(self, jsfx_path, slider_values, sample_rate):
+        """Render tail for an effect setting (explicit override or analytic decay)."""
+        return render_tail_ms(jsfx_path, slider_values, sample_rate, self.tail_ms)
+    
+    def measure_tail_ms(self, jsfx_path, slider_values=None, sample_rate=48000,
+                        threshold_db=-100, max_tail_ms=10000):
+        """
+        Measure how long an effect rings by rendering an impulse with a long
+        tail. Use the result as tail_ms for effects without an analytic model.
+        
+        Args:
+            jsfx_path: Path to JSFX effect
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+            threshold_db: Level relative to the response peak
+            max_tail_ms: Tail rendered for the measurement
+            
+        Returns:
+            Decay time in milliseconds
+        """
+        tester = JSFXTester(self.reaper_command, self.effects_dir, self.backend,
+                            tail_ms=max_tail_ms)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            
+            gen = SignalGenerator(sample_rate=sample_rate, duration=0.01)
+            input_wav = tmpdir / "impulse.wav"
+            gen.save_wav(gen.generate_impulse(amplitude=1.0), input_wav, bit_depth=32)
+            
+            output_wav = tester.render_with_effect(
+                jsfx_path, input_wav, tmpdir / "impulse_out.wav", slider_values, sample_rate
+            )
+            samples, _, _ = self.analyzer.read_wav(output_wav)
+        
+        return self.analyzer.measure_decay_time(samples, sample_rate, threshold_db)
+    
+    def _cache_key(self, jsfx_path, input_wav, slider_values, sample_rate):
+        """Cache key of a render with this tester's backend and settings."""
+        effects_dir = self.effects_dir
+        if self.backend is not None:
+            tail_ms = getattr(self.backend, 'tail_ms', None)
+            # Key on the source the backend resolves, not the tester's dir
+            effects_dir = getattr(self.backend, 'effects_dir', None) or effects_dir
+        else:
+            tail_ms = self._tail_ms(jsfx_path, slider_values, sample_rate)
+        render_settings = {
+            'backend': type(self.backend).__name__ if self.backend is not None else "reaper",
+            'model': getattr(self.backend, 'model_hash', None),
+            'bit_depth': getattr(self.backend, 'bit_depth', None),
+            'block_size': getattr(self.backend, 'block_size', None),
+            'tail_ms': tail_ms,
+        }
+        return render_key(jsfx_path, input_wav, slider_values, sample_rate,
+                          render_settings, effects_dir)
+    
     def render_with_effect(self, jsfx_path, input_wav, output_wav, 
-                          slider_values=None, sample_rate=48000):
+                          slider_values=None, sample_rate=48000, timeout=30):
         """
         Render audio through a JSFX effect.
         
+        Each call renders inside its own private working directory with a
+        fixed render pattern, so concurrent renders never see each other's
+        output. If the tester has a cache, unchanged renders are copied from
+        it instead.
+        
         Args:
             jsfx_path: Path to JSFX effect file
             input_wav: Path to input WAV file
             output_wav: Path for output WAV file
             slider_values: Dict of slider values
             sample_rate: Sample rate
+            timeout: Seconds to wait for REAPER before killing it
             
         Returns:
             Path to rendered output file
         """
-        # Create temporary project file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.rpp', delete=False) as tmp:
-            project_file = tmp.name
+        if self.cache is None:
+            return self._render_with_effect(
+                jsfx_path, input_wav, output_wav, slider_values, sample_rate, timeout
+            )
         
-        try:
-            # Generate project
-            create_test_project(
-                jsfx_path=jsfx_path,
-                input_wav=input_wav,
-                output_rpp=project_file,
-                slider_values=slider_values,
-                sample_rate=sample_rate
+        key = self._cache_key(jsfx_path, input_wav, slider_values, sample_rate)
+        cached = self.cache.get(key, output_wav)
+        if cached is not None:
+            return cached
+        
+        output_path = self._render_with_effect(
+            jsfx_path, input_wav, output_wav, slider_values, sample_rate, timeout
+        )
+        self.cache.put(key, output_path)
+        return output_path
+    
+    def _render_with_effect(self, jsfx_path, input_wav, output_wav,
+                            slider_values, sample_rate, timeout):
+        """Uncached render_with_effect()."""
+        if self.backend is not None:
+            return self.backend.render_with_effect(
+                jsfx_path, input_wav, output_wav, slider_values, sample_rate
+            )
+        
+        # Prepare output path
+        output_path = Path(output_wav)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with tempfile.TemporaryDirectory(prefix="jsfx_render_") as workdir:
+            project_file, extra_args = self._write_render_project(
+                jsfx_path, input_wav, output_path, workdir, slider_values, sample_rate
             )
+            result = self._run_reaper(project_file, timeout, extra_args)
+            return self._collect_render(workdir, output_path, result.stderr)
+    
+    def render_batch_with_effect(self, jsfx_path, input_wavs, output_dir,
+                                 slider_values=None, sample_rate=48000):
+        """
+        Render several input files through a JSFX effect in one REAPER launch.
+        
+        Every input gets its own track (and its own instance of the effect),
+        and the tracks are rendered as stems, so the outputs are identical to
+        calling render_with_effect() once per input.
+        
+        Args:
+            jsfx_path: Path to JSFX effect file
+            input_wavs: List of input WAV file paths
+            output_dir: Directory for the rendered output files
+            slider_values: Dict of slider values (applied to every track)
+            sample_rate: Sample rate
             
-            # Prepare output path
-            output_path = Path(output_wav)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Render project
-            cmd = [
-                self.reaper_command,
-                "-nosplash",
-                "-renderproject", project_file,
-                "-saveas", str(output_path.with_suffix('.rpp')),
-                "-close:nosave:exit"
-            ]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
+        Returns:
+            List of output paths, in the same order as input_wavs
+        """
+        if self.cache is None:
+            return self._render_batch_with_effect(
+                jsfx_path, input_wavs, output_dir, slider_values, sample_rate
+            )
+        
+        output_dir = Path(output_dir)
+        keys = [self._cache_key(jsfx_path, input_wav, slider_values, sample_rate)
+                for input_wav in input_wavs]
+        output_paths = [output_dir / f"{Path(input_wav).stem}_out.wav"
+                        for input_wav in input_wavs]
+        
+        # Only the cache misses go to the renderer, still in a single batch
+        misses = [idx for idx, (key, output_path) in enumerate(zip(keys, output_paths))
+                  if self.cache.get(key, output_path) is None]
+        if misses:
+            rendered = self._render_batch_with_effect(
+                jsfx_path, [input_wavs[idx] for idx in misses], output_dir,
+                slider_values, sample_rate
             )
+            for idx, rendered_path in zip(misses, rendered):
+                self.cache.put(keys[idx], rendered_path)
+                output_paths[idx] = rendered_path
+        
+        return output_paths
+    
+    def _render_batch_with_effect(self, jsfx_path, input_wavs, output_dir,
+                                  slider_values, sample_rate):
+        """Uncached render_batch_with_effect()."""
+        if self.backend is not None:
+            return self.backend.render_batch_with_effect(
+                jsfx_path, input_wavs, output_dir, slider_values, sample_rate
+            )
+        
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        with tempfile.TemporaryDirectory() as workdir:
+            workdir = Path(workdir)
+            project_file = workdir / "batch.rpp"
+            render_dir = workdir / "render"
+            render_dir.mkdir()
             
-            # REAPER renders to the project directory with a specific pattern
-            # We need to find and move the rendered file
-            project_dir = Path(project_file).parent
-            rendered_files = list(project_dir.glob("*.wav"))
-            
-            if rendered_files:
-                # Move the first rendered file to our desired output location
-                shutil.move(str(rendered_files[0]), str(output_path))
-                return output_path
-            else:
-                raise RuntimeError(f"No rendered output found. REAPER stderr: {result.stderr}")
-                
-        finally:
-            # Clean up temporary project file
-            Path(project_file).unlink(missing_ok=True)
+            # One track per stimulus; track names double as stem file names
+            project = ReaperProject(sample_rate=sample_rate, effects_dir=self.effects_dir)
+            track_names = []
+            for idx, input_wav in enumerate(input_wavs):
+                track_name = f"stim_{idx:04d}"
+                project.add_track_with_media(
+                    media_file=input_wav,
+                    track_name=track_name,
+                    jsfx_effects=[(jsfx_path, slider_values or {})]
+                )
+                track_names.append(track_name)
+            
+            project.generate_rpp(project_file, render_settings={
+                'render_dir': str(render_dir),
+                'render_pattern': "$track",
+                'stems': True,
+                'tail_ms': self._tail_ms(jsfx_path, slider_values, sample_rate)
+            })
+            
+            result = self._run_reaper(project_file, timeout=30 + 5 * len(track_names))
+            
+            # Demultiplex the stems back into per-input output files
+            output_paths = []
+            for idx, track_name in enumerate(track_names):
+                stem = render_dir / f"{track_name}.wav"
+                if not stem.exists():
+                    raise RuntimeError(
+                        f"No rendered stem found for {input_wavs[idx]}. "
+                        f"REAPER stderr: {result.stderr}"
+                    )
+                output_path = output_dir / f"{Path(input_wavs[idx]).stem}_out.wav"
+                shutil.move(str(stem), str(output_path))
+                output_paths.append(output_path)
+            
+            return output_paths
+    
+    def _measure_wav_level(self, wav_path, sample_rate, freq):
+        """Measure one frequency in a file, reading only the analysis window."""
+        samples, _ = self.analyzer.read_analysis_window(wav_path)
+        return self.analyzer.measure_frequency_response(samples, sample_rate, freq)
+    
+    def _attenuation_result(self, input_level, output_level):
+        """Build the per-frequency result dict for test_frequency_response()."""
+        if input_level > 0:
+            attenuation_db = 20 * np.log10(output_level / input_level)
+        else:
+            attenuation_db = -np.inf
+        
+        return {
+            'input_level': input_level,
+            'output_level': output_level,
+            'attenuation_db': attenuation_db
+        }
     
     def test_frequency_response(self, jsfx_path, test_frequencies, 
-                                slider_values=None, sample_rate=48000):
+                                slider_values=None, sample_rate=48000,
+                                batched=False, multitone=False, channels=2):
         """
         Test frequency response of a JSFX effect at multiple frequencies.
         
@@ -235,10 +912,28 @@ class JSFXTester:
             test_frequencies: List of frequencies to test (Hz)
             slider_values: Dict of slider values
             sample_rate: Sample rate
+            batched: If True, render all frequencies in a single REAPER
+                     launch (one track per frequency) instead of one
+                     launch per frequency
+            multitone: If True, probe all frequencies at once with a single
+                       multitone render (each tone is measured on the
+                       nearest 1 Hz bin); results also carry 'phase_shift'
+                       and 'channel_attenuation_db' (one value per channel)
+            channels: Number of channels in the stimulus (levels are
+                      measured on the first channel)
             
         Returns:
             Dict mapping frequency -> dict with 'input_level', 'output_level', 'attenuation_db'
         """
+        if multitone:
+            return self._test_frequency_response_multitone(
+                jsfx_path, test_frequencies, slider_values, sample_rate, channels
+            )
+        if batched:
+            return self._test_frequency_response_batched(
+                jsfx_path, test_frequencies, slider_values, sample_rate, channels
+            )
+        
         results = {}
         
         for freq in test_frequencies:
@@ -246,16 +941,13 @@ class JSFXTester:
                 tmpdir = Path(tmpdir)
                 
                 # Generate test signal
-                gen = SignalGenerator(sample_rate=sample_rate, duration=2.0)
+                gen = SignalGenerator(sample_rate=sample_rate, duration=2.0, channels=channels)
                 input_signal = gen.generate_sine(freq, amplitude=0.5)
                 input_wav = tmpdir / f"input_{freq}hz.wav"
                 gen.save_wav(input_signal, input_wav)
                 
                 # Measure input level
-                input_samples, _, _ = self.analyzer.read_wav(input_wav)
-                input_level = self.analyzer.measure_frequency_response(
-                    input_samples, sample_rate, freq
-                )
+                input_level = self._measure_wav_level(input_wav, sample_rate, freq)
                 
                 # Render through effect
                 output_wav = tmpdir / f"output_{freq}hz.wav"
@@ -268,25 +960,147 @@ class JSFXTester:
                 )
                 
                 # Measure output level
-                output_samples, _, _ = self.analyzer.read_wav(output_wav)
-                output_level = self.analyzer.measure_frequency_response(
-                    output_samples, sample_rate, freq
-                )
+                output_level = self._measure_wav_level(output_wav, sample_rate, freq)
                 
-                # Calculate attenuation
-                if input_level > 0:
-                    attenuation_db = 20 * np.log10(output_level / input_level)
-                else:
-                    attenuation_db = -np.inf
+                results[freq] = self._attenuation_result(input_level, output_level)
+        
+        return results
+    
+    def measure_sweep_response(self, jsfx_path, slider_values=None, sample_rate=48000,
+                               f_start=20, f_end=20000, duration=5.0, amplitude=0.5,
+                               num_harmonics=5, fade_sec=0.1):
+        """
+        Measure the full transfer function of a JSFX effect with one render
+        of an exponential sine sweep (see AudioAnalyzer.measure_sweep_response).
+        
+        Args:
+            jsfx_path: Path to JSFX effect
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+            f_start: Sweep start frequency in Hz
+            f_end: Sweep end frequency in Hz (must be below Nyquist)
+            duration: Sweep duration in seconds (longer = better SNR)
+            amplitude: Sweep amplitude
+            num_harmonics: Highest harmonic order to extract
+            fade_sec: Sweep fade in/out length; fading the sweep ends keeps
+                      their leakage out of the harmonic windows
+            
+        Returns:
+            Dict as returned by AudioAnalyzer.measure_sweep_response()
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            
+            gen = SignalGenerator(sample_rate=sample_rate, duration=duration)
+            sweep = gen.generate_sweep(f_start, f_end, amplitude=amplitude, log_sweep=True,
+                                       fade_sec=fade_sec)
+            input_wav = tmpdir / "sweep.wav"
+            gen.save_wav(sweep, input_wav)
+            
+            # Analyze what was actually written (quantized), not the float sweep
+            input_samples, _, _ = self.analyzer.read_wav(input_wav)
+            
+            output_wav = tmpdir / "sweep_out.wav"
+            self.render_with_effect(
+                jsfx_path=jsfx_path,
+                input_wav=input_wav,
+                output_wav=output_wav,
+                slider_values=slider_values,
+                sample_rate=sample_rate
+            )
+            output_samples, _, _ = self.analyzer.read_wav(output_wav)
+        
+        return self.analyzer.measure_sweep_response(
+            output_samples, input_samples,
+            gen.generate_inverse_sweep(f_start, f_end, fade_sec=fade_sec),
+            sample_rate, f_start, f_end, num_harmonics=num_harmonics
+        )
+    
+    def _test_frequency_response_batched(self, jsfx_path, test_frequencies,
+                                         slider_values, sample_rate, channels=2):
+        """Single-launch variant of test_frequency_response()."""
+        results = {}
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            
+            # Generate every stimulus up front
+            gen = SignalGenerator(sample_rate=sample_rate, duration=2.0, channels=channels)
+            input_wavs = []
+            input_levels = []
+            for freq in test_frequencies:
+                input_signal = gen.generate_sine(freq, amplitude=0.5)
+                input_wav = tmpdir / f"input_{freq}hz.wav"
+                gen.save_wav(input_signal, input_wav)
+                input_wavs.append(input_wav)
                 
-                results[freq] = {
-                    'input_level': input_level,
-                    'output_level': output_level,
-                    'attenuation_db': attenuation_db
-                }
+                input_levels.append(self._measure_wav_level(input_wav, sample_rate, freq))
+            
+            output_wavs = self.render_batch_with_effect(
+                jsfx_path=jsfx_path,
+                input_wavs=input_wavs,
+                output_dir=tmpdir / "output",
+                slider_values=slider_values,
+                sample_rate=sample_rate
+            )
+            
+            for freq, input_level, output_wav in zip(test_frequencies, input_levels, output_wavs):
+                output_level = self._measure_wav_level(output_wav, sample_rate, freq)
+                results[freq] = self._attenuation_result(input_level, output_level)
         
         return results
 
+    
+    def _test_frequency_response_multitone(self, jsfx_path, test_frequencies,
+                                           slider_values, sample_rate, channels=2):
+        """Single-render multitone variant of test_frequency_response()."""
+        # One second per period gives 1 Hz bins; the first period lets the
+        # effect settle and the second is analyzed
+        period = sample_rate
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            
+            gen = SignalGenerator(sample_rate=sample_rate, duration=2.0, channels=channels)
+            tone_freqs = gen.bin_frequencies(test_frequencies, period)
+            input_wav = tmpdir / "multitone.wav"
+            gen.save_wav(gen.generate_multitone(test_frequencies, amplitude=0.5,
+                                                period_samples=period), input_wav)
+            
+            output_wav = tmpdir / "multitone_out.wav"
+            self.render_with_effect(
+                jsfx_path=jsfx_path,
+                input_wav=input_wav,
+                output_wav=output_wav,
+                slider_values=slider_values,
+                sample_rate=sample_rate
+            )
+            
+            # levels[file][channel] = (amplitudes, phases)
+            levels = []
+            for wav_path in (input_wav, output_wav):
+                with self.analyzer.open_wav(wav_path) as wav:
+                    samples = wav.read(period, 2 * period)
+                levels.append([
+                    self.analyzer.measure_tones(samples[:, ch], sample_rate, tone_freqs)
+                    for ch in range(samples.shape[1])
+                ])
+        
+        (input_levels, input_phases), (output_levels, output_phases) = levels[0][0], levels[1][0]
+        phase_shifts = np.angle(np.exp(1j * (output_phases - input_phases)))
+        with np.errstate(divide='ignore'):
+            channel_attenuation_db = np.array([
+                20 * np.log10(out_levels / in_levels)
+                for (in_levels, _), (out_levels, _) in zip(levels[0], levels[1])
+            ])
+        
+        results = {}
+        for idx, freq in enumerate(test_frequencies):
+            results[freq] = self._attenuation_result(input_levels[idx], output_levels[idx])
+            results[freq]['phase_shift'] = phase_shifts[idx]
+            results[freq]['channel_attenuation_db'] = channel_attenuation_db[:, idx]
+        return results
+
 
 if __name__ == "__main__":
     # Example test
@@ -296,9 +1110,9 @@ if __name__ == "__main__":
     
     # Test low-pass filter at different frequencies
     results = tester.test_frequency_response(
-        jsfx_path="~/.config/REAPER/Effects/Croft/LowPassFilter.jsfx",
+        jsfx_path="BiquadLowPass.jsfx",
         test_frequencies=[100, 500, 1000, 2000, 5000],
-        slider_values={"frequencySlider": 1000},
+        slider_values={"cutoffFreq": 1000},
         sample_rate=48000
     )
     
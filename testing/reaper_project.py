@@ -7,20 +7,33 @@ Creates minimal project files with test signals and JSFX effects loaded.
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from jsfx_metadata import effect_metadata, find_effect
+from wav_io import MappedWav
+
+
+# Item length used when a media file's header can't be read
+DEFAULT_ITEM_LENGTH = 10.0
+
+# Render tail used when no tail_ms is given
+DEFAULT_TAIL_MS = 1000
+
 
 class ReaperProject:
     """Generate REAPER project files for automated testing."""
     
-    def __init__(self, sample_rate=48000, bpm=120):
+    def __init__(self, sample_rate=48000, bpm=120, effects_dir=None):
         """
         Initialize REAPER project generator.
         
         Args:
             sample_rate: Project sample rate
             bpm: Project tempo (BPM)
+            effects_dir: REAPER Effects directory used to find effect sources
+                         for slider mapping (default: search the usual places)
         """
         self.sample_rate = sample_rate
         self.bpm = bpm
+        self.effects_dir = effects_dir
         self.tracks = []
         
     def add_track_with_media(self, media_file, track_name="Test", jsfx_effects=None):
@@ -31,15 +44,41 @@ class ReaperProject:
             media_file: Path to audio file (WAV)
             track_name: Name of the track
             jsfx_effects: List of tuples (jsfx_path, slider_values_dict)
-                         Example: [("LowPassFilter.jsfx", {"frequencySlider": 1000})]
+                         Example: [("BiquadLowPass.jsfx", {"cutoffFreq": 1000})]
+
+        Raises:
+            ValueError: If a slider name isn't declared by its effect or a
+                        value is out of range
         """
+        effects = jsfx_effects or []
+        for jsfx_path, sliders in effects:
+            self._slider_line(jsfx_path, sliders)
+
         track = {
             'name': track_name,
             'media_file': str(Path(media_file).absolute()),
-            'effects': jsfx_effects or []
+            'length': media_length(media_file),
+            'channels': media_channels(media_file),
+            'effects': effects
         }
         self.tracks.append(track)
         
+    def _slider_line(self, jsfx_path, sliders):
+        """
+        Positional slider values of an effect, mapped by name from its header.
+
+        Raises:
+            ValueError: On unknown slider names, out-of-range values, or
+                        slider values for an effect whose source can't be found
+        """
+        if find_effect(jsfx_path, self.effects_dir) is None:
+            if sliders:
+                raise ValueError(
+                    f"Cannot map sliders {sorted(sliders)}: JSFX effect not found: {jsfx_path}"
+                )
+            return "0"
+        return effect_metadata(jsfx_path, self.effects_dir).reaper_slider_line(sliders)
+
     def _format_fx_chain(self, effects):
         """Format FX chain for .rpp file."""
         if not effects:
@@ -55,16 +94,7 @@ class ReaperProject:
             fx_lines.append(f"    DOCKED 0")
             fx_lines.append(f"    <JS {jsfx_name} \"{jsfx_path}\"")
             
-            # Add slider values
-            slider_count = len(sliders) if sliders else 0
-            slider_line = f"    {slider_count}"
-            
-            if sliders:
-                # JSFX sliders are indexed starting from 1
-                for slider_name, value in sliders.items():
-                    slider_line += f" {value}"
-            
-            fx_lines.append(slider_line)
+            fx_lines.append(f"    {self._slider_line(jsfx_path, sliders)}")
             fx_lines.append(f"    >")
         
         fx_lines.append("  >")
@@ -77,13 +107,31 @@ class ReaperProject:
         Args:
             output_file: Output .rpp filename
             render_settings: Optional dict with render settings
-                           Keys: 'tail_ms' (render tail in ms, default 1000)
+                           Keys: 'tail_ms' (render tail in ms, default
+                                            DEFAULT_TAIL_MS)
+                                 'render_dir' (directory REAPER renders into)
+                                 'render_pattern' (file name pattern, e.g. "$track")
+                                 'stems' (if True, render each track to its own file
+                                          instead of the master mix)
         """
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         render_settings = render_settings or {}
-        tail_ms = render_settings.get('tail_ms', 1000)
+        tail_ms = render_settings.get('tail_ms', DEFAULT_TAIL_MS)
+        render_dir = render_settings.get('render_dir', "")
+        render_pattern = render_settings.get('render_pattern', "")
+        stems = render_settings.get('stems', False)
+        
+        # RENDER_STEMS 2 = "stems (selected tracks) only"; every track is
+        # selected below so each one renders to its own file
+        render_stems = 2 if stems else 0
+        track_sel = 1 if stems else 0
+        
+        # REAPER tracks carry an even channel count of at least 2
+        track_channels = [max(2, track['channels'] + track['channels'] % 2)
+                          for track in self.tracks]
+        render_channels = max(track_channels, default=2)
         
         # Build project content
         lines = [
@@ -95,14 +143,14 @@ class ReaperProject:
             "  MASTERTRACKHEIGHT 0",
             "  MASTERPEAKCOL 16576",
             "  RECORD_PATH \"\" \"\"",
-            f"  RENDER_FILE \"\"",
-            f"  RENDER_PATTERN \"\"",
-            f"  RENDER_FMT 0 2 {self.sample_rate}",  # WAV, 16-bit, sample rate
+            f"  RENDER_FILE \"{render_dir}\"",
+            f"  RENDER_PATTERN \"{render_pattern}\"",
+            f"  RENDER_FMT 0 {render_channels} {self.sample_rate}",  # WAV, channels, sample rate
             f"  RENDER_1X 0",
             f"  RENDER_RANGE 1 0 0 18 1000",  # Render project, time selection
             f"  RENDER_RESAMPLE 3 0 1",
             f"  RENDER_ADDTOPROJ 0",
-            f"  RENDER_STEMS 0",
+            f"  RENDER_STEMS {render_stems}",
             f"  RENDER_DITHER 0",
             f"  TIMELOCKMODE 1",
             f"  RENDER_TAILFLAG 1",
@@ -111,7 +159,7 @@ class ReaperProject:
         
         # Add tracks
         for track_idx, track in enumerate(self.tracks):
-            lines.append(f"  <TRACK {{{'{'}{track_idx:08X}-0000-0000-0000-000000000000'}}}")
+            lines.append(f"  <TRACK {{{track_idx:08X}-0000-0000-0000-000000000000}}")
             lines.append(f"    NAME \"{track['name']}\"")
             lines.append(f"    PEAKCOL 16576")
             lines.append(f"    VOLPAN 1 0 -1 -1 1")
@@ -121,12 +169,12 @@ class ReaperProject:
             lines.append(f"    ISBUS 0 0")
             lines.append(f"    BUSCOMP 0 0 0 0 0")
             lines.append(f"    SHOWINMIX 1 0.6667 0.5 1 0.5 0 0 0")
-            lines.append(f"    SEL 0")
+            lines.append(f"    SEL {track_sel}")
             lines.append(f"    REC 0 0 1 0 0 0 0 0")
             lines.append(f"    VU 2")
             lines.append(f"    TRACKHEIGHT 0 0 0 0 0 0")
             lines.append(f"    INQ 0 0 0 0.5 100 0 0 100")
-            lines.append(f"    NCHAN 2")
+            lines.append(f"    NCHAN {track_channels[track_idx]}")
             
             # Add FX chain
             fx_chain = self._format_fx_chain(track['effects'])
@@ -137,7 +185,7 @@ class ReaperProject:
             media_path = track['media_file']
             lines.append(f"    <ITEM")
             lines.append(f"      POSITION 0")
-            lines.append(f"      LENGTH 10")  # Length will be auto-adjusted
+            lines.append(f"      LENGTH {track['length']:.6f}")
             lines.append(f"      LOOP 0")
             lines.append(f"      ALLTAKES 0")
             lines.append(f"      FADEIN 1 0 0 1 0 0 0")
@@ -159,7 +207,42 @@ class ReaperProject:
         return output_path
 
 
-def create_test_project(jsfx_path, input_wav, output_rpp, slider_values=None, sample_rate=48000):
+def media_length(media_file):
+    """
+    Length of a WAV file in seconds, read from its header only.
+    
+    Args:
+        media_file: Path to WAV file
+        
+    Returns:
+        Length in seconds, or DEFAULT_ITEM_LENGTH if the file can't be read
+    """
+    try:
+        with MappedWav(media_file) as wav:
+            return wav.duration
+    except (OSError, ValueError):
+        return DEFAULT_ITEM_LENGTH
+
+
+def media_channels(media_file):
+    """
+    Channel count of a WAV file, read from its header only.
+    
+    Args:
+        media_file: Path to WAV file
+        
+    Returns:
+        Number of channels, or 2 if the file can't be read
+    """
+    try:
+        with MappedWav(media_file) as wav:
+            return wav.channels
+    except (OSError, ValueError):
+        return 2
+
+
+def create_test_project(jsfx_path, input_wav, output_rpp, slider_values=None, sample_rate=48000,
+                        render_settings=None, effects_dir=None):
     """
     Quick helper to create a test project.
     
@@ -167,27 +250,29 @@ def create_test_project(jsfx_path, input_wav, output_rpp, slider_values=None, sa
         jsfx_path: Path to JSFX effect file
         input_wav: Path to input WAV file
         output_rpp: Path for output .rpp file
-        slider_values: Dict of slider values (e.g., {"frequencySlider": 1000})
+        slider_values: Dict of slider values by name (e.g., {"cutoffFreq": 1000})
         sample_rate: Project sample rate
+        render_settings: Optional render settings (see ReaperProject.generate_rpp)
+        effects_dir: REAPER Effects directory used to find the effect source
     
     Returns:
         Path to created .rpp file
     """
-    project = ReaperProject(sample_rate=sample_rate)
+    project = ReaperProject(sample_rate=sample_rate, effects_dir=effects_dir)
     project.add_track_with_media(
         media_file=input_wav,
         track_name="Test Signal",
         jsfx_effects=[(jsfx_path, slider_values or {})]
     )
-    return project.generate_rpp(output_rpp)
+    return project.generate_rpp(output_rpp, render_settings=render_settings)
 
 
 if __name__ == "__main__":
     # Example usage
     create_test_project(
-        jsfx_path="LowPassFilter.jsfx",
+        jsfx_path="BiquadLowPass.jsfx",
         input_wav="test_signals/sine_1000hz.wav",
         output_rpp="test_projects/test_lowpass.rpp",
-        slider_values={"frequencySlider": 500}
+        slider_values={"cutoffFreq": 500}
     )
     print("Created test project: test_projects/test_lowpass.rpp")
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Content-addressed render cache for JSFX testing.
+A render is keyed on everything that can change its output: the effect
+source, its resolved imports, the slider values, the sample rate, the render
+settings and the stimulus content. Unchanged renders are served from disk.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from jsfx_metadata import find_effect, resolve_imports
+
+
+# Bump when the key layout changes so stale entries are never reused
+CACHE_VERSION = 1
+
+
+def remove_file(path):
+    """Delete a file if it exists (Path.unlink(missing_ok=True) needs 3.8)."""
+    try:
+        Path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def module_hash(module):
+    """
+    Hash the source file of a Python module, or every source file of a package.
+
+    Backends whose output depends on Python code (a model of the effect, or
+    the interpreter running it) add this to their cache keys, so editing that
+    code invalidates them.
+
+    Args:
+        module: Module or package object
+
+    Returns:
+        Hex digest string
+    """
+    hasher = hashlib.sha256()
+    if hasattr(module, '__path__'):
+        for path in sorted(Path(module.__file__).parent.glob("*.py")):
+            hasher.update(path.name.encode())
+            _hash_file(hasher, path)
+    else:
+        _hash_file(hasher, module.__file__)
+    return hasher.hexdigest()
+
+
+def _hash_file(hasher, path):
+    """Feed a file's bytes into a hash in bounded-size chunks."""
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+
+
+def effect_hash(jsfx_path, effects_dir=None):
+    """
+    Hash an effect's source together with everything it imports.
+
+    The effect is looked up with jsfx_metadata.find_effect(), like the
+    renderers do, so a bare name is keyed on the source it renders.
+
+    Args:
+        jsfx_path: Path to JSFX effect file, or an effect name
+        effects_dir: Optional extra directory to search for the effect and
+                     its imports
+
+    Returns:
+        Hex digest string
+
+    Raises:
+        FileNotFoundError: If the effect can't be found
+    """
+    hasher = hashlib.sha256()
+    path = find_effect(jsfx_path, effects_dir)
+    if path is None:
+        raise FileNotFoundError(f"JSFX effect not found: {jsfx_path}")
+
+    _hash_file(hasher, path)
+    for name, import_path in resolve_imports(path, effects_dir):
+        hasher.update(f"\0import:{name}\0".encode())
+        if import_path is None:
+            hasher.update(b"<missing>")
+        else:
+            _hash_file(hasher, import_path)
+    return hasher.hexdigest()
+
+
+def render_key(jsfx_path, input_wav, slider_values=None, sample_rate=48000,
+               render_settings=None, effects_dir=None):
+    """
+    Compute the cache key of a render.
+
+    Args:
+        jsfx_path: Path to JSFX effect file, or an effect name
+        input_wav: Path to input WAV file (its content is hashed)
+        slider_values: Dict of slider values
+        sample_rate: Sample rate
+        render_settings: Dict of anything else that affects the output
+                         (backend, tail length, output format, ...)
+        effects_dir: Optional extra directory to search for the effect and
+                     its imports
+
+    Returns:
+        Hex digest string
+
+    Raises:
+        FileNotFoundError: If the effect can't be found
+    """
+    stimulus = hashlib.sha256()
+    _hash_file(stimulus, input_wav)
+
+    description = {
+        'version': CACHE_VERSION,
+        'effect': effect_hash(jsfx_path, effects_dir),
+        'sliders': sorted((str(k), float(v)) for k, v in (slider_values or {}).items()),
+        'sample_rate': sample_rate,
+        'render_settings': sorted((str(k), str(v)) for k, v in (render_settings or {}).items()),
+        'stimulus': stimulus.hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class RenderCache:
+    """
+    On-disk render cache with size-bounded LRU eviction.
+
+    Entries are written to a temporary file and atomically renamed into
+    place, so concurrent processes sharing a cache directory never observe a
+    partially written render. A hit refreshes the entry's mtime, which is
+    what eviction orders by.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        """
+        Initialize render cache.
+
+        Args:
+            cache_dir: Directory holding cached renders
+            max_bytes: Total size the cache is trimmed to (default 2 GiB)
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def _entry(self, key):
+        """Path of the cache entry for a key."""
+        return self.cache_dir / f"{key}.wav"
+
+    def get(self, key, output_path):
+        """
+        Copy a cached render to output_path if present.
+
+        Args:
+            key: Key from render_key()
+            output_path: Where the render should end up
+
+        Returns:
+            Path to output file on a hit, None on a miss
+        """
+        entry = self._entry(key)
+        output_path = Path(output_path)
+        try:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry, output_path)
+            os.utime(entry)
+        except FileNotFoundError:
+            # Not cached, or evicted by another process mid-copy
+            return None
+        return output_path
+
+    def put(self, key, rendered_path):
+        """
+        Store a render in the cache.
+
+        Args:
+            key: Key from render_key()
+            rendered_path: Path to the freshly rendered file
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp, open(rendered_path, 'rb') as src:
+                shutil.copyfileobj(src, tmp)
+            os.replace(tmp_path, self._entry(key))
+        except BaseException:
+            remove_file(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob('*.wav'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            remove_file(path)
+            total -= size
+
+    def clear(self):
+        """Remove every cached render."""
+        for path in self.cache_dir.glob('*.wav'):
+            remove_file(path)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Parallel render scheduler for JSFX testing.
+Runs many JSFXTester renders concurrently in a process pool. Every job renders
+in its own private working directory, writes to a deterministic output name,
+and gets a per-job timeout and retry budget.
+"""
+
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from jsfx_tester import JSFXTester
+
+
+class RenderJob:
+    """A single render request: one input file through one effect setting."""
+
+    def __init__(self, job_id, jsfx_path, input_wav, slider_values=None, sample_rate=48000):
+        """
+        Initialize render job.
+
+        Args:
+            job_id: Unique, file-name-safe identifier (output is <job_id>.wav)
+            jsfx_path: Path to JSFX effect file
+            input_wav: Path to input WAV file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+        """
+        self.job_id = str(job_id)
+        self.jsfx_path = str(jsfx_path)
+        self.input_wav = str(input_wav)
+        self.slider_values = dict(slider_values or {})
+        self.sample_rate = sample_rate
+
+
+class RenderResult:
+    """Outcome of a RenderJob."""
+
+    def __init__(self, job_id, output_path=None, attempts=0, elapsed=0.0, error=None):
+        """
+        Initialize render result.
+
+        Args:
+            job_id: Identifier of the job this result belongs to
+            output_path: Path to the rendered file (None if the job failed)
+            attempts: Number of render attempts made
+            elapsed: Wall time spent on the job in seconds (all attempts)
+            error: Error message of the last failed attempt, if any
+        """
+        self.job_id = job_id
+        self.output_path = output_path
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self):
+        """True if the job produced an output file."""
+        return self.output_path is not None
+
+
+def _run_job(job, output_path, reaper_command, backend, timeout, retries):
+    """
+    Worker entry point: render one job, retrying on failure or timeout.
+
+    Runs in a pool process, so it only touches its own output path and the
+    private working directory created by JSFXTester.render_with_effect().
+    """
+    tester = JSFXTester(reaper_command=reaper_command, backend=backend)
+    start = time.monotonic()
+    error = None
+
+    for attempt in range(1, retries + 2):
+        try:
+            tester.render_with_effect(
+                job.jsfx_path, job.input_wav, output_path,
+                job.slider_values, job.sample_rate, timeout=timeout
+            )
+            return RenderResult(job.job_id, Path(output_path), attempt,
+                                time.monotonic() - start)
+        except subprocess.TimeoutExpired:
+            error = f"Timed out after {timeout} s"
+        except (RuntimeError, OSError, ValueError) as exc:
+            error = str(exc)
+
+    return RenderResult(job.job_id, None, retries + 1, time.monotonic() - start, error)
+
+
+class RenderScheduler:
+    """Run render jobs concurrently across a process pool."""
+
+    def __init__(self, output_dir, max_workers=None, timeout=30, retries=1,
+                 reaper_command="reaper", backend=None):
+        """
+        Initialize render scheduler.
+
+        Args:
+            output_dir: Directory for rendered files (<job_id>.wav)
+            max_workers: Number of concurrent renders (default None = CPU count)
+            timeout: Per-attempt REAPER timeout in seconds
+            retries: Extra attempts for a job after a failure or timeout
+            reaper_command: Command to run REAPER
+            backend: Optional render backend (see JSFXTester); must be picklable
+        """
+        self.output_dir = Path(output_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.retries = retries
+        self.reaper_command = reaper_command
+        self.backend = backend
+
+    def output_path(self, job):
+        """Deterministic output path of a job."""
+        return self.output_dir / f"{job.job_id}.wav"
+
+    def run(self, jobs, progress=None):
+        """
+        Render all jobs.
+
+        Args:
+            jobs: List of RenderJob
+            progress: Optional callback(result, completed_count, total_count),
+                      called as each job finishes
+
+        Returns:
+            Dict mapping job_id -> RenderResult, in the order of jobs
+        """
+        jobs = list(jobs)
+        job_ids = [job.job_id for job in jobs]
+        if len(set(job_ids)) != len(job_ids):
+            raise ValueError("RenderJob ids must be unique")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        results = {}
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(_run_job, job, str(self.output_path(job)),
+                            self.reaper_command, self.backend,
+                            self.timeout, self.retries): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.job_id] = result
+                if progress is not None:
+                    progress(result, len(results), len(jobs))
+
+        return {job_id: results[job_id] for job_id in job_ids}
+
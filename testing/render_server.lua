@@ -0,0 +1,161 @@
+--[[
+  Persistent render server for JSFX testing (ReaScript).
+  Runs inside one long-lived REAPER instance and renders the projects queued
+  in a spool directory, so each job no longer pays for a REAPER start-up.
+
+  Started by render_server.py as: reaper -nosplash -newinst render_server.lua
+  with the spool directory in $JSFX_RENDER_SPOOL. See render_server.py for
+  the spool protocol.
+]]
+
+-- "File: Render project, using the most recent render settings, auto-close render dialog"
+local CMD_RENDER_PROJECT = 42230
+-- "File: Close current project tab"
+local CMD_CLOSE_PROJECT = 40860
+
+local spool_dir = os.getenv("JSFX_RENDER_SPOOL")
+if not spool_dir or spool_dir == "" then
+    reaper.ShowConsoleMsg("render_server.lua: JSFX_RENDER_SPOOL is not set\n")
+    return
+end
+
+local function path_join(...)
+    return table.concat({...}, "/")
+end
+
+local function file_exists(path)
+    local f = io.open(path, "r")
+    if f then
+        f:close()
+        return true
+    end
+    return false
+end
+
+local function read_file(path)
+    local f = io.open(path, "r")
+    if not f then
+        return nil
+    end
+    local content = f:read("*a")
+    f:close()
+    return content
+end
+
+--- Write a file under a temporary name and rename it into place
+local function write_file_atomic(path, content)
+    local tmp_path = path .. ".tmp"
+    local f = assert(io.open(tmp_path, "w"))
+    f:write(content)
+    f:close()
+    os.rename(tmp_path, path)
+end
+
+--- Read a top-level string field from a job file written by json.dump
+local function json_string_field(text, key)
+    local _, pos = text:find('"' .. key .. '"%s*:%s*"')
+    if not pos then
+        return nil
+    end
+
+    local chars = {}
+    pos = pos + 1
+    while pos <= #text do
+        local c = text:sub(pos, pos)
+        if c == "\\" then
+            -- Escapes json.dump produces in paths: \" \\ \/ \n
+            local escaped = text:sub(pos + 1, pos + 1)
+            table.insert(chars, escaped == "n" and "\n" or escaped)
+            pos = pos + 2
+        elseif c == '"' then
+            return table.concat(chars)
+        else
+            table.insert(chars, c)
+            pos = pos + 1
+        end
+    end
+    return nil
+end
+
+local function json_escape(value)
+    return (tostring(value):gsub("\\", "\\\\"):gsub('"', '\\"'):gsub("\n", "\\n"))
+end
+
+--- Oldest queued job file name (job ids sort in submission order)
+local function next_job()
+    local names = {}
+    local idx = 0
+    while true do
+        local name = reaper.EnumerateFiles(path_join(spool_dir, "jobs"), idx)
+        if not name then
+            break
+        end
+        if name:match("%.json$") then
+            table.insert(names, name)
+        end
+        idx = idx + 1
+    end
+    table.sort(names)
+    return names[1]
+end
+
+local function write_status(name, job_id, ok, err, elapsed)
+    local status = string.format(
+        '{"job_id": "%s", "status": "%s", "error": %s, "elapsed": %f}',
+        json_escape(job_id), ok and "ok" or "error",
+        err and ('"' .. json_escape(err) .. '"') or "null", elapsed
+    )
+    write_file_atomic(path_join(spool_dir, "done", name), status)
+end
+
+local function run_job(name)
+    local queued = path_join(spool_dir, "jobs", name)
+    local running = path_join(spool_dir, "running", name)
+    if not os.rename(queued, running) then
+        -- Withdrawn by the client
+        return
+    end
+
+    local text = read_file(running) or ""
+    local job_id = json_string_field(text, "job_id") or name:gsub("%.json$", "")
+    local project = json_string_field(text, "project")
+    local rendered = json_string_field(text, "rendered")
+    local output = json_string_field(text, "output")
+    local start = reaper.time_precise()
+
+    local ok, err = true, nil
+    if not (project and rendered and output) then
+        ok, err = false, "Malformed job file"
+    else
+        reaper.Main_openProject("noprompt:" .. project)
+        reaper.Main_OnCommand(CMD_RENDER_PROJECT, 0)
+        reaper.Main_OnCommand(CMD_CLOSE_PROJECT, 0)
+
+        if not file_exists(rendered) then
+            ok, err = false, "No rendered output found"
+        elseif not os.rename(rendered, output) then
+            ok, err = false, "Could not move render to " .. output
+        end
+    end
+
+    write_status(name, job_id, ok, err, reaper.time_precise() - start)
+    os.remove(running)
+end
+
+local function loop()
+    if file_exists(path_join(spool_dir, "stop")) then
+        reaper.Main_OnCommand(40004, 0) -- File: Quit REAPER
+        return
+    end
+
+    write_file_atomic(path_join(spool_dir, "heartbeat"), tostring(reaper.time_precise()))
+
+    local name = next_job()
+    if name then
+        run_job(name)
+    end
+
+    reaper.defer(loop)
+end
+
+loop()
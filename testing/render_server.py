@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Persistent render server for JSFX testing.
+Keeps one renderer running and hands it jobs through a spool directory, so
+each render no longer pays for a REAPER start-up.
+
+Spool protocol (all files are written to a temporary name and renamed into
+place, so neither side ever reads a partial file):
+
+    jobs/<job_id>.json      queued job, written by the client
+    running/<job_id>.json   job claimed by the server (renamed from jobs/)
+    done/<job_id>.json      status written by the server:
+                            {"job_id", "status": "ok" | "error", "error", "elapsed"}
+    heartbeat               touched by the server on every loop iteration
+    stop                    created by the client to ask the server to exit
+
+A job file holds the project to render ("project"), the file REAPER renders
+it to ("rendered"), where that file must end up ("output"), and the render
+description ("render": jsfx_path, input_wav, slider_values, sample_rate,
+tail_ms) for servers that don't read projects. render_server.lua is the
+REAPER side; fake_render_server.py speaks the same protocol using the NumPy
+reference renderer.
+"""
+
+import itertools
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from jsfx_tester import render_tail_ms
+from reaper_project import create_test_project
+from render_cache import remove_file
+
+
+SPOOL_DIRS = ('jobs', 'running', 'done', 'projects', 'work')
+HEARTBEAT = 'heartbeat'
+STOP = 'stop'
+
+LUA_SERVER = Path(__file__).resolve().parent / "render_server.lua"
+FAKE_SERVER = Path(__file__).resolve().parent / "fake_render_server.py"
+
+# Environment variable telling the server which spool directory to watch
+SPOOL_ENV = "JSFX_RENDER_SPOOL"
+
+
+def reaper_server_command(reaper_command="reaper"):
+    """Command line that starts REAPER running the spool loop."""
+    return [reaper_command, "-nosplash", "-newinst", str(LUA_SERVER)]
+
+
+def fake_server_command():
+    """Command line that starts the reference-renderer stand-in."""
+    return [sys.executable, str(FAKE_SERVER)]
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file next to path and rename it into place."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_file(tmp_path)
+        raise
+
+
+def serve_spool(spool_dir, render_job, poll_interval=0.002):
+    """
+    Server side of the spool protocol, for renderers written in Python.
+
+    Args:
+        spool_dir: Spool directory
+        render_job: Callable(job_dict) that produces job['output'] or raises
+        poll_interval: Seconds to sleep when the queue is empty
+    """
+    spool_dir = Path(spool_dir)
+    heartbeat = spool_dir / HEARTBEAT
+
+    while not (spool_dir / STOP).exists():
+        heartbeat.touch()
+
+        queued = sorted((spool_dir / 'jobs').glob('*.json'))
+        if not queued:
+            time.sleep(poll_interval)
+            continue
+
+        running = spool_dir / 'running' / queued[0].name
+        try:
+            os.rename(queued[0], running)
+        except FileNotFoundError:
+            # Withdrawn by the client
+            continue
+
+        with open(running) as f:
+            job = json.load(f)
+        start = time.monotonic()
+        status = {'job_id': job['job_id'], 'status': 'ok', 'error': None}
+        try:
+            render_job(job)
+        except Exception as exc:
+            status.update(status='error', error=f"{type(exc).__name__}: {exc}")
+        status['elapsed'] = time.monotonic() - start
+
+        write_json_atomic(spool_dir / 'done' / running.name, status)
+        remove_file(running)
+
+
+class RenderServerClient:
+    """
+    Client of a persistent render server.
+
+    Usable as a JSFXTester backend: render_with_effect() and
+    render_batch_with_effect() write a project into the spool, queue it and
+    wait for the result. A server that dies, or whose heartbeat goes stale,
+    is restarted; the job it was rendering fails and queued jobs carry on.
+    """
+
+    def __init__(self, spool_dir, command=None, heartbeat_timeout=10.0,
+                 startup_timeout=60.0, poll_interval=0.002, tail_ms=None):
+        """
+        Initialize render server client.
+
+        Args:
+            spool_dir: Spool directory shared with the server
+            command: Server command line (default: reaper_server_command())
+            heartbeat_timeout: Seconds without a heartbeat before the server
+                               is considered hung (must exceed one render)
+            startup_timeout: Seconds to wait for the first heartbeat
+            poll_interval: Seconds between status polls
+            tail_ms: Render tail in ms (default None = derived from the
+                     effect, see jsfx_tester.render_tail_ms)
+        """
+        self.spool_dir = Path(spool_dir).expanduser().absolute()
+        self.command = command or reaper_server_command()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.startup_timeout = startup_timeout
+        self.poll_interval = poll_interval
+        self.tail_ms = tail_ms
+        self.restarts = 0
+        self._process = None
+        self._counter = itertools.count()
+        self._session = uuid.uuid4().hex[:8]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _heartbeat_age(self):
+        """Seconds since the last heartbeat (inf if there is none)."""
+        try:
+            return time.time() - (self.spool_dir / HEARTBEAT).stat().st_mtime
+        except FileNotFoundError:
+            return float('inf')
+
+    def healthy(self):
+        """True if the server process is alive and its heartbeat is fresh."""
+        return (self._process is not None and self._process.poll() is None
+                and self._heartbeat_age() < self.heartbeat_timeout)
+
+    def start(self):
+        """Start the server and wait until it is heartbeating."""
+        for name in SPOOL_DIRS:
+            (self.spool_dir / name).mkdir(parents=True, exist_ok=True)
+        remove_file(self.spool_dir / STOP)
+        remove_file(self.spool_dir / HEARTBEAT)
+
+        env = dict(os.environ, **{SPOOL_ENV: str(self.spool_dir)})
+        self._process = subprocess.Popen(
+            self.command, env=env, start_new_session=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while not (self.spool_dir / HEARTBEAT).exists():
+            if self._process.poll() is not None:
+                raise RuntimeError(
+                    f"Render server exited during start-up (code {self._process.returncode})"
+                )
+            if time.monotonic() > deadline:
+                self._kill()
+                raise RuntimeError("Render server did not start a heartbeat")
+            time.sleep(self.poll_interval)
+
+    def _kill(self):
+        """Kill the server and everything it spawned."""
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            try:
+                os.killpg(self._process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._process.wait()
+        self._process = None
+
+    def stop(self, timeout=5.0):
+        """Ask the server to exit, killing it if it doesn't."""
+        if self._process is None:
+            return
+        (self.spool_dir / STOP).touch()
+        try:
+            self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            pass
+        self._kill()
+
+    def restart(self):
+        """
+        Kill the server, fail the job it was rendering and start a new one.
+        Queued jobs are left in place for the new server.
+        """
+        self._kill()
+        for running in (self.spool_dir / 'running').glob('*.json'):
+            write_json_atomic(self.spool_dir / 'done' / running.name, {
+                'job_id': running.stem, 'status': 'error',
+                'error': "Render server hung or died during this job", 'elapsed': None
+            })
+            remove_file(running)
+        self.restarts += 1
+        self.start()
+
+    def submit(self, project_file, rendered_path, output_path, render=None):
+        """
+        Queue a render.
+
+        Args:
+            project_file: .rpp file to render
+            rendered_path: File the project renders to
+            output_path: Where the rendered file must be moved
+            render: Optional render description for servers that don't read
+                    projects
+
+        Returns:
+            Job id
+        """
+        if self._process is None:
+            self.start()
+        # Sortable ids keep the queue first-in, first-out
+        job_id = f"{self._session}-{next(self._counter):08d}"
+        write_json_atomic(self.spool_dir / 'jobs' / f"{job_id}.json", {
+            'job_id': job_id,
+            'project': str(project_file),
+            'rendered': str(rendered_path),
+            'output': str(output_path),
+            'render': render or {},
+        })
+        return job_id
+
+    def wait(self, job_id, timeout=30):
+        """
+        Wait for a job to finish.
+
+        Args:
+            job_id: Id from submit()
+            timeout: Seconds to wait before giving up on the job
+
+        Returns:
+            Status dict written by the server
+
+        Raises:
+            subprocess.TimeoutExpired: the job didn't finish in time (the
+                server is restarted if it was rendering it)
+            RuntimeError: the server reported an error or hung on the job
+        """
+        done = self.spool_dir / 'done' / f"{job_id}.json"
+        deadline = time.monotonic() + timeout
+
+        while not done.exists():
+            if not self.healthy():
+                self.restart()
+                continue
+            if time.monotonic() > deadline:
+                queued = self.spool_dir / 'jobs' / f"{job_id}.json"
+                try:
+                    queued.unlink()
+                except FileNotFoundError:
+                    # Already claimed: the server is stuck on this job
+                    if (self.spool_dir / 'running' / f"{job_id}.json").exists():
+                        self.restart()
+                remove_file(done)
+                raise subprocess.TimeoutExpired(self.command, timeout)
+            time.sleep(self.poll_interval)
+
+        with open(done) as f:
+            status = json.load(f)
+        done.unlink()
+
+        if status['status'] != 'ok':
+            raise RuntimeError(f"Render job {job_id} failed: {status['error']}")
+        return status
+
+    def _prepare(self, jsfx_path, input_wav, output_wav, slider_values, sample_rate):
+        """Write the project for one render; returns the submit() arguments."""
+        name = uuid.uuid4().hex
+        workdir = self.spool_dir / 'work' / name
+        workdir.mkdir(parents=True)
+        tail_ms = render_tail_ms(jsfx_path, slider_values, sample_rate, self.tail_ms)
+
+        project_file = create_test_project(
+            jsfx_path=jsfx_path,
+            input_wav=input_wav,
+            output_rpp=self.spool_dir / 'projects' / f"{name}.rpp",
+            slider_values=slider_values,
+            sample_rate=sample_rate,
+            render_settings={
+                'render_dir': str(workdir),
+                'render_pattern': "render",
+                'tail_ms': tail_ms
+            }
+        )
+        render = {
+            'jsfx_path': str(jsfx_path),
+            'input_wav': str(Path(input_wav).absolute()),
+            'slider_values': dict(slider_values or {}),
+            'sample_rate': sample_rate,
+            'tail_ms': tail_ms,
+        }
+        return project_file, workdir / "render.wav", Path(output_wav).absolute(), render
+
+    def _cleanup(self, project_file, rendered_path):
+        """Remove a job's project and working directory."""
+        remove_file(project_file)
+        shutil.rmtree(Path(rendered_path).parent, ignore_errors=True)
+
+    def render_with_effect(self, jsfx_path, input_wav, output_wav,
+                           slider_values=None, sample_rate=48000, timeout=30):
+        """
+        Render audio through a JSFX effect on the server.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            input_wav: Path to input WAV file
+            output_wav: Path for output WAV file
+            slider_values: Dict of slider values
+            sample_rate: Sample rate
+            timeout: Seconds to wait for the job
+
+        Returns:
+            Path to rendered output file
+        """
+        job = self._prepare(jsfx_path, input_wav, output_wav, slider_values, sample_rate)
+        Path(job[2]).parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.wait(self.submit(*job), timeout)
+        finally:
+            self._cleanup(job[0], job[1])
+        return job[2]
+
+    def render_batch_with_effect(self, jsfx_path, input_wavs, output_dir,
+                                 slider_values=None, sample_rate=48000, timeout=30):
+        """
+        Render several input files, queueing them all before waiting.
+
+        Args:
+            jsfx_path: Path to JSFX effect file
+            input_wavs: List of input WAV file paths
+            output_dir: Directory for the rendered output files
+            slider_values: Dict of slider values (applied to every input)
+            sample_rate: Sample rate
+            timeout: Seconds to wait for each job
+
+        Returns:
+            List of output paths (<input stem>_out.wav), in input order
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        jobs = [self._prepare(jsfx_path, input_wav,
+                              output_dir / f"{Path(input_wav).stem}_out.wav",
+                              slider_values, sample_rate)
+                for input_wav in input_wavs]
+        job_ids = []
+        try:
+            job_ids = [self.submit(*job) for job in jobs]
+            for job_id in job_ids:
+                self.wait(job_id, timeout)
+        except BaseException:
+            # Withdraw whatever the server hasn't picked up yet
+            for job_id in job_ids:
+                remove_file(self.spool_dir / 'jobs' / f"{job_id}.json")
+            raise
+        finally:
+            for job in jobs:
+                self._cleanup(job[0], job[1])
+        return [job[2] for job in jobs]
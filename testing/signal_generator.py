@@ -5,10 +5,10 @@ Generates various test signals (impulse, sine, sweep) as WAV files.
 """
 
 import numpy as np
-import wave
-import struct
 from pathlib import Path
 
+from wav_io import write_wav
+
 
 class SignalGenerator:
     """Generate test audio signals for JSFX testing."""
@@ -59,7 +59,8 @@ class SignalGenerator:
         signal = np.tile(signal.reshape(-1, 1), (1, self.channels))
         return signal
     
-    def generate_sweep(self, f_start=20, f_end=20000, amplitude=0.5, log_sweep=True):
+    def generate_sweep(self, f_start=20, f_end=20000, amplitude=0.5, log_sweep=True,
+                       fade_sec=0.0):
         """
         Generate a frequency sweep (chirp).
         Useful for measuring frequency response.
@@ -69,6 +70,8 @@ class SignalGenerator:
             f_end: Ending frequency in Hz
             amplitude: Peak amplitude (0.0 to 1.0)
             log_sweep: If True, use logarithmic sweep; if False, linear
+            fade_sec: Length of a raised-cosine fade in/out at each end
+                      (default 0 = no fade)
             
         Returns:
             numpy array of shape (num_samples, channels)
@@ -84,6 +87,101 @@ class SignalGenerator:
             phase = 2 * np.pi * (f_start * t + (f_end - f_start) * t**2 / (2 * self.duration))
         
         signal = amplitude * np.sin(phase)
+        
+        fade_samples = min(int(fade_sec * self.sample_rate), self.num_samples // 2)
+        if fade_samples > 0:
+            fade = 0.5 - 0.5 * np.cos(np.pi * np.arange(fade_samples) / fade_samples)
+            signal[:fade_samples] *= fade
+            signal[-fade_samples:] *= fade[::-1]
+        
+        # Duplicate to all channels
+        signal = np.tile(signal.reshape(-1, 1), (1, self.channels))
+        return signal
+    
+    def generate_inverse_sweep(self, f_start=20, f_end=20000, fade_sec=0.0):
+        """
+        Generate the inverse filter of generate_sweep(log_sweep=True).
+        Convolving a rendered log sweep with this filter (Farina method)
+        yields the impulse response, with harmonic distortion products
+        pushed to negative time.
+        
+        The filter is the time-reversed sweep with an exponential envelope
+        that falls 6 dB/octave, which compensates the sweep's pink spectrum.
+        
+        Args:
+            f_start: Starting frequency of the sweep in Hz
+            f_end: Ending frequency of the sweep in Hz
+            fade_sec: Fade length the sweep was generated with
+            
+        Returns:
+            numpy array of shape (num_samples,) (mono; unnormalized)
+        """
+        t = np.linspace(0, self.duration, self.num_samples, endpoint=False)
+        sweep_rate = self.duration / np.log(f_end / f_start)
+        sweep = self.generate_sweep(f_start, f_end, amplitude=1.0, log_sweep=True,
+                                    fade_sec=fade_sec)[:, 0]
+        return sweep[::-1] * np.exp(-t / sweep_rate)
+    
+    def bin_frequencies(self, frequencies, period_samples=None):
+        """
+        Snap frequencies to the nearest FFT bin of a period.
+        
+        Args:
+            frequencies: List of frequencies in Hz
+            period_samples: Analysis period in samples (default None =
+                            one second, i.e. 1 Hz bins)
+            
+        Returns:
+            numpy array of bin-exact frequencies in Hz
+        """
+        period = period_samples or self.sample_rate
+        bins = np.round(np.asarray(frequencies, dtype=float) * period / self.sample_rate).astype(int)
+        if np.any(bins <= 0) or np.any(bins >= period // 2):
+            raise ValueError("Multitone frequencies must lie strictly between 0 Hz and Nyquist")
+        if len(np.unique(bins)) != len(bins):
+            raise ValueError(
+                f"Frequencies fall on the same bin at {self.sample_rate / period:g} Hz resolution"
+            )
+        return bins * self.sample_rate / period
+    
+    def generate_multitone(self, frequencies, amplitude=0.5, period_samples=None,
+                           phases="schroeder"):
+        """
+        Generate a sum of equal-amplitude sines that are exactly periodic in
+        period_samples, so every tone lands on an FFT bin of any whole-period
+        analysis window (no leakage, no window needed).
+        
+        Tone phases follow Schroeder's or Newman's rule, which keeps the crest
+        factor low; the sum is then normalized to the requested peak.
+        
+        Args:
+            frequencies: List of frequencies in Hz (snapped with bin_frequencies())
+            amplitude: Peak amplitude of the sum (0.0 to 1.0)
+            period_samples: Period in samples (default None = one second)
+            phases: "schroeder" or "newman"
+            
+        Returns:
+            numpy array of shape (num_samples, channels)
+        """
+        period = period_samples or self.sample_rate
+        freqs = self.bin_frequencies(frequencies, period)
+        bins = np.round(freqs * period / self.sample_rate).astype(int)
+        
+        k = np.arange(1, len(bins) + 1)
+        if phases == "schroeder":
+            phi = -np.pi * k * (k - 1) / len(bins)
+        elif phases == "newman":
+            phi = np.pi * (k - 1) ** 2 / len(bins)
+        else:
+            raise ValueError(f"Unknown phase rule: {phases}")
+        
+        # Build one period in the frequency domain and tile it
+        spectrum = np.zeros(period // 2 + 1, dtype=complex)
+        spectrum[bins] = np.exp(1j * phi) * (period / 2)
+        one_period = np.fft.irfft(spectrum, n=period)
+        one_period *= amplitude / np.max(np.abs(one_period))
+        
+        signal = np.resize(one_period, self.num_samples)
         # Duplicate to all channels
         signal = np.tile(signal.reshape(-1, 1), (1, self.channels))
         return signal
@@ -101,32 +199,16 @@ class SignalGenerator:
         signal = amplitude * np.random.randn(self.num_samples, self.channels)
         return signal
     
-    def save_wav(self, signal, filename):
+    def save_wav(self, signal, filename, bit_depth=16):
         """
         Save signal as WAV file.
         
         Args:
             signal: numpy array of shape (num_samples, channels)
             filename: Output filename (can be string or Path)
+            bit_depth: 16 or 24 for PCM, 32 for IEEE float (default 16)
         """
-        filename = Path(filename)
-        filename.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Ensure signal is in range [-1, 1]
-        signal = np.clip(signal, -1.0, 1.0)
-        
-        # Convert to 16-bit PCM
-        signal_int = (signal * 32767).astype(np.int16)
-        
-        with wave.open(str(filename), 'w') as wav_file:
-            wav_file.setnchannels(self.channels)
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(self.sample_rate)
-            
-            # Interleave channels
-            for frame in signal_int:
-                for sample in frame:
-                    wav_file.writeframes(struct.pack('<h', sample))
+        write_wav(filename, signal, self.sample_rate, bit_depth=bit_depth)
 
 
 def generate_standard_test_signals(output_dir="test_signals", sample_rate=48000):
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Streaming, constant-memory analysis of rendered audio.
+Consumes a file chunk by chunk and accumulates, per channel, a Welch PSD and
+cross-spectra, peak, RMS, DC and NaN/Inf/denormal counts. Only one analysis
+segment of samples is carried between chunks, so hour-long soak renders are
+analyzed without loading them.
+"""
+
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+from wav_io import CHUNK_FRAMES, MappedWav
+
+
+# Welch segment length and overlap (scipy.signal.welch defaults are 256 / 50%)
+DEFAULT_NPERSEG = 4096
+DEFAULT_OVERLAP = 0.5
+
+# Peak/RMS history resolution
+DEFAULT_HISTORY_SEC = 1.0
+
+
+def periodic_hann(length):
+    """Periodic Hann window (the DFT-even form Welch estimates use)."""
+    return 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(length) / length)
+
+
+class StreamStats:
+    """Result of a streaming analysis."""
+
+    def __init__(self, sample_rate, channels, frames, frequencies, psd, csd, segments,
+                 peak, rms, dc, nan_count, inf_count, denormal_count, first_nonfinite,
+                 peak_history, rms_history, history_sec):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = frames
+        self.frequencies = frequencies
+        self.psd = psd
+        self._csd = csd
+        self.segments = segments
+        self.peak = peak
+        self.rms = rms
+        self.dc = dc
+        self.nan_count = nan_count
+        self.inf_count = inf_count
+        self.denormal_count = denormal_count
+        self.first_nonfinite = first_nonfinite
+        self.peak_history = peak_history
+        self.rms_history = rms_history
+        self.history_sec = history_sec
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    @property
+    def is_finite(self):
+        """True if no channel contained NaN or Inf."""
+        return not (self.nan_count.any() or self.inf_count.any())
+
+    @property
+    def peak_db(self):
+        with np.errstate(divide='ignore'):
+            return 20 * np.log10(self.peak)
+
+    @property
+    def rms_db(self):
+        with np.errstate(divide='ignore'):
+            return 20 * np.log10(self.rms)
+
+    def csd(self, a, b):
+        """
+        Cross-spectral density of channels a and b (conj(A) * B, like
+        scipy.signal.csd).
+
+        Raises:
+            KeyError: If the pair wasn't accumulated
+        """
+        if a == b:
+            return self.psd[a].astype(complex)
+        if (a, b) in self._csd:
+            return self._csd[(a, b)]
+        return np.conj(self._csd[(b, a)])
+
+    def coherence(self, a, b):
+        """Magnitude-squared coherence of channels a and b."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.abs(self.csd(a, b)) ** 2 / (self.psd[a] * self.psd[b])
+
+    def summary(self):
+        """Per-channel scalars as a JSON-friendly dict."""
+        return {
+            'frames': int(self.frames),
+            'segments': int(self.segments),
+            'peak': self.peak.tolist(),
+            'rms': self.rms.tolist(),
+            'dc': self.dc.tolist(),
+            'nan': self.nan_count.tolist(),
+            'inf': self.inf_count.tolist(),
+            'denormal': self.denormal_count.tolist(),
+            'first_nonfinite': self.first_nonfinite.tolist(),
+        }
+
+
+class StreamingAnalyzer:
+    """
+    Accumulates spectral and level statistics over consecutive chunks.
+
+    Memory is bounded by one segment of carried samples plus the spectra;
+    the peak/RMS history holds one value per history_sec per channel.
+    """
+
+    def __init__(self, sample_rate, channels, nperseg=DEFAULT_NPERSEG, overlap=DEFAULT_OVERLAP,
+                 cross_pairs=None, history_sec=DEFAULT_HISTORY_SEC):
+        """
+        Args:
+            sample_rate: Sample rate in Hz
+            channels: Number of channels
+            nperseg: Welch segment length in frames
+            overlap: Segment overlap as a fraction of nperseg (0 <= overlap < 1)
+            cross_pairs: Channel pairs (a, b) to accumulate cross-spectra for
+                         (default None = every pair; [] = none)
+            history_sec: Resolution of the peak/RMS history (None = no history)
+        """
+        if not 0 <= overlap < 1:
+            raise ValueError(f"overlap must be in [0, 1), got {overlap}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.nperseg = int(nperseg)
+        self.hop = max(1, self.nperseg - int(round(self.nperseg * overlap)))
+        if cross_pairs is None:
+            cross_pairs = list(combinations(range(channels), 2))
+        self.cross_pairs = [tuple(pair) for pair in cross_pairs]
+        self.window = periodic_hann(self.nperseg)
+        # One-sided density scaling; DC and Nyquist aren't doubled
+        self._scale = np.full(self.nperseg // 2 + 1, 2.0 / (sample_rate * np.sum(self.window ** 2)))
+        self._scale[0] /= 2
+        if self.nperseg % 2 == 0:
+            self._scale[-1] /= 2
+
+        self._history_frames = (None if history_sec is None
+                                else max(1, int(round(history_sec * sample_rate))))
+        self.history_sec = history_sec
+        self.reset()
+
+    def reset(self):
+        """Forget everything accumulated so far."""
+        ch, nfreq = self.channels, self.nperseg // 2 + 1
+        self.frames = 0
+        self.segments = 0
+        self._carry = np.zeros((0, ch))
+        self._psd_sum = np.zeros((ch, nfreq))
+        self._csd_sum = {pair: np.zeros(nfreq, dtype=complex) for pair in self.cross_pairs}
+        self._peak = np.zeros(ch)
+        self._sum = np.zeros(ch)
+        self._sum_sq = np.zeros(ch)
+        self._nan = np.zeros(ch, dtype=np.int64)
+        self._inf = np.zeros(ch, dtype=np.int64)
+        self._denormal = np.zeros(ch, dtype=np.int64)
+        self._first_nonfinite = np.full(ch, -1, dtype=np.int64)
+        self._interval_peak = np.zeros(ch)
+        self._interval_sum_sq = np.zeros(ch)
+        self._interval_fill = 0
+        self._peak_history = []
+        self._rms_history = []
+
+    def update(self, chunk):
+        """
+        Add the next chunk of samples.
+
+        Args:
+            chunk: Float array of shape (frames, channels) or (frames,) for
+                   one channel. Denormals are counted relative to its dtype,
+                   so pass float32 files as float32.
+        """
+        chunk = np.asarray(chunk)
+        if chunk.ndim == 1:
+            chunk = chunk.reshape(-1, 1)
+        if chunk.shape[1] != self.channels:
+            raise ValueError(f"Expected {self.channels} channels, got {chunk.shape[1]}")
+        if len(chunk) == 0:
+            return
+
+        magnitude = np.abs(chunk)
+        nan = np.isnan(chunk)
+        inf = np.isinf(chunk)
+        tiny = np.finfo(chunk.dtype).tiny if chunk.dtype.kind == 'f' else 0
+        self._nan += nan.sum(axis=0)
+        self._inf += inf.sum(axis=0)
+        self._denormal += ((magnitude > 0) & (magnitude < tiny)).sum(axis=0)
+
+        nonfinite = nan | inf
+        if nonfinite.any():
+            first = np.where(nonfinite.any(axis=0), nonfinite.argmax(axis=0) + self.frames, -1)
+            unset = self._first_nonfinite < 0
+            self._first_nonfinite[unset] = first[unset]
+            # Non-finite samples count above; everything else treats them as 0
+            chunk = np.where(nonfinite, 0.0, chunk)
+            magnitude = np.where(nonfinite, 0.0, magnitude)
+
+        samples = chunk.astype(np.float64)
+        self._peak = np.maximum(self._peak, magnitude.max(axis=0))
+        self._sum += samples.sum(axis=0)
+        squares = samples ** 2
+        self._sum_sq += squares.sum(axis=0)
+        if self._history_frames is not None:
+            self._update_history(magnitude, squares)
+        self.frames += len(samples)
+
+        self._update_spectra(samples)
+
+    def _update_history(self, magnitude, squares):
+        """Close peak/RMS intervals as they fill."""
+        pos = 0
+        while pos < len(squares):
+            take = min(len(squares) - pos, self._history_frames - self._interval_fill)
+            self._interval_peak = np.maximum(self._interval_peak,
+                                             magnitude[pos:pos + take].max(axis=0))
+            self._interval_sum_sq += squares[pos:pos + take].sum(axis=0)
+            self._interval_fill += take
+            pos += take
+            if self._interval_fill == self._history_frames:
+                self._close_interval()
+
+    def _close_interval(self):
+        self._peak_history.append(self._interval_peak)
+        self._rms_history.append(np.sqrt(self._interval_sum_sq / self._interval_fill))
+        self._interval_peak = np.zeros(self.channels)
+        self._interval_sum_sq = np.zeros(self.channels)
+        self._interval_fill = 0
+
+    def _update_spectra(self, samples):
+        """Transform every complete segment; carry the rest to the next chunk."""
+        data = np.concatenate([self._carry, samples]) if len(self._carry) else samples
+        if len(data) < self.nperseg:
+            self._carry = data.copy()
+            return
+
+        count = (len(data) - self.nperseg) // self.hop + 1
+        # (count, channels, nperseg) strided view, no copy
+        segments = np.lib.stride_tricks.sliding_window_view(data, self.nperseg, axis=0)
+        segments = segments[::self.hop][:count]
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        spectra = np.fft.rfft(segments * self.window, axis=-1)
+
+        self._psd_sum += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=0)
+        for a, b in self.cross_pairs:
+            self._csd_sum[(a, b)] += np.sum(np.conj(spectra[:, a]) * spectra[:, b], axis=0)
+        self.segments += count
+        self._carry = data[count * self.hop:].copy()
+
+    def result(self):
+        """
+        Statistics of everything seen so far.
+
+        Returns:
+            StreamStats; psd and cross-spectra are None until at least one
+            full segment has been seen
+        """
+        frames = max(self.frames, 1)
+        frequencies = np.fft.rfftfreq(self.nperseg, 1.0 / self.sample_rate)
+        if self.segments:
+            psd = self._psd_sum * self._scale / self.segments
+            csd = {pair: total * self._scale / self.segments
+                   for pair, total in self._csd_sum.items()}
+        else:
+            psd, csd = None, {}
+
+        peak_history = list(self._peak_history)
+        rms_history = list(self._rms_history)
+        if self._interval_fill:
+            peak_history.append(self._interval_peak)
+            rms_history.append(np.sqrt(self._interval_sum_sq / self._interval_fill))
+        shape = (0, self.channels)
+
+        return StreamStats(
+            self.sample_rate, self.channels, self.frames, frequencies, psd, csd, self.segments,
+            peak=self._peak.copy(),
+            rms=np.sqrt(self._sum_sq / frames),
+            dc=self._sum / frames,
+            nan_count=self._nan.copy(),
+            inf_count=self._inf.copy(),
+            denormal_count=self._denormal.copy(),
+            first_nonfinite=self._first_nonfinite.copy(),
+            peak_history=np.array(peak_history).reshape(-1, self.channels) if peak_history
+            else np.zeros(shape),
+            rms_history=np.array(rms_history).reshape(-1, self.channels) if rms_history
+            else np.zeros(shape),
+            history_sec=self.history_sec,
+        )
+
+
+def analyze_file(filename, nperseg=DEFAULT_NPERSEG, overlap=DEFAULT_OVERLAP, cross_pairs=None,
+                 history_sec=DEFAULT_HISTORY_SEC, chunk_frames=CHUNK_FRAMES, start=0, stop=None):
+    """
+    Analyze a WAV file chunk by chunk through its memory map.
+
+    Args:
+        filename: Path to WAV file
+        nperseg: Welch segment length in frames
+        overlap: Segment overlap fraction
+        cross_pairs: Channel pairs for cross-spectra (default None = all)
+        history_sec: Peak/RMS history resolution (None = no history)
+        chunk_frames: Frames converted per chunk
+        start: First frame (default 0)
+        stop: End frame, exclusive (default None = end of file)
+
+    Returns:
+        StreamStats
+    """
+    with MappedWav(filename) as wav:
+        # Float files keep their own precision so float32 denormals are seen as such
+        dtype = np.float32 if wav.is_float and wav.bit_depth == 32 else np.float64
+        analyzer = StreamingAnalyzer(wav.sample_rate, wav.channels, nperseg, overlap,
+                                     cross_pairs, history_sec)
+        stop = len(wav) if stop is None else min(stop, len(wav))
+        for pos in range(start, stop, chunk_frames):
+            analyzer.update(wav.read(pos, min(pos + chunk_frames, stop), dtype=dtype))
+        return analyzer.result()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Streaming analysis of a WAV file")
+    parser.add_argument("wav", help="WAV file to analyze")
+    parser.add_argument("--nperseg", type=int, default=DEFAULT_NPERSEG)
+    args = parser.parse_args()
+
+    stats = analyze_file(Path(args.wav), nperseg=args.nperseg)
+    print(f"{args.wav}: {stats.duration:.1f} s, {stats.channels} ch, "
+          f"{stats.segments} segments")
+    for ch in range(stats.channels):
+        peak_freq = (stats.frequencies[np.argmax(stats.psd[ch])]
+                     if stats.psd is not None else float('nan'))
+        print(f"  ch{ch}: peak {stats.peak_db[ch]:+7.2f} dBFS | rms {stats.rms_db[ch]:+7.2f} dBFS"
+              f" | dc {stats.dc[ch]:+.2e} | nan {stats.nan_count[ch]} inf {stats.inf_count[ch]}"
+              f" denormal {stats.denormal_count[ch]} | psd max at {peak_freq:.1f} Hz")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test script for asyncio render orchestration (async_render.py).
+Uses the reference backend, a slow fake backend and fake REAPER commands;
+runs without REAPER.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from async_render import AsyncRenderer
+from biquad_reference import ReferenceRenderer
+from jsfx_tester import JSFXTester
+from render_scheduler import RenderJob
+from signal_generator import SignalGenerator
+
+
+class SlowBackend(ReferenceRenderer):
+    """Reference renderer that takes a while and counts overlapping renders."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def render_with_effect(self, *args, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            return super().render_with_effect(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _process_alive(pid):
+    """True while pid exists and isn't a zombie."""
+    try:
+        status = Path(f"/proc/{pid}/status").read_text()
+    except OSError:
+        return False
+    return "\nState:\tZ" not in status
+
+
+def test_frequency_response_matches_tester():
+    """The async pipeline gives the synchronous results and reports each stage."""
+    sliders = {"cutoffFreq": 1000, "qSlider": 0.707, "slopeSelector": 1}
+    test_freqs = [100, 1000, 2000, 4000]
+    events = []
+
+    async def progress(freq, stage, completed, total):
+        events.append((freq, stage, completed, total))
+
+    renderer = AsyncRenderer(JSFXTester(backend=ReferenceRenderer()), max_concurrent=2)
+    results = asyncio.run(renderer.test_frequency_response(
+        "BiquadLowPass", test_freqs, sliders, progress=progress))
+    expected = JSFXTester(backend=ReferenceRenderer()).test_frequency_response(
+        "BiquadLowPass", test_freqs, sliders)
+
+    assert list(results) == test_freqs
+    for freq in test_freqs:
+        assert abs(results[freq]['attenuation_db'] - expected[freq]['attenuation_db']) < 1e-6
+    for freq in test_freqs:
+        stages = [stage for f, stage, _, _ in events if f == freq]
+        assert stages == ['generated', 'rendered', 'analyzed']
+    analyzed = [completed for _, stage, completed, _ in events if stage == 'analyzed']
+    assert sorted(analyzed) == [1, 2, 3, 4]
+    assert all(total == 4 for *_, total in events)
+
+
+def test_concurrency_limit_and_job_timeout():
+    """No more than max_concurrent renders run at once; slow jobs time out."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=48000, duration=0.1)
+        input_wav = tmpdir / "noise.wav"
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), input_wav)
+        jobs = [RenderJob(f"job{i}", "BiquadLowPass", input_wav) for i in range(6)]
+
+        backend = SlowBackend(delay=0.2)
+        renderer = AsyncRenderer(JSFXTester(backend=backend), max_concurrent=2)
+        seen = []
+        results = asyncio.run(renderer.render_many(
+            jobs, tmpdir / "out", progress=lambda result, done, total: seen.append(done)))
+        assert all(result.ok for result in results.values())
+        assert list(results) == [job.job_id for job in jobs]
+        assert backend.max_active == 2
+        assert seen == [1, 2, 3, 4, 5, 6]
+
+        renderer = AsyncRenderer(JSFXTester(backend=SlowBackend(delay=1.0)), timeout=0.2)
+        results = asyncio.run(renderer.render_many(jobs[:1], tmpdir / "slow"))
+        assert "Timed out" in results["job0"].error
+
+
+def test_hung_reaper_process_tree_is_killed():
+    """A per-job timeout or a missed deadline kills REAPER and its children."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        pid_dir = tmpdir / "pids"
+        pid_dir.mkdir()
+        # Fake REAPER that starts a child and waits on it forever
+        hung_reaper = tmpdir / "hung_reaper"
+        hung_reaper.write_text(
+            "#!/bin/sh\n"
+            "sleep 30 &\n"
+            f"echo $$ $! > {pid_dir}/$$\n"
+            "wait\n"
+        )
+        os.chmod(hung_reaper, 0o755)
+
+        gen = SignalGenerator(sample_rate=48000, duration=0.1)
+        input_wav = tmpdir / "noise.wav"
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), input_wav)
+        tester = JSFXTester(reaper_command=str(hung_reaper))
+
+        renderer = AsyncRenderer(tester, timeout=0.5)
+        start = time.monotonic()
+        try:
+            asyncio.run(renderer.render("BiquadLowPass", input_wav, tmpdir / "out.wav"))
+        except subprocess.TimeoutExpired:
+            pass
+        else:
+            raise AssertionError("hung render didn't time out")
+        assert time.monotonic() - start < 10
+
+        jobs = [RenderJob(f"job{i}", "BiquadLowPass", input_wav) for i in range(3)]
+        renderer = AsyncRenderer(tester, max_concurrent=2, timeout=30)
+        start = time.monotonic()
+        results = asyncio.run(renderer.render_many(jobs, tmpdir / "out", deadline=0.5))
+        assert time.monotonic() - start < 10
+        assert all("Deadline" in result.error for result in results.values())
+
+        # Two hung renders were cancelled, the third never got a slot
+        pids = [int(pid) for pid_file in pid_dir.iterdir() for pid in pid_file.read_text().split()]
+        assert len(pids) == 6
+        deadline = time.monotonic() + 5
+        while any(_process_alive(pid) for pid in pids) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not any(_process_alive(pid) for pid in pids)
+
+
+def test_sync_and_async_reaper_renders_agree():
+    """Both render paths share one project and command; a fake REAPER echoes its input."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        # Fake REAPER: log the command line, "render" by copying the input next
+        # to the project (argument 3), or render nothing for the missing case
+        fake_reaper = tmpdir / "fake_reaper"
+        fake_reaper.write_text(
+            "#!/bin/sh\n"
+            f"echo \"$@\" >> {tmpdir}/commands\n"
+            "case \"$5\" in *missing*) echo failed >&2; exit 1;; esac\n"
+            f"cp {tmpdir}/noise.wav \"$(dirname \"$3\")/render.wav\"\n"
+        )
+        os.chmod(fake_reaper, 0o755)
+
+        gen = SignalGenerator(sample_rate=48000, duration=0.1)
+        input_wav = tmpdir / "noise.wav"
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), input_wav)
+        tester = JSFXTester(reaper_command=str(fake_reaper))
+
+        sync_out = tester.render_with_effect("BiquadLowPass", input_wav, tmpdir / "sync.wav")
+        async_out = asyncio.run(AsyncRenderer(tester).render("BiquadLowPass", input_wav,
+                                                             tmpdir / "async.wav"))
+        assert sync_out.read_bytes() == async_out.read_bytes() == input_wav.read_bytes()
+        sync_cmd, async_cmd = (line.split() for line in
+                               (tmpdir / "commands").read_text().splitlines())
+        assert sync_cmd[3:] == ["-saveas", str(tmpdir / "sync.rpp"), "-close:nosave:exit"]
+        assert async_cmd[3:] == ["-saveas", str(tmpdir / "async.rpp"), "-close:nosave:exit"]
+
+        for render in (lambda out: tester.render_with_effect("BiquadLowPass", input_wav, out),
+                       lambda out: asyncio.run(AsyncRenderer(tester).render(
+                           "BiquadLowPass", input_wav, out))):
+            try:
+                render(tmpdir / "missing.wav")
+            except RuntimeError as err:
+                assert "No rendered output found" in str(err) and "failed" in str(err)
+            else:
+                raise AssertionError("a render without output succeeded")
+
+
+if __name__ == "__main__":
+    test_frequency_response_matches_tester()
+    test_concurrency_limit_and_job_timeout()
+    test_hung_reaper_process_tree_is_killed()
+    test_sync_and_async_reaper_renders_agree()
+    print("\nAll async render tests passed!")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the CPU benchmark suite (benchmark.py).
+Uses the NumPy reference renderer, so it runs without a REAPER install.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import benchmark
+from biquad_reference import ReferenceRenderer
+from jsfx_interpreter import InterpreterRenderer
+from jsfx_tester import JSFXTester
+
+
+def test_plan_covers_every_plugin_and_slope():
+    """Every plugin in plugins/ is benchmarked at each of its slopes and stimuli."""
+    cases = benchmark.plan_benchmark(channels=[2], sample_rates=[48000], stimuli=['noise'])
+    slopes = {}
+    for case in cases:
+        slopes.setdefault(case['plugin'], []).append(case['slope'])
+    assert slopes == {
+        'BiquadHighPass.jsfx': [0, 1, 2, 3],
+        'BiquadLowPass.jsfx': [0, 1, 2, 3],
+        'BiquadLowPassGraphPrototype.jsfx': [0, 1, 2, 3, 4, 5],
+    }
+    cases = benchmark.plan_benchmark(channels=[2], sample_rates=[48000])
+    assert {case['stimulus'] for case in cases} == {'noise', 'silence_tail'}
+    assert len(cases) == 28
+
+
+def test_results_are_stored_and_compared():
+    """A run is stored per commit and slower cases are flagged."""
+    print("=" * 60)
+    print("Benchmark Suite")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cases = [case for case in benchmark.plan_benchmark(channels=[1, 8],
+                                                           sample_rates=[48000],
+                                                           stimuli=['noise'])
+                 if case['plugin'] == 'BiquadLowPass.jsfx' and case['slope'] in (0, 3)]
+        tester = JSFXTester(backend=ReferenceRenderer(tail_ms=0))
+        results = benchmark.run_benchmark(cases, tester, duration=0.05, repeats=1)
+
+        for result in results:
+            print(f"slope {result['slope']} {result['channels']}ch | "
+                  f"RTF {result['realtime_factor']:.3f}")
+            assert result['wall_time'] > 0
+            assert result['overhead'] == 0
+
+        path = benchmark.save_results(results, "reference", tmpdir)
+        stored = benchmark.load_results(path)
+        assert stored['results'] == results
+        assert benchmark.find_baseline(tmpdir, exclude=path) is None
+
+        # A run with local changes is compared against the clean run of its commit
+        dirty_path = Path(tmpdir) / f"{stored['commit']}-dirty.json"
+        dirty_path.write_text(path.read_text())
+        assert benchmark.find_baseline(tmpdir, exclude=dirty_path)['commit'] == stored['commit']
+        assert benchmark.find_baseline(tmpdir, exclude=dirty_path,
+                                       commit=stored['commit'][:7]) is not None
+        assert benchmark.find_baseline(tmpdir, exclude=dirty_path, backend="reaper") is None
+        if stored['commit'] != "unknown":
+            assert benchmark.resolve_commit(stored['commit'][:7]) == stored['commit']
+
+        slower = [dict(r, realtime_factor=r['realtime_factor'] * 1.5) for r in results]
+        regressions = benchmark.find_regressions(slower, results, threshold=0.1)
+        assert len(regressions) == len(results)
+        assert not benchmark.find_regressions(results, slower, threshold=0.1)
+
+
+def test_silent_tail_is_cheaper():
+    """After the signal stops, the silence bypass skips the biquad cascade."""
+    cases = [case for case in benchmark.plan_benchmark(channels=[4], sample_rates=[48000])
+             if case['plugin'] == 'BiquadLowPass.jsfx' and case['slope'] == 3]
+    tester = JSFXTester(backend=InterpreterRenderer(tail_ms=0))
+    results = benchmark.run_benchmark(cases, tester, duration=0.25, repeats=1,
+                                      subtract_overhead=True)
+    wall = {result['stimulus']: result['wall_time'] for result in results}
+    print(f"noise {wall['noise']:.2f}s | silence tail {wall['silence_tail']:.2f}s | "
+          f"bypass {results[0]['overhead']:.2f}s")
+    assert wall['silence_tail'] < 0.6 * wall['noise']
+    # One bypass render per sample rate and channel count, shared by both stimuli
+    assert 0 < results[0]['overhead'] == results[1]['overhead']
+
+
+if __name__ == "__main__":
+    test_plan_covers_every_plugin_and_slope()
+    test_results_are_stored_and_compared()
+    test_silent_tail_is_cheaper()
+    print("\nAll benchmark tests passed!")
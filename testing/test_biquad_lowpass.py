@@ -4,6 +4,7 @@ Test script for BiquadLowPass.jsfx
 Tests the new biquad-based low-pass filter with logarithmic frequency control.
 """
 
+import math
 import sys
 from pathlib import Path
 
@@ -11,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from jsfx_tester import JSFXTester
+from render_cache import RenderCache
 
 
 def test_biquad_lowpass():
@@ -20,33 +22,19 @@ def test_biquad_lowpass():
     print("JSFX Biquad Low-Pass Filter Test")
     print("=" * 60)
     
-    # Initialize tester
-    tester = JSFXTester()
+    # Initialize tester; unchanged renders are reused across runs
+    tester = JSFXTester(cache=RenderCache(Path(__file__).parent / ".render_cache"))
     jsfx_path = str(Path.home() / ".config/REAPER/Effects/Croft/BiquadLowPass.jsfx")
     
     # Test frequencies
     test_freqs = [50, 100, 200, 500, 1000, 2000, 5000, 10000]
     
-    # Test at different cutoff frequencies
-    # freqSlider is 0-100%, logarithmic mapping from 20Hz to 20kHz
-    # We'll calculate the slider values for specific frequencies
-    def freq_to_slider(freq_hz):
-        """Convert frequency to slider percentage (logarithmic)."""
-        import math
-        min_freq = 20
-        max_freq = 20000
-        log_min = math.log(min_freq)
-        log_max = math.log(max_freq)
-        log_freq = math.log(freq_hz)
-        return ((log_freq - log_min) / (log_max - log_min)) * 100
-    
     # Test frequencies
     test_cutoffs = [100, 500, 1000, 2000, 5000]
     
     for cutoff in test_cutoffs:
-        slider_value = freq_to_slider(cutoff)
         print(f"\n{'=' * 60}")
-        print(f"Testing with cutoff: {cutoff} Hz (slider: {slider_value:.1f}%)")
+        print(f"Testing with cutoff: {cutoff} Hz")
         print(f"Resonance Q: 0.707 (Butterworth)")
         print(f"{'=' * 60}")
         print(f"{'Frequency':>10} | {'Attenuation':>12} | {'Status':>10}")
@@ -55,8 +43,9 @@ def test_biquad_lowpass():
         results = tester.test_frequency_response(
             jsfx_path=jsfx_path,
             test_frequencies=test_freqs,
-            slider_values={"freqSlider": slider_value, "qSlider": 0.707},
-            sample_rate=48000
+            slider_values={"cutoffFreq": cutoff, "qSlider": 0.707},
+            sample_rate=48000,
+            batched=True
         )
         
         for freq in sorted(results.keys()):
@@ -105,5 +94,4 @@ def test_biquad_lowpass():
 
 
 if __name__ == "__main__":
-    import math
     test_biquad_lowpass()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for the NumPy reference renderer (biquad_reference.py).
+Runs without REAPER, so it can be used on any machine with NumPy.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import biquad_reference
+from biquad_reference import ReferenceRenderer
+from jsfx_interpreter import InterpreterRenderer
+from jsfx_tester import AudioAnalyzer, JSFXTester
+from signal_generator import SignalGenerator
+
+
+def test_reference_lowpass_response():
+    """Butterworth low-pass should be ~0 dB in the passband and -3 dB at cutoff."""
+    print("=" * 60)
+    print("Reference Low-Pass Response (cutoff 1000 Hz, Q 0.707)")
+    print("=" * 60)
+
+    tester = JSFXTester(backend=ReferenceRenderer())
+    results = tester.test_frequency_response(
+        jsfx_path="BiquadLowPass.jsfx",
+        test_frequencies=[100, 1000, 4000],
+        slider_values={"cutoffFreq": 1000, "qSlider": 0.7071},
+        sample_rate=48000,
+        batched=True
+    )
+
+    for freq in sorted(results):
+        print(f"{freq:>10} Hz | {results[freq]['attenuation_db']:>+10.2f} dB")
+
+    assert abs(results[100]['attenuation_db']) < 0.1
+    assert abs(results[1000]['attenuation_db'] + 3.01) < 0.1
+    assert results[4000]['attenuation_db'] < -20
+
+
+def test_reference_batching_is_exact():
+    """Vectorized parameter sets must match one-at-a-time processing bit for bit."""
+    gen = SignalGenerator(sample_rate=48000, duration=0.1)
+    noise = gen.generate_white_noise(amplitude=0.1)
+
+    slider_sets = [
+        {"cutoffFreq": cutoff, "slopeSelector": slope}
+        for cutoff in (200, 2000)
+        for slope in range(6)
+    ]
+    batch = biquad_reference.process_parameter_sets(
+        noise, "BiquadLowPassGraphPrototype", slider_sets
+    )
+    for idx, sliders in enumerate(slider_sets):
+        single = biquad_reference.process(noise, "BiquadLowPassGraphPrototype", sliders)
+        assert np.array_equal(batch[idx], single), sliders
+
+
+def test_reference_channel_handling():
+    """BiquadHighPass only filters the first two channels."""
+    gen = SignalGenerator(sample_rate=48000, duration=0.05, channels=4)
+    noise = gen.generate_white_noise(amplitude=0.1)
+
+    out = biquad_reference.process(noise, "BiquadHighPass", {"cutoffFreq": 5000})
+    assert not np.allclose(out[:, :2], noise[:, :2])
+    assert np.array_equal(out[:, 2:], noise[:, 2:])
+
+
+def test_display_sliders_are_accepted():
+    """The graph prototype's analyzer sliders are accepted and don't change the audio."""
+    sliders = {"cutoffFreq": 1000, "slopeSelector": 2}
+    display = {"spectrumShow": 0, "spectrumRate": 30, "spectrumSizeMode": 2}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=48000, duration=0.05)
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), tmpdir / "noise.wav")
+
+        renders = []
+        for backend, values in [(ReferenceRenderer(tail_ms=0), sliders),
+                                (ReferenceRenderer(tail_ms=0), dict(sliders, **display)),
+                                (InterpreterRenderer(tail_ms=0), dict(sliders, **display))]:
+            path = backend.render_with_effect("BiquadLowPassGraphPrototype",
+                                              tmpdir / "noise.wav",
+                                              tmpdir / f"out{len(renders)}.wav", values)
+            renders.append(AudioAnalyzer.read_wav(path)[0])
+        assert np.array_equal(renders[0], renders[1])
+        assert np.array_equal(renders[1], renders[2])
+
+    try:
+        biquad_reference.process(np.zeros((10, 2)), "BiquadLowPass", {"spectrumShow": 0})
+    except ValueError as err:
+        assert "spectrumShow" in str(err)
+    else:
+        raise AssertionError("a display slider of another plugin was accepted")
+
+
+def test_silence_bypass_and_denormal_flush():
+    """Silent channels are bypassed once decayed and restart from rest."""
+    sample_rate = 48000
+    sliders = {"cutoffFreq": 1000, "qSlider": 2.5, "slopeSelector": 3}
+    rng = np.random.default_rng(22)
+    x = np.zeros((sample_rate, 2))
+    x[:4000] = rng.standard_normal((4000, 2)) * 0.3
+    x[30000:32000, 0] = rng.standard_normal(2000) * 0.3
+
+    out = biquad_reference.process(x, "BiquadLowPass", sliders, sample_rate)
+    unbypassed = biquad_reference.process(x, "BiquadLowPass", sliders, sample_rate,
+                                          silence_threshold=0)
+
+    # Bypassed on a block start after the decay, then exactly zero
+    block = biquad_reference.BLOCK_SIZE
+    silent = np.flatnonzero(out[:, 1] == 0)
+    assert silent[0] % block == 0 and silent[0] > 4000
+    assert np.all(out[silent[0]:, 1] == 0)
+    assert np.all(out[silent[0]:30000, 0] == 0)
+    # Resuming starts from rest, which the decayed filter was within the threshold of
+    restarted = biquad_reference.process(x[30000:], "BiquadLowPass", sliders, sample_rate)
+    assert np.array_equal(out[30000:32000, 0], restarted[:2000, 0])
+    assert np.max(np.abs(out - unbypassed)) < 1e-7
+
+    # Without the bypass, a decaying state never goes subnormal
+    impulse = np.zeros((200000, 1))
+    impulse[0] = 1
+    coeffs = biquad_reference.biquad_lowpass_coeffs(1000, 2.5, sample_rate)
+    y = biquad_reference.process_biquad(impulse, coeffs)
+    assert np.all((y == 0) | (np.abs(y) >= biquad_reference.DENORMAL_THRESHOLD))
+    assert np.all(y[-1000:] == 0)
+
+    # The -18 dB/oct one-pole after the bank decays to zero on a silent tail too
+    sliders = {"cutoffFreq": 1000, "qSlider": 2.5, "slopeSelector": 1}
+    out = biquad_reference.process(x[:30000], "BiquadLowPassGraphPrototype", sliders,
+                                   sample_rate)
+    assert np.all((out == 0) | (np.abs(out) >= biquad_reference.DENORMAL_THRESHOLD))
+    assert np.all(out[-1000:] == 0)
+
+
+if __name__ == "__main__":
+    test_reference_lowpass_response()
+    test_reference_batching_is_exact()
+    test_reference_channel_handling()
+    test_display_sliders_are_accepted()
+    test_silence_bypass_and_denormal_flush()
+    print("\nAll reference renderer tests passed!")
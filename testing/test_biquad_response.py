@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for the analytic biquad response engine (biquad_response.py).
+Runs without REAPER, so it can be used on any machine with NumPy.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import biquad_reference
+from biquad_response import decay_tail_ms, magnitude_db, plugin_response, response_grid
+
+
+def test_response_matches_rendered_impulse():
+    """The analytic response must match the FFT of the reference impulse response."""
+    sample_rate = 48000
+    impulse = np.zeros(1 << 15)
+    impulse[0] = 1.0
+    freqs = np.fft.rfftfreq(len(impulse), 1 / sample_rate)
+
+    for plugin, sliders in [
+        ("BiquadLowPass", {"cutoffFreq": 1000, "qSlider": 2.0, "slopeSelector": 2}),
+        ("BiquadHighPass", {"cutoffFreq": 200, "slopeSelector": 1}),
+        ("BiquadLowPassGraphPrototype", {"cutoffFreq": 3000, "slopeSelector": 1}),
+    ]:
+        # The linear filter: the silence bypass truncates the decay below -160 dB
+        ir = biquad_reference.process(impulse, plugin, sliders, sample_rate,
+                                      silence_threshold=0)[:, 0]
+        measured = np.fft.rfft(ir)
+        analytic = plugin_response(plugin, freqs, sample_rate=sample_rate, **sliders)
+        assert np.allclose(measured, analytic, atol=1e-9), plugin
+
+
+def test_grid_shape_and_slopes():
+    """A 5-D grid evaluates in one call with the expected cutoff behaviour."""
+    print("=" * 60)
+    print("Analytic Response Grid")
+    print("=" * 60)
+
+    freqs = np.geomspace(20, 20000, 500)
+    cutoffs = np.geomspace(20, 20000, 100)
+    qs = np.linspace(0.1, 10, 20)
+    slopes = np.arange(6)
+    sample_rates = [44100, 48000, 96000]
+
+    start = time.perf_counter()
+    grid = response_grid("BiquadLowPassGraphPrototype", freqs, cutoffs, qs, slopes,
+                         sample_rates)
+    elapsed = time.perf_counter() - start
+    print(f"{grid.size:,} points in {elapsed:.2f} s")
+    assert grid.shape == (500, 100, 20, 6, 3)
+
+    # At the cutoff a Q=0.7071 stage is -3.01 dB; stages add up
+    stages = np.array([1, 1, 2, 3, 4, 6])
+    at_cutoff = magnitude_db(plugin_response(
+        "BiquadLowPassGraphPrototype", 1000, 1000, 1 / np.sqrt(2), slopes[:, None],
+        np.array(sample_rates)
+    ))
+    one_pole_db = magnitude_db(plugin_response(
+        "BiquadLowPassGraphPrototype", 1000, 1000, 1 / np.sqrt(2), 1, np.array(sample_rates)
+    )) - magnitude_db(plugin_response(
+        "BiquadLowPassGraphPrototype", 1000, 1000, 1 / np.sqrt(2), 0, np.array(sample_rates)
+    ))
+    expected = -3.0103 * stages[:, None] + np.where(slopes == 1, 1, 0)[:, None] * one_pole_db
+    assert np.allclose(at_cutoff, expected, atol=1e-3)
+
+
+def test_decay_tail_covers_impulse_response():
+    """Past the analytic tail the impulse response must stay below the threshold."""
+    sample_rate = 48000
+    impulse = np.zeros(sample_rate)
+    impulse[0] = 1.0
+
+    for plugin, sliders in [
+        ("BiquadLowPass", {"cutoffFreq": 200, "qSlider": 5.0, "slopeSelector": 3}),
+        ("BiquadHighPass", {"cutoffFreq": 50}),
+        ("BiquadLowPassGraphPrototype", {"cutoffFreq": 500, "slopeSelector": 1}),
+    ]:
+        tail_ms = decay_tail_ms(plugin, sliders, sample_rate, threshold_db=-100)
+        ir = biquad_reference.process(impulse, plugin, sliders, sample_rate)[:, 0]
+        tail = ir[int(tail_ms * sample_rate / 1000):]
+        print(f"{plugin:>28} | tail {tail_ms} ms")
+        assert tail_ms < 1000
+        assert np.max(np.abs(tail)) < np.max(np.abs(ir)) * 1e-5, plugin
+
+
+if __name__ == "__main__":
+    test_response_matches_rendered_impulse()
+    test_grid_shape_and_slopes()
+    test_decay_tail_covers_impulse_response()
+    print("\nAll analytic response tests passed!")
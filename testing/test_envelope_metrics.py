@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the envelope metrics of AudioAnalyzer (measure_envelope,
+measure_settling_time and the time range of measure_rms).
+Runs without REAPER.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from jsfx_tester import AudioAnalyzer
+from wav_io import MappedWav, write_wav
+
+
+def test_measure_rms_time_range():
+    """start_sec/end_sec are seconds, not sample indices."""
+    sample_rate = 1000
+    samples = np.concatenate([np.zeros(1000), np.ones(1000)])
+    assert AudioAnalyzer.measure_rms(samples, 1.0, 2.0, sample_rate=sample_rate) == 1.0
+    assert AudioAnalyzer.measure_rms(samples, 0.0, 1.0, sample_rate=sample_rate) == 0.0
+    assert np.isclose(AudioAnalyzer.measure_rms(samples), np.sqrt(0.5))
+    try:
+        AudioAnalyzer.measure_rms(samples, 1.0, 2.0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a time range without sample_rate was accepted")
+
+
+def test_envelope_matches_direct_windows():
+    """Windowed RMS/peak equal a per-window computation for any window/hop."""
+    rng = np.random.default_rng(18)
+    samples = rng.standard_normal((200000, 2)) * np.linspace(0.01, 1, 200000)[:, None]
+    sample_rate = 1000
+
+    for window_ms, hop_ms in [(7, 3), (480, 120), (5, 5), (3, 11)]:
+        envelope = AudioAnalyzer.measure_envelope(samples, sample_rate, window_ms, hop_ms)
+        starts = np.arange(len(envelope['times'])) * hop_ms
+        assert len(starts) == (len(samples) - window_ms) // hop_ms + 1
+        picks = starts[::997]
+        direct = np.array([samples[s:s + window_ms] for s in picks])
+        assert np.allclose(envelope['rms'][::997], np.sqrt(np.mean(direct ** 2, axis=1)))
+        assert np.array_equal(envelope['peak'][::997], np.max(np.abs(direct), axis=1))
+
+    # One channel in, one channel out; a MappedWav gives the same result
+    sample_rate = 48000
+    t = np.arange(sample_rate) / sample_rate
+    tone = 0.5 * np.sin(2 * np.pi * 1000 * t)
+    square = 0.5 * np.sign(np.sin(2 * np.pi * 1000 * t + 0.1))
+    envelope = AudioAnalyzer.measure_envelope(tone, sample_rate, window_ms=10)
+    assert envelope['rms'].shape == (100,)
+    assert np.allclose(envelope['crest_db'], 20 * np.log10(np.sqrt(2)), atol=0.01)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wav_path = write_wav(Path(tmpdir) / "pair.wav", np.column_stack([tone, square]),
+                             sample_rate, bit_depth=32)
+        with MappedWav(wav_path) as wav:
+            mapped = AudioAnalyzer.measure_envelope(wav, window_ms=10, hop_ms=2.5)
+            loaded = AudioAnalyzer.measure_envelope(wav.read(), sample_rate, 10, 2.5)
+    assert mapped['rms'].shape == (397, 2)
+    assert np.allclose(mapped['rms'], loaded['rms']) and np.allclose(mapped['peak'], loaded['peak'])
+    assert np.allclose(mapped['crest_db'][:, 1], 0, atol=1e-6)
+
+    silent = AudioAnalyzer.measure_envelope(np.zeros(1000), 1000, window_ms=10)
+    assert np.all(np.isnan(silent['crest_db']))
+
+
+def test_settling_time_after_steps():
+    """A smoothed gain step settles when its level stays within tolerance."""
+    sample_rate = 48000
+    t = np.arange(2 * sample_rate) / sample_rate
+    tau = 0.010
+    steps = [0.5, 1.2]
+    # Gain 0.5 -> 1.0 at 0.5 s and back to 0.5 at 1.2 s, each smoothed with tau
+    gain = np.full(len(t), 0.5)
+    rising = (t >= 0.5) & (t < 1.2)
+    gain[rising] = 1 - 0.5 * np.exp(-(t[rising] - 0.5) / tau)
+    falling = t >= 1.2
+    level = 1 - 0.5 * np.exp(-0.7 / tau)
+    gain[falling] = 0.5 + (level - 0.5) * np.exp(-(t[falling] - 1.2) / tau)
+
+    tone = np.sin(2 * np.pi * 1000 * t)
+    samples = np.column_stack([tone * gain, tone])
+    settling = AudioAnalyzer.measure_settling_time(samples, steps, sample_rate, tolerance_db=0.5)
+    assert settling.shape == (2, 2)
+
+    # Analytic times to come within 0.5 dB of the final gain, plus up to one window
+    rise = tau * np.log(0.5 / (1 - 10 ** (-0.5 / 20)))
+    fall = tau * np.log(0.5 / (0.5 * (10 ** (0.5 / 20) - 1)))
+    for measured, expected in zip(settling[:, 0], (rise, fall)):
+        assert expected * 1000 <= measured <= expected * 1000 + 6, (measured, expected)
+    assert np.all(settling[:, 1] == 0)
+
+    mono = AudioAnalyzer.measure_settling_time(samples[:, 0], steps, sample_rate)
+    assert np.array_equal(mono, settling[:, 0])
+    assert np.isnan(AudioAnalyzer.measure_settling_time(samples, [2.5], sample_rate)).all()
+
+
+if __name__ == "__main__":
+    test_measure_rms_time_range()
+    test_envelope_matches_direct_windows()
+    test_settling_time_after_steps()
+    print("\nAll envelope metric tests passed!")
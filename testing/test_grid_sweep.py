@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the parameter-grid sweep runner (grid_sweep.py).
+Uses the NumPy reference renderer, so it runs without a REAPER install.
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from biquad_reference import ReferenceRenderer
+from biquad_response import magnitude_db, plugin_response
+from grid_sweep import GridRunner, GridStore, ParameterGrid
+from jsfx_interpreter import InterpreterRenderer
+from jsfx_tester import JSFXTester
+
+PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
+
+TEST_FREQS = [100, 1000, 5000]
+
+
+def test_grid_is_incremental():
+    """A re-run must only render the points added to the grid."""
+    print("=" * 60)
+    print("Parameter Grid Sweep")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store_path = Path(tmpdir) / "graph.npz"
+        tester = JSFXTester(backend=ReferenceRenderer())
+
+        small = ParameterGrid(cutoffFreq=[500, 2000], slopeSelector=[0, 3, 3])
+        assert len(small) == 4
+        store = GridRunner("BiquadLowPassGraphPrototype", store_path, TEST_FREQS,
+                           tester).run(small)
+        assert len(store) == 4
+
+        rendered = []
+        larger = ParameterGrid(cutoffFreq=[500, 2000], slopeSelector=[0, 3, 5])
+        store = GridRunner("BiquadLowPassGraphPrototype", store_path, TEST_FREQS,
+                           tester).run(larger, progress=lambda p, i, n: rendered.append(p))
+        print(f"Re-run rendered {len(rendered)} of {len(larger)} points")
+        assert len(rendered) == 2
+        assert all(p['slopeSelector'] == 5 for p in rendered)
+
+        # The saved store matches the analytic response
+        reopened = GridStore(store_path, "BiquadLowPassGraphPrototype", TEST_FREQS)
+        rows = reopened.query(slopeSelector=[3, 5])
+        assert len(rows['cutoffFreq']) == 4
+        for idx in range(4):
+            expected = magnitude_db(plugin_response(
+                "BiquadLowPassGraphPrototype", np.array(TEST_FREQS), rows['cutoffFreq'][idx],
+                rows['qSlider'][idx], rows['slopeSelector'][idx]
+            ))
+            audible = expected > -40
+            assert np.allclose(rows['attenuation_db'][idx][audible], expected[audible],
+                               atol=0.05)
+
+
+def test_channel_counts_are_measured():
+    """BiquadHighPass leaves channels 3+ unfiltered, which shows up as spread."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        grid = ParameterGrid(cutoffFreq=[1000], channels=[2, 4])
+        store = GridRunner("BiquadHighPass", Path(tmpdir) / "hp.npz", TEST_FREQS,
+                           JSFXTester(backend=ReferenceRenderer())).run(grid)
+
+        stereo = store.query(channels=2)['channel_spread_db'][0]
+        quad = store.query(channels=4)['channel_spread_db'][0]
+        assert np.all(stereo < 0.01)
+        assert quad[0] > 30
+
+
+def test_store_tracks_source_and_renderer():
+    """A store measured from another source or renderer is not extended."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        for name in ("BiquadHighPass.jsfx", "library.jsfx-inc"):
+            shutil.copy(PLUGINS_DIR / name, tmpdir / name)
+        store_path = tmpdir / "hp.npz"
+        grid = ParameterGrid(cutoffFreq=[1000])
+        tester = JSFXTester(backend=InterpreterRenderer(tail_ms=50, effects_dir=tmpdir))
+        GridRunner("BiquadHighPass", store_path, TEST_FREQS, tester).run(grid)
+        assert len(GridRunner("BiquadHighPass", store_path, TEST_FREQS,
+                              tester).missing(grid)) == 0
+
+        # Another renderer, then the same renderer after an edit to an import
+        for edit, other in [(False, JSFXTester(backend=ReferenceRenderer())),
+                            (True, tester)]:
+            if edit:
+                with open(tmpdir / "library.jsfx-inc", "a") as f:
+                    f.write("\n// edited\n")
+            try:
+                GridRunner(tmpdir / "BiquadHighPass.jsfx", store_path, TEST_FREQS, other)
+            except ValueError as err:
+                assert ("effect source" in str(err)) == edit, err
+            else:
+                raise AssertionError("a stale store was reused")
+
+        # Effects without the grid's sliders are rejected up front
+        (tmpdir / "Gain.jsfx").write_text("desc:Gain\nslider1:gain=1<0,2>Gain\n")
+        try:
+            GridRunner(tmpdir / "Gain.jsfx", tmpdir / "gain.npz", TEST_FREQS, tester)
+        except ValueError as err:
+            assert "cutoffFreq" in str(err)
+        else:
+            raise AssertionError("an effect without the grid sliders was accepted")
+
+
+if __name__ == "__main__":
+    test_grid_is_incremental()
+    test_channel_counts_are_measured()
+    test_store_tracks_source_and_renderer()
+    print("\nAll grid sweep tests passed!")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test script for impulse-response prediction (ir_predictor.py).
+Predicts renders of the reference and interpreter backends from a captured
+impulse response; runs without REAPER.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from biquad_reference import ReferenceRenderer
+from ir_predictor import IRPredictor, IRStore, LinearityError, partitioned_convolve
+from jsfx_interpreter import InterpreterRenderer
+from jsfx_tester import AudioAnalyzer, JSFXTester
+from signal_generator import SignalGenerator
+
+
+PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
+
+CLIPPER_JSFX = """desc:Soft clipper (not linear)
+slider1:drive=4<1,10,0.1>Drive
+
+@sample
+spl0 = spl0 * drive / (1 + abs(spl0 * drive));
+spl1 = spl1 * drive / (1 + abs(spl1 * drive));
+"""
+
+
+class StereoRenderer(ReferenceRenderer):
+    """Reference renderer that pads mono renders to stereo, like REAPER."""
+
+    def _write(self, samples, output_wav, sample_rate):
+        if samples.shape[1] < 2:
+            samples = np.column_stack([samples, samples])
+        return super()._write(samples, output_wav, sample_rate)
+
+
+def test_partitioned_convolution():
+    """Overlap-add over any partition size equals direct convolution."""
+    rng = np.random.default_rng(19)
+    signal = rng.standard_normal((5000, 2))
+    for ir_length in (1, 300, 1024, 4100):
+        ir = rng.standard_normal((ir_length, 2)) * np.exp(-np.arange(ir_length) / 500)[:, None]
+        expected = np.column_stack([np.convolve(signal[:, ch], ir[:, ch]) for ch in range(2)])
+        for partition_size in (64, 1024, 8192):
+            result = partitioned_convolve(signal, ir, partition_size)
+            assert result.shape == expected.shape
+            assert np.allclose(result, expected, atol=1e-9), (ir_length, partition_size)
+        truncated = partitioned_convolve(signal, ir, 256, length=len(expected) - 50)
+        assert np.allclose(truncated, expected[:-50], atol=1e-9)
+
+
+def test_predictions_match_renders():
+    """Predicted renders match real renders of a linear effect; captures are stored."""
+    sample_rate = 48000
+    # Kept below full scale, so fixed-point renders wouldn't clip either
+    sliders = {"cutoffFreq": 800, "qSlider": 0.707, "slopeSelector": 1}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=sample_rate, duration=0.5)
+        rng = np.random.default_rng(20)
+        stimuli = {
+            "sine": gen.generate_sine(600),
+            "noise": np.clip(rng.standard_normal((gen.num_samples, 2)) * 0.15, -1, 1),
+        }
+        inputs = []
+        for name, signal in stimuli.items():
+            gen.save_wav(signal, tmpdir / f"{name}.wav")
+            inputs.append(tmpdir / f"{name}.wav")
+
+        store = IRStore(tmpdir / "irs")
+        predictor = IRPredictor(ReferenceRenderer(tail_ms=200), store, spot_check_every=3)
+        outputs = predictor.render_batch_with_effect("BiquadLowPass", inputs, tmpdir / "out",
+                                                     sliders, sample_rate)
+        reference = ReferenceRenderer(tail_ms=200).render_batch_with_effect(
+            "BiquadLowPass", inputs, tmpdir / "ref", sliders, sample_rate)
+        for predicted_path, rendered_path in zip(outputs, reference):
+            predicted, _, _ = AudioAnalyzer.read_wav(predicted_path)
+            rendered, _, _ = AudioAnalyzer.read_wav(rendered_path)
+            assert predicted.shape == rendered.shape
+            # Only float rounding of the captured response is left
+            error = np.sqrt(np.mean((predicted - rendered) ** 2) / np.mean(rendered ** 2))
+            assert error < 10 ** (-120 / 20)
+        assert predictor.stats['captures'] == 1
+        assert predictor.stats['spot_checks'] == 1
+        assert predictor.stats['max_error_db'] < -120
+
+        # A fresh predictor reuses the stored capture
+        reloaded = IRPredictor(ReferenceRenderer(tail_ms=200), IRStore(tmpdir / "irs"),
+                               spot_check_every=0)
+        reloaded.render_with_effect("BiquadLowPass", inputs[0], tmpdir / "again.wav", sliders,
+                                    sample_rate)
+        assert reloaded.stats['captures'] == 0
+        assert reloaded.stats['predictions'] == 1
+
+        # Spot checks compare only the input's channels of a stereo render
+        mono = tmpdir / "mono.wav"
+        SignalGenerator(sample_rate=sample_rate, duration=0.5, channels=1).save_wav(
+            stimuli["noise"][:, :1], mono)
+        stereo = IRPredictor(StereoRenderer(tail_ms=200), spot_check_every=1)
+        stereo.render_with_effect("BiquadLowPass", mono, tmpdir / "mono_out.wav", sliders,
+                                  sample_rate)
+        assert stereo.stats['spot_checks'] == 1
+
+    # The tester runs unchanged on predictions
+    test_freqs = [200, 800, 3200]
+    predicted = JSFXTester(backend=IRPredictor(ReferenceRenderer())).test_frequency_response(
+        "BiquadHighPass", test_freqs, sliders, batched=True)
+    rendered = JSFXTester(backend=ReferenceRenderer()).test_frequency_response(
+        "BiquadHighPass", test_freqs, sliders, batched=True)
+    for freq in test_freqs:
+        assert abs(predicted[freq]['attenuation_db'] - rendered[freq]['attenuation_db']) < 0.05
+
+
+def test_spot_check_catches_nonlinear_effects():
+    """A clipper's impulse response doesn't predict a loud sine."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        jsfx_path = tmpdir / "Clipper.jsfx"
+        jsfx_path.write_text(CLIPPER_JSFX)
+        gen = SignalGenerator(sample_rate=48000, duration=0.2)
+        gen.save_wav(gen.generate_sine(1000, amplitude=0.8), tmpdir / "sine.wav")
+
+        predictor = IRPredictor(InterpreterRenderer(tail_ms=50))
+        try:
+            predictor.render_with_effect(jsfx_path, tmpdir / "sine.wav", tmpdir / "out.wav")
+        except LinearityError as err:
+            assert "Clipper.jsfx" in str(err)
+        else:
+            raise AssertionError("nonlinear effect passed the spot check")
+
+
+if __name__ == "__main__":
+    test_partitioned_convolution()
+    test_predictions_match_renders()
+    test_spot_check_catches_nonlinear_effects()
+    print("\nAll impulse-response prediction tests passed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for the static cost analyzer (jsfx_cost.py).
+Runs without REAPER.
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from jsfx_cost import (analyze, analyze_branches, branch_sliders, find_cost_regressions,
+                       rank_plugins)
+
+
+PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
+
+COUNTING_JSFX = """desc:Cost counting check
+slider1:mode=0<0,2,1{A,B,C}>Mode
+slider2:gain=1<0,4,0.01>Gain
+
+@init
+function scale(x) local(y) ( y = x * gain; y; );
+n = 0;
+
+@slider
+i = 0;
+while (i < 3) ( mem[i] = sin(i); i += 1; );
+
+@sample
+mode == 1 ? spl0 = scale(spl0) : mode == 2 ? spl0 = scale(scale(spl0));
+spl0 > 0.5 ? spl1 = exp(spl0) : spl1 = spl0 * 2;
+loop(mem[0] + 2, spl1 += 1);
+"""
+
+
+def test_counts_follow_branches():
+    """Known branches are followed exactly; audio-dependent ones cost their dearer arm."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        jsfx_path = Path(tmpdir) / "Counting.jsfx"
+        jsfx_path.write_text(COUNTING_JSFX)
+
+        assert branch_sliders(jsfx_path) == {'mode': [0, 1, 2]}
+
+        costs = [analyze(jsfx_path, {'mode': mode})['sample'] for mode in range(3)]
+        # mode compare(s) + spl0 > 0.5 + exp arm + loop(2) of +=
+        assert [cost['compare'] for cost in costs] == [3, 2, 3]
+        assert [cost['calls'] for cost in costs] == [0, 1, 2]
+        assert [cost['arith'] for cost in costs] == [3, 4, 5]
+        assert all(cost['transcendental'] == 1 for cost in costs)
+        assert all(cost['memory'] == 1 for cost in costs)
+        assert not any(cost.unbounded for cost in costs)
+
+        slider_cost = analyze(jsfx_path)['slider']
+        assert slider_cost['transcendental'] == 3
+        assert slider_cost['memory'] == 3
+        assert slider_cost['branches'] == 4
+
+        rows = analyze_branches(jsfx_path, num_channels=(1, 2))
+        assert len(rows) == 6
+
+
+def test_plugin_costs_scale_with_slope_and_channels():
+    """Per-sample bank work scales with stages x channels; a parameter change designs once."""
+    print("=" * 60)
+    print("Static Cost per Sample")
+    print("=" * 60)
+
+    lowpass = PLUGINS_DIR / "BiquadLowPass.jsfx"
+    for row in analyze_branches(lowpass, num_channels=(1, 2, 8)):
+        stages = int(row['sliders']['slopeSelector']) + 1
+        # The shared design is read once; per channel: spl read/write and the
+        # silence counter; per stage: 10 state accesses
+        assert row['costs']['sample']['memory'] == 5 + row['num_ch'] * (5 + 10 * stages)
+        assert row['costs']['sample']['calls'] == 1
+        assert row['costs']['sample']['transcendental'] == 0
+        # A parameter change costs one sin + cos in the next @block, shared
+        # by every channel and stage, whatever the slope; @slider and steady
+        # blocks do no design work
+        assert row['costs']['slider']['transcendental'] == 0
+        assert row['costs']['block']['transcendental'] == 0
+        assert row['costs']['retarget']['transcendental'] == 2
+        # Ramping adds the same few operations per sample at every slope
+        extra = row['costs']['ramp'].score() - row['costs']['sample'].score()
+        assert 0 < extra < 100
+        assert row['costs']['ramp']['transcendental'] == 0
+
+    ranking = rank_plugins(PLUGINS_DIR, num_channels=(2,))
+    for name, worst, mean in ranking:
+        print(f"{name:>34} | worst {worst:>5} | mean {mean:>7.1f}")
+    assert ranking[0][0] == "BiquadLowPassGraphPrototype.jsfx"
+
+
+def test_regression_detection():
+    """An extra always-on stage is flagged against the original source."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        shutil.copy(PLUGINS_DIR / "library.jsfx-inc", tmpdir)
+        modified = Path(tmpdir) / "BiquadHighPass.jsfx"
+        source = (PLUGINS_DIR / "BiquadHighPass.jsfx").read_text()
+        modified.write_text(source.replace(
+            "filters.biquadBank_process(2, slopeSelector + 1);",
+            "filters.biquadBank_process(2, slopeSelector + 2);"
+        ))
+
+        baseline = analyze_branches(PLUGINS_DIR / "BiquadHighPass.jsfx", num_channels=(2,))
+        current = analyze_branches(modified, num_channels=(2,))
+        regressions = find_cost_regressions(current, baseline)
+        slopes = [row['sliders']['slopeSelector'] for row, _, _ in regressions]
+        assert 0 in slopes
+        assert not find_cost_regressions(baseline, baseline)
+
+
+if __name__ == "__main__":
+    test_counts_follow_branches()
+    test_plugin_costs_scale_with_slope_and_channels()
+    test_regression_detection()
+    print("\nAll cost analyzer tests passed!")
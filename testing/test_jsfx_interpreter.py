@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test script for the JSFX interpreter (jsfx_interpreter/).
+Runs the plugin sources themselves without REAPER and checks them against
+the NumPy reference models.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import biquad_reference
+from jsfx_interpreter import (InterpreterRenderer, JSFXEffect, JSFXSyntaxError,
+                              compile_effect, process)
+from jsfx_tester import JSFXTester
+
+
+PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
+
+SEMANTICS_JSFX = """desc:Interpreter semantics check
+slider1:gain=2<0,10,0.1>Gain
+slider2:3<0,8,1>Unnamed
+
+@init
+function acc_add(x) local(prev) (
+  prev = this.total;
+  this.total += x;
+  prev;
+);
+function twice(x) ( x * 2; );
+
+counter.acc_add(5);
+last = counter.acc_add(2);
+seq_value = (a = 1; b = 2; a + b);
+missing = 0 ? 7;
+i = 0;
+while (i < 5) ( mem[i] = i * i; i += 1; );
+total = 0;
+loop(4, total += twice(mem[3]); );
+close = (0.1 + 0.2 == 0.3) && !(1 === 1.000001) || 0;
+chain = i == 5 ? (9) : i == 4 ? 8 : 7;
+squared = sqr(gain + 1);
+overflow = sqr(10 ^ 200);
+
+@slider
+scaled = gain * slider2;
+
+@block
+blocks += 1;
+last_block = samplesblock;
+
+@sample
+spl0 *= gain;
+spl(1) = spl0 + spl1;
+
+@gfx 200 100
+gfx_x = 0; gfx_drawstr("not executed");
+"""
+
+
+def test_plugins_match_reference():
+    """Every plugin at every slope must match the reference renderer."""
+    print("=" * 60)
+    print("Interpreter vs Reference")
+    print("=" * 60)
+
+    rng = np.random.default_rng(14)
+    samples = rng.standard_normal((4000, 10)) * 0.3
+
+    for plugin, num_slopes in [("BiquadLowPass", 4), ("BiquadHighPass", 4),
+                               ("BiquadLowPassGraphPrototype", 6)]:
+        jsfx_path = PLUGINS_DIR / f"{plugin}.jsfx"
+        for slope in range(num_slopes):
+            sliders = {"cutoffFreq": 1500, "qSlider": 2.5, "slopeSelector": slope}
+            for sample_rate in (44100, 96000):
+                rendered = process(samples, jsfx_path, sliders, sample_rate)
+                expected = biquad_reference.process(samples, plugin, sliders, sample_rate)
+                error = np.max(np.abs(rendered - expected))
+                assert error < 1e-12, (plugin, slope, sample_rate, error)
+        print(f"{plugin:>28} | {num_slopes} slopes | max error {error:.1e}")
+
+    # Denormal flushing and the silence bypass after (and between) signal
+    silent = np.zeros((sample_rate, 3))
+    silent[:4000] = samples[:, :3]
+    silent[30000:32000, 0] = samples[:2000, 0]
+    for plugin, slope in [("BiquadLowPass", 3), ("BiquadHighPass", 3),
+                          ("BiquadLowPassGraphPrototype", 3),
+                          ("BiquadLowPassGraphPrototype", 1)]:
+        sliders = {"cutoffFreq": 1500, "qSlider": 2.5, "slopeSelector": slope}
+        rendered = process(silent, PLUGINS_DIR / f"{plugin}.jsfx", sliders, sample_rate)
+        expected = biquad_reference.process(silent, plugin, sliders, sample_rate)
+        assert np.max(np.abs(rendered - expected)) < 1e-12, plugin
+        assert np.all(rendered[-1000:, :2] == 0)
+
+    # Changing sliders mid-stream keeps the filter state, like moving a knob
+    effect = JSFXEffect(PLUGINS_DIR / "BiquadLowPass.jsfx", {"cutoffFreq": 500})
+    first = effect.process(samples[:2000, :2])
+    effect.set_sliders({"cutoffFreq": 5000})
+    second = effect.process(samples[2000:, :2])
+    assert effect.slider_values["cutoffFreq"] == 5000
+    assert np.allclose(first, process(samples[:2000, :2], PLUGINS_DIR / "BiquadLowPass.jsfx",
+                                      {"cutoffFreq": 500}))
+    assert not np.allclose(second, process(samples[2000:, :2],
+                                           PLUGINS_DIR / "BiquadLowPass.jsfx",
+                                           {"cutoffFreq": 5000}))
+
+    # ...and ramps the coefficients to the new design across the next block
+    order = ('b0', 'b1', 'b2', 'a1', 'a2')
+    old = biquad_reference.biquad_lowpass_coeffs(500, 0.707, 48000)
+    new = biquad_reference.biquad_lowpass_coeffs(5000, 0.707, 48000)
+    ramp = np.array([[old[k] + (new[k] - old[k]) * min(n + 1, 100) / 100 for k in order]
+                     for n in range(100)])
+    coeffs = np.vstack([np.tile([old[k] for k in order], (200, 1)), ramp])
+    x = np.concatenate([[0, 0], samples[:300, 0]])
+    y = np.zeros(302)
+    for n in range(300):
+        b0, b1, b2, a1, a2 = coeffs[n]
+        y[n + 2] = b0 * x[n + 2] + b1 * x[n + 1] + b2 * x[n] - a1 * y[n + 1] - a2 * y[n]
+    effect = JSFXEffect(PLUGINS_DIR / "BiquadLowPass.jsfx", {"cutoffFreq": 500})
+    first = effect.process(samples[:200, :1])
+    effect.set_sliders({"cutoffFreq": 1000})
+    effect.set_sliders({"cutoffFreq": 5000})
+    second = effect.process(samples[200:300, :1])
+    assert np.allclose(np.concatenate([first[:, 0], second[:, 0]]), y[2:], atol=1e-12)
+    assert effect["filters.rampLeft"] == 0
+    assert [effect.mem[i] for i in range(5)] == [float(new[k]) for k in order]
+
+
+def test_eel_semantics():
+    """Namespaces, locals, expression values, loops, memory and host variables."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        jsfx_path = Path(tmpdir) / "Semantics.jsfx"
+        jsfx_path.write_text(SEMANTICS_JSFX)
+
+        effect = JSFXEffect(jsfx_path, {"slider2": 4}, sample_rate=44100)
+        assert effect["counter.total"] == 7
+        assert effect["last"] == 5
+        assert effect["seq_value"] == 3
+        assert effect["missing"] == 0
+        assert [effect.mem[i] for i in range(5)] == [0, 1, 4, 9, 16]
+        assert effect["total"] == 72
+        assert effect["close"] == 1
+        assert effect["chain"] == 9
+        assert effect["squared"] == 9
+        assert effect["overflow"] == float("inf")
+        assert effect["srate"] == 44100
+        assert effect["scaled"] == 8
+
+        samples = np.column_stack([np.ones(1000), np.full(1000, 0.5)])
+        out = effect.process(samples, block_size=300)
+        assert np.allclose(out[:, 0], 2.0) and np.allclose(out[:, 1], 2.5)
+        assert effect["blocks"] == 4
+        assert effect["last_block"] == 100
+        assert effect["num_ch"] == 2
+
+        effect.set_sliders({"Gain": 0.5})
+        assert effect["scaled"] == 2
+
+        try:
+            effect.set_sliders({"cutoffFreq": 1})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("unknown slider was accepted")
+
+        jsfx_path.write_text(SEMANTICS_JSFX.replace("twice(x) ( x * 2; );",
+                                                    "twice(x) ( x * ; );"))
+        try:
+            compile_effect(jsfx_path)
+        except JSFXSyntaxError as err:
+            assert err.line == 11, err
+        else:
+            raise AssertionError("syntax error was not reported")
+
+
+def test_renderer_backend():
+    """JSFXTester runs on the interpreter; compiles are shared per source hash."""
+    jsfx_path = PLUGINS_DIR / "BiquadLowPassGraphPrototype.jsfx"
+    assert compile_effect(jsfx_path) is compile_effect(jsfx_path)
+
+    sliders = {"cutoffFreq": 1000, "slopeSelector": 4}
+    interpreted = JSFXTester(backend=InterpreterRenderer()).test_frequency_response(
+        "BiquadLowPassGraphPrototype", [100, 1000, 2000], sliders, batched=True
+    )
+    reference = JSFXTester(backend=biquad_reference.ReferenceRenderer()).test_frequency_response(
+        jsfx_path, [100, 1000, 2000], sliders, batched=True
+    )
+    for freq in (100, 1000, 2000):
+        print(f"{freq:>6} Hz | {interpreted[freq]['attenuation_db']:+8.2f} dB")
+        assert interpreted[freq]['attenuation_db'] == reference[freq]['attenuation_db']
+
+
+if __name__ == "__main__":
+    test_plugins_match_reference()
+    test_eel_semantics()
+    test_renderer_backend()
+    print("\nAll interpreter tests passed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the JSFX metadata index (jsfx_metadata.py).
+Checks header parsing and the name -> slider slot mapping of generated
+projects; runs without REAPER.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from jsfx_metadata import INDEX, MetadataIndex, effect_metadata, find_effect
+from reaper_project import ReaperProject, create_test_project
+from signal_generator import SignalGenerator
+
+
+PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
+
+
+def test_plugin_headers():
+    """Sliders, enums, pins and imports are read from every plugin."""
+    index = MetadataIndex()
+    plugins = index.scan(PLUGINS_DIR)
+    assert set(plugins) == {"BiquadLowPass", "BiquadHighPass", "BiquadLowPassGraphPrototype"}
+
+    lowpass = plugins["BiquadLowPass"]
+    assert [s.name for s in lowpass.sliders] == ["cutoffFreq", "qSlider", "slopeSelector"]
+    assert lowpass.defaults == {"cutoffFreq": 632, "qSlider": 0.707, "slopeSelector": 0}
+    cutoff = lowpass.slider("CUTOFFFREQ")
+    assert (cutoff.minimum, cutoff.maximum, cutoff.step, cutoff.shape) == (20, 20000, 1, "log")
+    assert len(lowpass.slider("slider3").enum) == 4
+    assert len(lowpass.in_pins) == len(lowpass.out_pins) == 8
+    assert lowpass.imports == ["library.jsfx-inc"]
+    assert lowpass.desc
+
+    assert len(plugins["BiquadHighPass"].in_pins) == 2
+    assert plugins["BiquadLowPassGraphPrototype"].slider("slopeSelector").maximum == 5
+
+    # Cached until the file changes
+    with tempfile.TemporaryDirectory() as tmpdir:
+        jsfx_path = Path(tmpdir) / "Gain.jsfx"
+        jsfx_path.write_text("desc:Gain\nslider1:gain=1<0,4,0.1>Gain\n\n@sample\nspl0 *= gain;\n")
+        first = index.get(jsfx_path)
+        assert index.get(jsfx_path) is first
+
+        jsfx_path.write_text("desc:Gain\nslider2:gain=2<0,8,0.1>Gain\n\n@sample\nspl0 *= gain;\n")
+        stat = jsfx_path.stat()
+        os.utime(jsfx_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = index.get(jsfx_path)
+        assert second is not first
+        assert second.slider("gain").index == 2
+
+
+def test_project_slider_mapping():
+    """Sliders are written by declared index; bad names and values fail early."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=48000, duration=0.1)
+        input_wav = tmpdir / "sine.wav"
+        gen.save_wav(gen.generate_sine(1000), input_wav)
+
+        assert find_effect("BiquadLowPass") == find_effect(PLUGINS_DIR / "BiquadLowPass.jsfx")
+        line = effect_metadata("BiquadLowPass.jsfx").reaper_slider_line({"slopeSelector": 2,
+                                                                          "cutoffFreq": 1000})
+        slots = line.split()
+        assert len(slots) == 64
+        assert slots[:3] == ["1000", "0.707", "2"]
+        assert set(slots[3:]) == {"-"}
+
+        rpp = create_test_project("BiquadLowPass.jsfx", input_wav, tmpdir / "test.rpp",
+                                  slider_values={"slopeSelector": 2, "cutoffFreq": 1000}
+                                  ).read_text()
+        assert f"    {line}\n" in rpp
+
+        bad = [
+            {"freqSlider": 50},                  # not declared by the plugin
+            {"cutoffFreq": 5},                   # below the 20 Hz minimum
+            {"slopeSelector": 1.5},              # not an enum index
+        ]
+        for sliders in bad:
+            try:
+                ReaperProject().add_track_with_media(input_wav,
+                                                     jsfx_effects=[("BiquadLowPass.jsfx", sliders)])
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"{sliders} was accepted")
+
+        try:
+            create_test_project("Missing.jsfx", input_wav, tmpdir / "missing.rpp", {"gain": 1})
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("sliders for a missing effect were accepted")
+
+        # A user effects directory takes precedence over the repo plugins
+        override = tmpdir / "BiquadLowPass.jsfx"
+        override.write_text("desc:Override\nslider4:width=1<0,2,0.1>Width\n")
+        project = ReaperProject(effects_dir=tmpdir)
+        assert project._slider_line("BiquadLowPass.jsfx", {"width": 0.5}).split()[:4] == \
+            ["-", "-", "-", "0.5"]
+        assert INDEX.get(override).desc == "Override"
+
+
+if __name__ == "__main__":
+    test_plugin_headers()
+    test_project_slider_mapping()
+    print("\nAll metadata tests passed!")
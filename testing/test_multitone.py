@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for multitone frequency probing.
+Uses the NumPy reference renderer, so it runs without a REAPER install.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from biquad_reference import ReferenceRenderer
+from jsfx_tester import AudioAnalyzer, JSFXTester
+from signal_generator import SignalGenerator
+
+
+def test_multitone_matches_single_tones():
+    """One multitone render must agree with one render per sine."""
+    print("=" * 60)
+    print("Multitone vs. Single-Tone Frequency Response")
+    print("=" * 60)
+
+    tester = JSFXTester(backend=ReferenceRenderer())
+    test_freqs = [50, 100, 200, 500, 1000, 2000, 5000, 10000]
+    sliders = {"cutoffFreq": 1000, "slopeSelector": 1}
+
+    single = tester.test_frequency_response("BiquadLowPass.jsfx", test_freqs, sliders,
+                                            batched=True)
+    multi = tester.test_frequency_response("BiquadLowPass.jsfx", test_freqs, sliders,
+                                           multitone=True)
+
+    for freq in test_freqs:
+        print(f"{freq:>10} Hz | {single[freq]['attenuation_db']:>+8.2f} dB"
+              f" | {multi[freq]['attenuation_db']:>+8.2f} dB")
+        # Deep in the stopband both are limited by 16-bit quantization
+        if single[freq]['attenuation_db'] > -40:
+            assert abs(single[freq]['attenuation_db'] - multi[freq]['attenuation_db']) < 0.1
+
+    # Two cascaded Butterworth stages: -6 dB and -180 degrees at cutoff
+    assert abs(multi[1000]['attenuation_db'] + 6.02) < 0.05
+    assert abs(abs(multi[1000]['phase_shift']) - np.pi) < 0.01
+
+
+def test_multitone_crest_factor():
+    """Schroeder phases must keep the peak well below the in-phase sum."""
+    gen = SignalGenerator(sample_rate=48000, duration=1.0, channels=1)
+    freqs = np.geomspace(20, 20000, 40)
+    schroeder = gen.generate_multitone(freqs, amplitude=1.0)[:, 0]
+
+    crest = np.max(np.abs(schroeder)) / np.sqrt(np.mean(schroeder ** 2))
+    in_phase_crest = np.sqrt(2 * len(freqs))
+    print(f"Crest factor: {crest:.2f} (in-phase: {in_phase_crest:.2f})")
+    assert crest < 0.6 * in_phase_crest
+
+
+def test_tone_measurement_paths_agree():
+    """rFFT (bin-exact) and DFT-bank paths must recover the same tones."""
+    sample_rate = 48000
+    t = np.arange(sample_rate) / sample_rate
+    freqs = np.array([100.0, 1000.0, 7000.0])
+    amps = np.array([0.3, 0.1, 0.05])
+    phases = np.array([0.5, -1.0, 2.0])
+    signal = np.sum(amps[:, None] * np.cos(2 * np.pi * freqs[:, None] * t + phases[:, None]),
+                    axis=0)
+
+    fft_amps, fft_phases = AudioAnalyzer.measure_tones(signal, sample_rate, freqs)
+    # Off by a fraction of a bin forces the DFT bank
+    dft_amps, dft_phases = AudioAnalyzer.measure_tones(signal, sample_rate, freqs + 1e-3)
+
+    assert np.allclose(fft_amps, amps) and np.allclose(fft_phases, phases)
+    assert np.allclose(dft_amps, amps, rtol=1e-3)
+    assert np.allclose(dft_phases, phases, atol=1e-2)
+
+
+if __name__ == "__main__":
+    test_multitone_matches_single_tones()
+    test_multitone_crest_factor()
+    test_tone_measurement_paths_agree()
+    print("\nAll multitone tests passed!")
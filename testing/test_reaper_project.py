@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Test script for the REAPER project generator (reaper_project.py).
+Only inspects the generated .rpp text, so it runs without a REAPER install.
+"""
+
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from jsfx_tester import JSFXTester
+from reaper_project import create_test_project
+from signal_generator import SignalGenerator
+
+
+def test_item_length_and_tail():
+    """Items must be as long as their media, with the requested tail."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=48000, duration=1.5)
+        input_wav = tmpdir / "sine.wav"
+        gen.save_wav(gen.generate_sine(1000), input_wav)
+
+        rpp = create_test_project("BiquadLowPass.jsfx", input_wav, tmpdir / "test.rpp",
+                                  render_settings={'tail_ms': 25}).read_text()
+        assert re.search(r"^\s+LENGTH 1\.500000$", rpp, re.MULTILINE)
+        assert re.search(r"^\s+RENDER_TAILMS 25$", rpp, re.MULTILINE)
+
+
+def test_tail_follows_effect_decay():
+    """The derived tail grows with Q and falls back to the default without a model."""
+    tester = JSFXTester()
+    gentle = tester._tail_ms("BiquadLowPass.jsfx", {"cutoffFreq": 1000}, 48000)
+    resonant = tester._tail_ms("BiquadLowPass.jsfx", {"cutoffFreq": 1000, "qSlider": 10}, 48000)
+    assert gentle < resonant < 1000
+    assert tester._tail_ms("Unknown.jsfx", None, 48000) == 1000
+    assert JSFXTester(tail_ms=250)._tail_ms("BiquadLowPass.jsfx", None, 48000) == 250
+
+
+if __name__ == "__main__":
+    test_item_length_and_tail()
+    test_tail_follows_effect_decay()
+    print("\nAll REAPER project tests passed!")
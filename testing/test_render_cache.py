@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed render cache (render_cache.py).
+Uses the NumPy reference renderer, so it runs without a REAPER install.
+"""
+
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import biquad_reference
+import jsfx_interpreter
+from biquad_reference import ReferenceRenderer
+from jsfx_interpreter import InterpreterRenderer
+from jsfx_tester import AudioAnalyzer, JSFXTester
+from render_cache import RenderCache, module_hash, render_key
+from signal_generator import SignalGenerator
+
+PLUGINS_DIR = Path(__file__).parent.parent / "plugins"
+
+
+class CountingRenderer(ReferenceRenderer):
+    """Reference renderer that counts how many files it actually renders."""
+
+    def __init__(self):
+        super().__init__()
+        self.rendered = 0
+
+    def render_with_effect(self, *args, **kwargs):
+        self.rendered += 1
+        return super().render_with_effect(*args, **kwargs)
+
+    def render_batch_with_effect(self, jsfx_path, input_wavs, *args, **kwargs):
+        self.rendered += len(input_wavs)
+        return super().render_batch_with_effect(jsfx_path, input_wavs, *args, **kwargs)
+
+
+def test_repeat_renders_hit_the_cache():
+    """A repeated render must be served from the cache with identical output."""
+    print("=" * 60)
+    print("Render Cache")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=48000, duration=0.1)
+        inputs = []
+        for idx, freq in enumerate([100, 1000, 5000]):
+            inputs.append(tmpdir / f"sine_{idx}.wav")
+            gen.save_wav(gen.generate_sine(freq), inputs[-1])
+
+        backend = CountingRenderer()
+        tester = JSFXTester(backend=backend, cache=RenderCache(tmpdir / "cache"))
+        sliders = {"cutoffFreq": 1000}
+
+        first = tester.render_with_effect("BiquadLowPass.jsfx", inputs[0],
+                                          tmpdir / "first.wav", sliders)
+        second = tester.render_with_effect("BiquadLowPass.jsfx", inputs[0],
+                                           tmpdir / "second.wav", sliders)
+        assert backend.rendered == 1
+        assert first.read_bytes() == second.read_bytes()
+
+        # A batch only renders the inputs that aren't cached yet
+        outputs = tester.render_batch_with_effect("BiquadLowPass.jsfx", inputs,
+                                                  tmpdir / "batch", sliders)
+        print(f"Rendered {backend.rendered} files for 1 single + 3 batched requests")
+        assert backend.rendered == 3
+        assert [p.name for p in outputs] == [f"sine_{idx}_out.wav" for idx in range(3)]
+        assert all(p.exists() for p in outputs)
+
+
+def test_key_tracks_every_input():
+    """Editing the effect, an import, a slider or the stimulus must change the key."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        for name in ("BiquadLowPass.jsfx", "library.jsfx-inc"):
+            shutil.copy(PLUGINS_DIR / name, tmpdir / name)
+        jsfx_path = tmpdir / "BiquadLowPass.jsfx"
+
+        gen = SignalGenerator(sample_rate=48000, duration=0.05)
+        input_wav = tmpdir / "noise.wav"
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), input_wav)
+
+        base = render_key(jsfx_path, input_wav, {"cutoffFreq": 1000})
+        assert render_key(jsfx_path, input_wav, {"cutoffFreq": 1000}) == base
+        assert render_key(jsfx_path, input_wav, {"cutoffFreq": 2000}) != base
+        assert render_key(jsfx_path, input_wav, {"cutoffFreq": 1000}, 44100) != base
+
+        with open(tmpdir / "library.jsfx-inc", "a") as f:
+            f.write("\n// edited\n")
+        edited = render_key(jsfx_path, input_wav, {"cutoffFreq": 1000})
+        assert edited != base
+
+        gen.save_wav(gen.generate_white_noise(amplitude=0.2), input_wav)
+        assert render_key(jsfx_path, input_wav, {"cutoffFreq": 1000}) != edited
+
+        # A bare name is keyed on the source the backend resolves it to
+        tester = JSFXTester(backend=InterpreterRenderer(tail_ms=10, effects_dir=tmpdir),
+                            cache=RenderCache(tmpdir / "cache"))
+        before = tester.render_with_effect("BiquadLowPass", input_wav, tmpdir / "before.wav")
+        with open(jsfx_path, "a") as f:
+            f.write("\nspl0 = 0; spl1 = 0;\n")
+        after = tester.render_with_effect("BiquadLowPass", input_wav, tmpdir / "after.wav")
+        assert np.any(AudioAnalyzer.read_wav(before)[0] != 0)
+        assert np.all(AudioAnalyzer.read_wav(after)[0] == 0)
+
+        try:
+            render_key("NoSuchEffect", input_wav)
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError("a missing effect was keyed")
+
+        # Model backends are keyed on their model source too
+        assert ReferenceRenderer().model_hash == module_hash(biquad_reference)
+        # ...and the interpreter on every module of its package
+        interpreter_hash = InterpreterRenderer().model_hash
+        assert interpreter_hash == module_hash(jsfx_interpreter)
+        assert interpreter_hash != module_hash(sys.modules["jsfx_interpreter.renderer"])
+
+        # Block size changes the render (ramps and bypass run per block)
+        keys = {JSFXTester(backend=InterpreterRenderer(block_size=size))._cache_key(
+                    jsfx_path, input_wav, None, 48000) for size in (64, 512)}
+        assert len(keys) == 2
+
+
+def test_eviction_bounds_cache_size():
+    """The cache must stay under max_bytes, dropping the oldest entries."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        render = tmpdir / "render.wav"
+        render.write_bytes(b"\0" * 1000)
+
+        cache = RenderCache(tmpdir / "cache", max_bytes=2500)
+        for key in ("a", "b", "c"):
+            cache.put(key, render)
+        total = sum(p.stat().st_size for p in (tmpdir / "cache").glob("*.wav"))
+        assert total <= 2500
+        assert cache.get("c", tmpdir / "c.wav") is not None
+
+
+if __name__ == "__main__":
+    test_repeat_renders_hit_the_cache()
+    test_key_tracks_every_input()
+    test_eviction_bounds_cache_size()
+    print("\nAll render cache tests passed!")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel render scheduler (render_scheduler.py).
+Uses the NumPy reference renderer and a stand-in REAPER command, so it runs
+without a REAPER install.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from biquad_reference import ReferenceRenderer
+from jsfx_tester import AudioAnalyzer
+from render_scheduler import RenderJob, RenderScheduler
+from signal_generator import SignalGenerator
+
+
+def test_parallel_renders_are_isolated():
+    """Concurrent jobs must each land in their own deterministic output file."""
+    print("=" * 60)
+    print("Parallel Render Scheduler")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        gen = SignalGenerator(sample_rate=48000, duration=0.2)
+        input_wav = tmpdir / "noise.wav"
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), input_wav)
+
+        cutoffs = [200, 500, 1000, 2000, 5000, 10000]
+        jobs = [
+            RenderJob(f"lp_{cutoff}", "BiquadLowPass.jsfx", input_wav,
+                      {"cutoffFreq": cutoff})
+            for cutoff in cutoffs
+        ]
+        scheduler = RenderScheduler(tmpdir / "out", max_workers=3,
+                                    backend=ReferenceRenderer())
+        results = scheduler.run(jobs)
+
+        assert list(results) == [job.job_id for job in jobs]
+        for job in jobs:
+            result = results[job.job_id]
+            print(f"{job.job_id:>10} | attempts {result.attempts} | {result.elapsed:.2f} s")
+            assert result.ok
+            assert result.output_path == tmpdir / "out" / f"{job.job_id}.wav"
+
+        # Higher cutoffs keep more of the noise, so each file must be distinct
+        levels = []
+        for job in jobs:
+            samples, _, _ = AudioAnalyzer.read_wav(results[job.job_id].output_path)
+            levels.append(np.sqrt(np.mean(samples ** 2)))
+        assert all(a < b for a, b in zip(levels, levels[1:]))
+
+
+def test_hung_render_times_out_and_retries():
+    """A hung REAPER must be killed after the timeout and retried."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        hung_reaper = tmpdir / "hung_reaper"
+        hung_reaper.write_text("#!/bin/sh\nsleep 30\n")
+        os.chmod(hung_reaper, 0o755)
+
+        gen = SignalGenerator(sample_rate=48000, duration=0.1)
+        input_wav = tmpdir / "noise.wav"
+        gen.save_wav(gen.generate_white_noise(amplitude=0.1), input_wav)
+
+        scheduler = RenderScheduler(tmpdir / "out", max_workers=1, timeout=0.5,
+                                    retries=1, reaper_command=str(hung_reaper))
+        start = time.monotonic()
+        results = scheduler.run([RenderJob("hung", "BiquadLowPass.jsfx", input_wav)])
+        elapsed = time.monotonic() - start
+
+        result = results["hung"]
+        assert not result.ok
+        assert result.attempts == 2
+        assert "Timed out" in result.error
+        assert elapsed < 10
+
+
+if __name__ == "__main__":
+    test_parallel_renders_are_isolated()
+    test_hung_render_times_out_and_retries()
+    print("\nAll render scheduler tests passed!")
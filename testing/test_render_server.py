@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent render server client (render_server.py).
+Runs against fake_render_server.py, so it needs no REAPER install.
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import biquad_reference
+from jsfx_tester import AudioAnalyzer, JSFXTester
+from render_server import RenderServerClient, fake_server_command
+from signal_generator import SignalGenerator
+
+
+def _noise(path, duration=0.1):
+    gen = SignalGenerator(sample_rate=48000, duration=duration)
+    gen.save_wav(gen.generate_white_noise(amplitude=0.1), path)
+    return path
+
+
+def test_server_renders_match_reference():
+    """Jobs through the spool come back identical to direct reference renders."""
+    print("=" * 60)
+    print("Persistent Render Server")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        input_wav = _noise(tmpdir / "noise.wav")
+
+        with RenderServerClient(tmpdir / "spool", command=fake_server_command(),
+                                tail_ms=0) as server:
+            tester = JSFXTester(backend=server)
+            tester.render_with_effect("BiquadLowPass.jsfx", input_wav, tmpdir / "warm.wav")
+
+            start = time.perf_counter()
+            count = 10
+            for idx in range(count):
+                output = tester.render_with_effect("BiquadLowPass.jsfx", input_wav,
+                                                   tmpdir / f"out_{idx}.wav",
+                                                   {"cutoffFreq": 500 + 100 * idx})
+            latency = (time.perf_counter() - start) / count
+            print(f"Per-job latency: {latency * 1000:.1f} ms")
+            assert latency < 0.5
+
+            batch = tester.render_batch_with_effect(
+                "BiquadLowPass.jsfx", [input_wav, _noise(tmpdir / "other.wav")],
+                tmpdir / "batch", {"cutoffFreq": 1400}
+            )
+            assert [p.name for p in batch] == ["noise_out.wav", "other_out.wav"]
+
+        served, _, _ = AudioAnalyzer.read_wav(output)
+        samples, _, _ = AudioAnalyzer.read_wav(input_wav)
+        expected = biquad_reference.process(samples, "BiquadLowPass", {"cutoffFreq": 1400})
+        assert np.max(np.abs(served - expected)) < 1e-4
+
+
+def test_hung_server_is_restarted():
+    """A server that stops heartbeating mid-job is restarted; later jobs succeed."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        input_wav = _noise(tmpdir / "noise.wav", duration=0.05)
+
+        client = RenderServerClient(tmpdir / "spool",
+                                    command=fake_server_command() + ["--hang-after", "1"],
+                                    heartbeat_timeout=1.0, tail_ms=0)
+        with client:
+            client.render_with_effect("BiquadLowPass.jsfx", input_wav, tmpdir / "ok.wav")
+            try:
+                client.render_with_effect("BiquadLowPass.jsfx", input_wav, tmpdir / "hung.wav")
+            except RuntimeError as exc:
+                assert "hung" in str(exc)
+            else:
+                raise AssertionError("hung job should have failed")
+            assert client.restarts == 1
+
+            # The restarted server handles its first job again
+            client.render_with_effect("BiquadLowPass.jsfx", input_wav, tmpdir / "after.wav")
+            assert (tmpdir / "after.wav").exists()
+
+            # A job that outlives its own timeout is reported as such
+            try:
+                client.render_with_effect("BiquadLowPass.jsfx", input_wav,
+                                          tmpdir / "late.wav", timeout=0.5)
+            except subprocess.TimeoutExpired:
+                pass
+            else:
+                raise AssertionError("job should have timed out")
+
+
+if __name__ == "__main__":
+    test_server_renders_match_reference()
+    test_hung_server_is_restarted()
+    print("\nAll render server tests passed!")
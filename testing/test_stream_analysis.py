@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming analyzer (stream_analysis.py).
+Checks the chunked Welch estimate against a whole-array computation and the
+level and NaN/Inf/denormal accounting; runs without REAPER.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from jsfx_tester import AudioAnalyzer
+from stream_analysis import StreamingAnalyzer, analyze_file, periodic_hann
+from wav_io import write_wav
+
+
+def welch_reference(x, y, sample_rate, nperseg, hop):
+    """Whole-array Welch cross-spectral density, one-sided density scaling."""
+    window = periodic_hann(nperseg)
+    starts = range(0, len(x) - nperseg + 1, hop)
+    total = 0
+    for start in starts:
+        a = x[start:start + nperseg]
+        b = y[start:start + nperseg]
+        fa = np.fft.rfft((a - a.mean()) * window)
+        fb = np.fft.rfft((b - b.mean()) * window)
+        total = total + np.conj(fa) * fb
+    scale = np.full(nperseg // 2 + 1, 2.0 / (sample_rate * np.sum(window ** 2)))
+    scale[0] /= 2
+    scale[-1] /= 2
+    return total * scale / len(starts)
+
+
+def test_chunked_welch_matches_reference():
+    """Chunk size doesn't change the result; PSD/CSD match a direct Welch."""
+    sample_rate = 8000
+    rng = np.random.default_rng(17)
+    t = np.arange(50000) / sample_rate
+    left = 0.5 * np.sin(2 * np.pi * 1000 * t) + 0.01 * rng.standard_normal(len(t)) + 0.1
+    right = np.roll(0.5 * left, 3)
+    samples = np.column_stack([left, right])
+
+    whole = StreamingAnalyzer(sample_rate, 2, nperseg=1024, overlap=0.5)
+    whole.update(samples)
+    chunked = StreamingAnalyzer(sample_rate, 2, nperseg=1024, overlap=0.5)
+    for start in range(0, len(samples), 777):
+        chunked.update(samples[start:start + 777])
+        assert len(chunked._carry) < 1024
+    a, b = whole.result(), chunked.result()
+
+    assert a.segments == b.segments == (50000 - 1024) // 512 + 1
+    assert np.allclose(a.psd, b.psd, rtol=1e-10, atol=0)
+    assert np.allclose(a.csd(0, 1), b.csd(0, 1), rtol=1e-10, atol=1e-20)
+    assert np.allclose(b.psd[0], welch_reference(left, left, sample_rate, 1024, 512).real)
+    assert np.allclose(b.csd(0, 1), welch_reference(left, right, sample_rate, 1024, 512))
+    assert np.allclose(b.csd(1, 0), np.conj(b.csd(0, 1)))
+
+    assert b.frequencies[np.argmax(b.psd[0])] == 1000
+    # Hann-windowed density integrates to the sine power
+    band = np.abs(b.frequencies - 1000) < 30
+    assert abs(np.sum(b.psd[0][band]) * (b.frequencies[1]) - 0.125) < 0.005
+    assert np.all(b.coherence(0, 1)[band] > 0.99)
+
+    assert np.allclose(b.dc, [left.mean(), right.mean()])
+    assert np.allclose(b.rms, np.sqrt(np.mean(samples ** 2, axis=0)))
+    assert np.allclose(b.peak, np.max(np.abs(samples), axis=0))
+    assert b.is_finite
+
+
+def test_file_levels_and_invalid_samples():
+    """NaN, Inf and denormal samples are counted; levels ignore them."""
+    sample_rate = 48000
+    signal = np.zeros((sample_rate * 3, 2), dtype=np.float32)
+    signal[:, 0] = 0.25 * np.sin(2 * np.pi * 440 * np.arange(len(signal)) / sample_rate)
+    signal[sample_rate:, 0] *= 2                          # louder after 1 s
+    signal[100000, 1] = np.nan
+    signal[100001:100004, 1] = np.inf
+    signal[120000:120010, 1] = np.float32(1e-40)          # float32 denormals
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wav = write_wav(Path(tmpdir) / "soak.wav", signal, sample_rate, bit_depth=32)
+        stats = analyze_file(wav, chunk_frames=10000)
+        other = AudioAnalyzer.analyze_stream(wav, chunk_frames=50000)
+    assert np.allclose(other.psd, stats.psd) and np.allclose(other.rms, stats.rms)
+
+    assert stats.frames == len(signal)
+    assert stats.nan_count.tolist() == [0, 1]
+    assert stats.inf_count.tolist() == [0, 3]
+    assert stats.denormal_count.tolist() == [0, 10]
+    assert stats.first_nonfinite.tolist() == [-1, 100000]
+    assert not stats.is_finite
+    assert abs(stats.peak[0] - 0.5) < 1e-4
+    assert stats.peak[1] < 1e-39
+
+    assert stats.rms_history.shape == (3, 2)
+    assert np.allclose(stats.rms_history[:, 0], [0.25, 0.5, 0.5] / np.sqrt(2), rtol=1e-3)
+    assert np.allclose(stats.peak_history[:, 0], [0.25, 0.5, 0.5], rtol=1e-3)
+
+    # 16-bit files can't hold NaN or denormals
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wav = write_wav(Path(tmpdir) / "pcm.wav", signal[:, 0], sample_rate, bit_depth=16)
+        pcm = analyze_file(wav, cross_pairs=[], history_sec=None)
+    assert pcm.denormal_count.tolist() == [0]
+    assert pcm.rms_history.shape == (0, 1)
+    assert abs(pcm.rms[0] - stats.rms[0]) < 1e-4
+
+
+if __name__ == "__main__":
+    test_chunked_welch_matches_reference()
+    test_file_levels_and_invalid_samples()
+    print("\nAll streaming analysis tests passed!")
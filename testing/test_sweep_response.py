@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for exponential-sine-sweep transfer-function measurement.
+Renders through the NumPy reference renderer, so it runs without REAPER.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from biquad_reference import ReferenceRenderer, biquad_lowpass_coeffs
+from jsfx_tester import JSFXTester
+
+
+def test_sweep_matches_analytic_response():
+    """One sweep render should reproduce the analytic -24 dB/oct low-pass."""
+    print("=" * 60)
+    print("Sweep Transfer Function (cutoff 1000 Hz, -24 dB/oct)")
+    print("=" * 60)
+
+    tester = JSFXTester(backend=ReferenceRenderer())
+    result = tester.measure_sweep_response(
+        jsfx_path="BiquadLowPass.jsfx",
+        slider_values={"cutoffFreq": 1000, "slopeSelector": 1},
+        sample_rate=48000,
+        duration=2.0
+    )
+
+    freqs = result['frequencies']
+    coeffs = biquad_lowpass_coeffs(1000, 0.707, 48000)
+    z = np.exp(-2j * np.pi * freqs / 48000)
+    expected = ((coeffs['b0'] + coeffs['b1'] * z + coeffs['b2'] * z ** 2) /
+                (1 + coeffs['a1'] * z + coeffs['a2'] * z ** 2)) ** 2
+    expected_db = 20 * np.log10(np.abs(expected))
+
+    for freq in [100, 500, 1000, 2000, 4000]:
+        idx = np.argmin(np.abs(freqs - freq))
+        print(f"{freq:>10} Hz | {result['magnitude_db'][idx]:>+10.2f} dB "
+              f"(expected {expected_db[idx]:+.2f} dB)")
+    for order, level in result['harmonic_distortion_db'].items():
+        print(f"  H{order}: {level:+.1f} dB")
+
+    # Compare above the 16-bit noise floor
+    audible = expected_db > -50
+    assert np.max(np.abs(result['magnitude_db'] - expected_db)[audible]) < 0.5
+    phase_error = np.angle(np.exp(1j * (result['phase'] - np.angle(expected))))
+    assert np.max(np.abs(phase_error[audible])) < 0.05
+
+    # A linear filter has no harmonic distortion above the noise floor
+    assert all(level < -40 for level in result['harmonic_distortion_db'].values())
+
+
+if __name__ == "__main__":
+    test_sweep_matches_analytic_response()
+    print("\nSweep response test passed!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for WAV file I/O (wav_io.py).
+"""
+
+import struct
+import sys
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from signal_generator import SignalGenerator
+from wav_io import MappedWav, write_wav
+
+
+def test_write_pcm_round_trip():
+    """16/24-bit files must be readable by the stdlib and match the signal."""
+    gen = SignalGenerator(sample_rate=48000, duration=0.5, channels=3)
+    signal = gen.generate_sweep(f_start=20, f_end=20000, amplitude=0.9)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for bit_depth, scale in [(16, 32767), (24, 8388607)]:
+            path = write_wav(Path(tmpdir) / f"sweep_{bit_depth}.wav", signal, 48000, bit_depth)
+            with wave.open(str(path), 'r') as wav:
+                assert wav.getnchannels() == 3
+                assert wav.getsampwidth() == bit_depth // 8
+                assert wav.getnframes() == len(signal)
+                raw = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.uint8)
+
+            if bit_depth == 16:
+                decoded = raw.view('<i2')
+            else:
+                # Sign-extend the packed 24-bit samples
+                raw = raw.reshape(-1, 3).astype(np.int32)
+                decoded = ((raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8) >> 8
+            decoded = decoded.reshape(-1, 3) / scale
+            assert np.max(np.abs(decoded - signal)) <= 1.0 / scale
+
+
+def test_write_float_is_lossless():
+    """32-bit float files keep float32 precision and out-of-range values."""
+    signal = np.array([[0.25, -1.5], [1e-6, 2.0], [-0.125, 0.0]])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_wav(Path(tmpdir) / "float.wav", signal, 96000, bit_depth=32)
+        data = path.read_bytes()
+
+    assert data[:4] == b'RIFF' and data[8:12] == b'WAVE'
+    format_tag, channels, sample_rate = struct.unpack('<HHI', data[20:28])
+    assert (format_tag, channels, sample_rate) == (3, 2, 96000)
+    decoded = np.frombuffer(data[-signal.size * 4:], dtype='<f4').reshape(signal.shape)
+    assert np.array_equal(decoded, signal.astype(np.float32))
+
+
+def test_mapped_reader_formats():
+    """MappedWav must decode every written format back to the signal."""
+    gen = SignalGenerator(sample_rate=48000, duration=0.25, channels=2)
+    signal = gen.generate_sine(1000, amplitude=0.8)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for bit_depth, tolerance in [(16, 2 / 32767), (24, 2 / 8388607), (32, 1e-7)]:
+            path = write_wav(Path(tmpdir) / f"sine_{bit_depth}.wav", signal, 48000, bit_depth)
+            with MappedWav(path) as wav:
+                assert (wav.sample_rate, wav.channels, len(wav)) == (48000, 2, len(signal))
+                assert np.max(np.abs(wav.read() - signal)) < tolerance
+
+                # Windowed reads only convert the requested slice
+                window = wav.read_seconds(0.1, 0.15, channels=1)
+                assert window.shape == (2400,)
+                assert np.array_equal(window, wav.read()[4800:7200, 1])
+
+
+def test_mapped_reader_extensible():
+    """WAVE_FORMAT_EXTENSIBLE 24-bit files (as REAPER writes them) must be readable."""
+    samples = np.array([[0.5, -0.5], [0.25, -1.0]])
+    encoded = (samples * 8388607).astype('<i4').reshape(-1, 1).view(np.uint8)[:, :3].tobytes()
+
+    fmt = struct.pack('<HHIIHH', 0xFFFE, 2, 48000, 48000 * 6, 6, 24)
+    # cbSize, valid bits, channel mask, then the PCM SubFormat GUID
+    fmt += struct.pack('<HHI', 22, 24, 3)
+    fmt += struct.pack('<H', 1) + bytes.fromhex('000000001000800000aa00389b71')
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+    body += b'data' + struct.pack('<I', len(encoded)) + encoded
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "extensible.wav"
+        path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+        with MappedWav(path) as wav:
+            assert wav.bit_depth == 24 and not wav.is_float
+            assert np.max(np.abs(wav.read() - samples)) < 2 / 8388607
+
+
+if __name__ == "__main__":
+    test_write_pcm_round_trip()
+    test_write_float_is_lossless()
+    test_mapped_reader_formats()
+    test_mapped_reader_extensible()
+    print("All WAV I/O tests passed!")
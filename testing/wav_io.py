@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+WAV file I/O for JSFX testing.
+Vectorized writer for 16/24-bit PCM and 32-bit float WAV files, and a
+memory-mapped reader that converts to float only the slices you ask for.
+"""
+
+import struct
+import numpy as np
+from pathlib import Path
+
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Frames converted and written per chunk (bounds the temporary copies)
+CHUNK_FRAMES = 1 << 16
+
+SUPPORTED_BIT_DEPTHS = (16, 24, 32)
+
+
+def _encode(frames, bit_depth):
+    """
+    Convert a (num_frames, channels) float block into interleaved WAV bytes.
+
+    Args:
+        frames: numpy array of shape (num_frames, channels), range [-1, 1]
+        bit_depth: 16 or 24 (PCM) or 32 (IEEE float)
+
+    Returns:
+        bytes
+    """
+    if bit_depth == 32:
+        # Float keeps out-of-range values; nothing is clipped
+        return np.ascontiguousarray(frames, dtype='<f4').tobytes()
+
+    frames = np.clip(frames, -1.0, 1.0)
+    if bit_depth == 16:
+        return (frames * 32767).astype('<i2').tobytes()
+
+    # 24-bit: keep the low three bytes of each little-endian int32
+    samples = (frames * 8388607).astype('<i4')
+    return samples.reshape(-1, 1).view(np.uint8)[:, :3].tobytes()
+
+
+def write_wav(filename, signal, sample_rate, bit_depth=16):
+    """
+    Write a signal to a WAV file.
+
+    The signal is converted and interleaved with array operations and
+    written in large chunks rather than sample by sample.
+
+    Args:
+        filename: Output filename (can be string or Path)
+        signal: numpy array of shape (num_samples, channels) or (num_samples,)
+        sample_rate: Sample rate in Hz
+        bit_depth: 16 or 24 for PCM, 32 for IEEE float (default 16)
+
+    Returns:
+        Path to written file
+    """
+    if bit_depth not in SUPPORTED_BIT_DEPTHS:
+        raise ValueError(f"Unsupported bit depth: {bit_depth} (use one of {SUPPORTED_BIT_DEPTHS})")
+
+    filename = Path(filename)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+
+    signal = np.asarray(signal)
+    if signal.ndim == 1:
+        signal = signal.reshape(-1, 1)
+    num_frames, num_channels = signal.shape
+
+    bytes_per_sample = bit_depth // 8
+    block_align = num_channels * bytes_per_sample
+    data_size = num_frames * block_align
+    is_float = bit_depth == 32
+    format_tag = WAVE_FORMAT_IEEE_FLOAT if is_float else WAVE_FORMAT_PCM
+
+    fmt_chunk = struct.pack(
+        '<HHIIHH',
+        format_tag,
+        num_channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bit_depth
+    )
+
+    header = b'WAVE'
+    if is_float:
+        # Non-PCM formats carry an 18-byte fmt chunk and a fact chunk
+        header += b'fmt ' + struct.pack('<I', 18) + fmt_chunk + struct.pack('<H', 0)
+        header += b'fact' + struct.pack('<II', 4, num_frames)
+    else:
+        header += b'fmt ' + struct.pack('<I', 16) + fmt_chunk
+    header += b'data' + struct.pack('<I', data_size)
+
+    pad = data_size % 2
+    riff_size = len(header) + data_size + pad
+
+    with open(filename, 'wb') as f:
+        f.write(b'RIFF' + struct.pack('<I', riff_size) + header)
+        for start in range(0, num_frames, CHUNK_FRAMES):
+            f.write(_encode(signal[start:start + CHUNK_FRAMES], bit_depth))
+        if pad:
+            f.write(b'\x00')
+
+    return filename
+
+
+class MappedWav:
+    """
+    Memory-mapped WAV file reader.
+
+    Only the RIFF header is parsed on open; the data chunk is memory-mapped,
+    so opening a multi-gigabyte render costs nothing until samples are read.
+    read() converts just the requested frames/channels to float.
+
+    Supports 8/16/24/32-bit PCM, 32/64-bit float, and WAVE_FORMAT_EXTENSIBLE
+    files carrying either.
+    """
+
+    def __init__(self, filename):
+        """
+        Open a WAV file.
+
+        Args:
+            filename: Path to WAV file
+        """
+        self.filename = Path(filename)
+        fmt, data_offset, data_size = self._parse_header()
+
+        format_tag, self.channels, self.sample_rate, _, block_align, self.bit_depth = \
+            struct.unpack('<HHIIHH', fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE:
+            # The real format is the first two bytes of the SubFormat GUID
+            format_tag = struct.unpack('<H', fmt[24:26])[0]
+
+        if format_tag == WAVE_FORMAT_IEEE_FLOAT and self.bit_depth in (32, 64):
+            self.is_float = True
+        elif format_tag == WAVE_FORMAT_PCM and self.bit_depth in (8, 16, 24, 32):
+            self.is_float = False
+        else:
+            raise ValueError(
+                f"Unsupported WAV format: tag 0x{format_tag:04X}, {self.bit_depth}-bit"
+            )
+
+        self.num_frames = data_size // block_align
+        if self.bit_depth == 24:
+            dtype, shape = np.uint8, (self.num_frames, self.channels, 3)
+        else:
+            dtype = {
+                (False, 8): np.uint8, (False, 16): '<i2', (False, 32): '<i4',
+                (True, 32): '<f4', (True, 64): '<f8',
+            }[(self.is_float, self.bit_depth)]
+            shape = (self.num_frames, self.channels)
+
+        if self.num_frames > 0:
+            self._data = np.memmap(self.filename, dtype=dtype, mode='r',
+                                   offset=data_offset, shape=shape)
+        else:
+            self._data = np.zeros(shape, dtype=dtype)
+
+    def _parse_header(self):
+        """Find the fmt chunk and the data chunk's offset and size."""
+        file_size = self.filename.stat().st_size
+        fmt = None
+
+        with open(self.filename, 'rb') as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+                raise ValueError(f"Not a RIFF/WAVE file: {self.filename}")
+
+            while True:
+                chunk_header = f.read(8)
+                if len(chunk_header) < 8:
+                    raise ValueError(f"No data chunk in {self.filename}")
+                chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                elif chunk_id == b'data':
+                    if fmt is None:
+                        raise ValueError(f"data chunk before fmt chunk in {self.filename}")
+                    data_offset = f.tell()
+                    # Unfinished/streamed files leave the size at 0 or 0xFFFFFFFF
+                    available = file_size - data_offset
+                    if chunk_size == 0 or chunk_size > available:
+                        chunk_size = available
+                    return fmt, data_offset, chunk_size
+                else:
+                    f.seek(chunk_size, 1)
+
+                # Chunks are word-aligned
+                if chunk_size % 2:
+                    f.seek(1, 1)
+
+    def __len__(self):
+        return self.num_frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the memory map."""
+        self._data = None
+
+    @property
+    def duration(self):
+        """Length of the file in seconds."""
+        return self.num_frames / self.sample_rate
+
+    def channel(self, index):
+        """
+        Zero-copy view of one channel's raw (unconverted) samples.
+
+        Args:
+            index: Channel index
+
+        Returns:
+            Strided numpy view into the mapped file; shape (num_frames,), or
+            (num_frames, 3) raw bytes for 24-bit files
+        """
+        return self._data[:, index]
+
+    def read(self, start=0, stop=None, channels=None, dtype=np.float32):
+        """
+        Read frames as float samples in the -1.0 to 1.0 range.
+
+        Args:
+            start: First frame (default 0)
+            stop: End frame, exclusive (default None = end of file)
+            channels: Channel index or list of indices (default None = all)
+            dtype: Output float dtype (default float32)
+
+        Returns:
+            numpy array of shape (frames, channels), or (frames,) if a single
+            channel index was given
+        """
+        raw = self._data[start:stop]
+        if channels is not None:
+            raw = raw[:, channels]
+
+        if self.bit_depth == 24:
+            raw = raw.astype(np.int32)
+            samples = ((raw[..., 0] | (raw[..., 1] << 8) | (raw[..., 2] << 16)) << 8) >> 8
+            return samples.astype(dtype) / dtype(8388608.0)
+        if self.is_float:
+            return np.array(raw, dtype=dtype)
+        if self.bit_depth == 8:
+            return (raw.astype(dtype) - dtype(128.0)) / dtype(128.0)
+        return raw.astype(dtype) / dtype(2.0 ** (self.bit_depth - 1))
+
+    def read_seconds(self, start_sec=0.0, end_sec=None, channels=None, dtype=np.float32):
+        """
+        Read a time range as float samples (see read()).
+
+        Args:
+            start_sec: Start time in seconds
+            end_sec: End time in seconds (default None = end of file)
+            channels: Channel index or list of indices (default None = all)
+            dtype: Output float dtype (default float32)
+        """
+        start = int(round(start_sec * self.sample_rate))
+        stop = None if end_sec is None else int(round(end_sec * self.sample_rate))
+        return self.read(start, stop, channels, dtype)